@@ -0,0 +1,104 @@
+import re
+from typing import Callable, List, Sequence
+
+# The street directions that are kept in address keys. Other values of a
+# direction column (like "WEST") are left out.
+DIRECTIONS = frozenset(["N", "S", "E", "W", "NE", "NW", "SE", "SW"])
+
+NOT_HOUSE_CHARS_RE = re.compile(r"[^A-Z0-9-]")
+DIGIT_RE = re.compile(r"\d")
+NOT_WORD_CHARS_RE = re.compile(r"[^A-Z0-9\s]")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Unit designations at the end of a full address, e.g. "APT 2" or "#3R".
+UNIT_RE = re.compile(
+    r"\s+(?:(?:APT|UNIT|SUITE|STE|FL|FLOOR|RM|ROOM)\b|#|P-?\d).*$", re.IGNORECASE
+)
+
+
+def _clean_words(value: str) -> str:
+    value = NOT_WORD_CHARS_RE.sub("", value.upper())
+    return WHITESPACE_RE.sub(" ", value).strip()
+
+
+def get_address_key(
+    house: str, direction: str, street_name: str, street_type: str
+) -> str:
+    """
+    Return the key we match addresses on, given their parts. They're
+    upper-cased and stripped of punctuation, e.g.:
+
+        >>> get_address_key('1100`', 's', "o'hare  St.", 'Ave')
+        '1100 S OHARE ST AVE'
+        >>> get_address_key('3200 - 4000', 'West', '103', 'ST')
+        '3200-4000 103 ST'
+
+    Addresses without a house number have an empty key, since they can't be
+    matched to a building:
+
+        >>> get_address_key('', 'N', 'OCTAVIA', 'ST')
+        ''
+
+    These are the rules that `data/normalized/chi_311_normalized.csv` and
+    `chi_violations_normalized.csv` were made with.
+    """
+
+    house = NOT_HOUSE_CHARS_RE.sub("", house.upper())
+    if not house:
+        return ""
+    direction = direction.strip().upper()
+    parts = [
+        house,
+        direction if direction in DIRECTIONS else "",
+        _clean_words(street_name),
+        _clean_words(street_type),
+    ]
+    return " ".join(part for part in parts if part)
+
+
+def get_full_address_key(address: str) -> str:
+    """
+    Return the key of an address that's all in one string, leaving out any
+    unit designation, e.g.:
+
+        >>> get_full_address_key('100 n Funky  St. Apt 2')
+        '100 N FUNKY ST'
+        >>> get_full_address_key('2 W PERSHING RD #3R')
+        '2 W PERSHING RD'
+
+    Its first word is only a house number if it has a digit in it, so
+    addresses that start with the street have an empty key:
+
+        >>> get_full_address_key('N OCTAVIA ST')
+        ''
+    """
+
+    house, _, street = UNIT_RE.sub("", address.strip()).partition(" ")
+    if not DIGIT_RE.search(house):
+        return ""
+    return get_address_key(house, "", street, "")
+
+
+def make_address_key_getter(
+    header: Sequence[str], columns: Sequence[str]
+) -> Callable[[List[str]], str]:
+    """
+    Return a function that gets the address key of a CSV row with the given
+    header, from either the house number, direction, street name and street
+    type columns, or a single full address column, e.g.:
+
+        >>> get_key = make_address_key_getter(['id', 'address'], ['address'])
+        >>> get_key(['1', '100 N FUNKY ST'])
+        '100 N FUNKY ST'
+    """
+
+    indexes = [list(header).index(name) for name in columns]
+
+    def get_values(row: List[str]) -> List[str]:
+        return [row[i] if i < len(row) else "" for i in indexes]
+
+    if len(indexes) == 1:
+        return lambda row: get_full_address_key(*get_values(row))
+    if len(indexes) == 4:
+        return lambda row: get_address_key(*get_values(row))
+    raise ValueError(f"Can't make an address key from {', '.join(columns)}.")
@@ -0,0 +1,220 @@
+import json
+import math
+import resource
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# The name of the pseudo-step that times the whole build.
+TOTAL_STEP = "total"
+
+
+@dataclass
+class ScaleResult:
+    """How a build of synthetic data at one scale went."""
+
+    scale: float
+    parcels: int
+    seconds: float
+    # The peak memory of the process that loaded the data and ran the
+    # build, and how much the database spilled to temporary files.
+    peak_memory_bytes: int
+    temp_bytes: Optional[int] = None
+    steps: Dict[str, float] = field(default_factory=dict)
+
+    def get_seconds(self, step: str) -> Optional[float]:
+        if step == TOTAL_STEP:
+            return self.seconds
+        return self.steps.get(step)
+
+
+@dataclass
+class Tolerances:
+    """How much worse than the baseline a benchmark can do before it fails."""
+
+    # The fraction by which a step can be slower than its baseline...
+    slowdown: float = 0.25
+    # ...unless it's slower by less than this, which is likely to be noise.
+    min_seconds: float = 1.0
+    # The fraction by which the peak memory can be higher than its baseline.
+    memory: float = 0.25
+    # The largest exponent a step's time can grow with the scale by, e.g. 1
+    # if it grows linearly and 2 if it grows quadratically. Steps that take
+    # less than `min_seconds` at every scale aren't checked.
+    max_exponent: float = 1.5
+
+
+def get_peak_memory_bytes() -> int:
+    """
+    Return the peak resident memory of this process, or of the largest of
+    its child processes that have finished (like the ones that load parts
+    of CSVs, or find portfolios), whichever is larger.
+    """
+
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # It's in kilobytes on Linux, but bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def get_scaling_exponent(points: Sequence[Tuple[float, float]]) -> Optional[float]:
+    """
+    Return the exponent k that best fits `seconds = c * scale ** k` to the
+    given (scale, seconds) points, or None if there aren't enough to tell,
+    e.g.:
+
+        >>> get_scaling_exponent([(1, 3.0), (2, 6.0), (4, 12.0)])
+        1.0
+        >>> get_scaling_exponent([(1, 1.0), (10, 100.0)])
+        2.0
+        >>> print(get_scaling_exponent([(1, 1.0), (1, 2.0)]))
+        None
+    """
+
+    logs = [(math.log(s), math.log(t)) for s, t in points if s > 0 and t > 0]
+    if len({x for x, _ in logs}) < 2:
+        return None
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in logs)
+    variance = sum((x - mean_x) ** 2 for x, _ in logs)
+    return round(covariance / variance, 2)
+
+
+def get_steps(results: Sequence[ScaleResult]) -> List[str]:
+    """Return the steps of the given results, in the order they first ran."""
+
+    steps = [TOTAL_STEP]
+    for result in results:
+        steps += [step for step in result.steps if step not in steps]
+    return steps
+
+
+def get_scaling_curve(results: Sequence[ScaleResult]) -> Dict[str, Optional[float]]:
+    """
+    Return the exponent that each step's time grows with the scale by
+    (see get_scaling_exponent), e.g.:
+
+        >>> get_scaling_curve([
+        ...     ScaleResult(1, 10, 2.0, 0, steps={'a': 1.0, 'b': 1.0}),
+        ...     ScaleResult(2, 20, 6.0, 0, steps={'a': 2.0, 'b': 4.0}),
+        ... ])
+        {'total': 1.58, 'a': 1.0, 'b': 2.0}
+    """
+
+    curve = {}
+    for step in get_steps(results):
+        points = []
+        for result in results:
+            seconds = result.get_seconds(step)
+            if seconds is not None:
+                points.append((result.scale, seconds))
+        curve[step] = get_scaling_exponent(points)
+    return curve
+
+
+def format_scaling_curve(results: Sequence[ScaleResult]) -> str:
+    """
+    Format how long each step took at each scale as a table, e.g.:
+
+        >>> print(format_scaling_curve([
+        ...     ScaleResult(1, 10, 2.0, 50 * 2 ** 20, steps={'a': 1.0}),
+        ...     ScaleResult(2, 20, 4.0, 60 * 2 ** 20, steps={'a': 2.0}),
+        ... ]))
+        step                                     x1         x2   exponent
+        total                                 2.00s      4.00s       1.00
+        a                                     1.00s      2.00s       1.00
+        peak memory                            50MB       60MB
+    """
+
+    def secs(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.2f}s"
+
+    curve = get_scaling_curve(results)
+    lines = [
+        f"{'step':<32}"
+        + "".join(f"{'x' + format(r.scale, 'g'):>11}" for r in results)
+        + f"{'exponent':>11}"
+    ]
+    for step, exponent in curve.items():
+        line = f"{step:<32}" + "".join(
+            f"{secs(r.get_seconds(step)):>11}" for r in results
+        )
+        line += f"{'-' if exponent is None else format(exponent, '.2f'):>11}"
+        lines.append(line)
+    lines.append(
+        f"{'peak memory':<32}"
+        + "".join(f"{r.peak_memory_bytes // 2 ** 20:>9}MB" for r in results)
+    )
+    return "\n".join(lines)
+
+
+def find_regressions(
+    results: Sequence[ScaleResult],
+    baseline: Sequence[ScaleResult],
+    tolerances: Tolerances,
+) -> List[str]:
+    """
+    Return descriptions of the ways the given results are worse than the
+    baseline (at the scales they both have), or grow too quickly with the
+    scale, e.g.:
+
+        >>> baseline = [ScaleResult(1, 10, 10.0, 100, steps={'a': 5.0})]
+        >>> latest = [ScaleResult(1, 10, 12.0, 200, steps={'a': 7.0})]
+        >>> for regression in find_regressions(latest, baseline, Tolerances()):
+        ...     print(regression)
+        a took 7.00s at scale 1, 40% longer than the baseline's 5.00s.
+        The peak memory was 200 bytes at scale 1, 100% more than the baseline's 100.
+    """
+
+    regressions = []
+    baseline_by_scale = {result.scale: result for result in baseline}
+    for result in results:
+        base = baseline_by_scale.get(result.scale)
+        if base is None:
+            continue
+        for step in get_steps([result]):
+            seconds = result.get_seconds(step)
+            base_seconds = base.get_seconds(step)
+            if seconds is None or not base_seconds:
+                continue
+            if (
+                seconds > base_seconds * (1 + tolerances.slowdown)
+                and seconds - base_seconds >= tolerances.min_seconds
+            ):
+                regressions.append(
+                    f"{step} took {seconds:.2f}s at scale {result.scale:g}, "
+                    f"{seconds / base_seconds - 1:.0%} longer than the "
+                    f"baseline's {base_seconds:.2f}s."
+                )
+        if result.peak_memory_bytes > base.peak_memory_bytes * (1 + tolerances.memory):
+            regressions.append(
+                f"The peak memory was {result.peak_memory_bytes} bytes at scale "
+                f"{result.scale:g}, "
+                f"{result.peak_memory_bytes / base.peak_memory_bytes - 1:.0%} more "
+                f"than the baseline's {base.peak_memory_bytes}."
+            )
+    for step, exponent in get_scaling_curve(results).items():
+        longest = max((r.get_seconds(step) or 0.0) for r in results)
+        if (
+            exponent is not None
+            and exponent > tolerances.max_exponent
+            and longest >= tolerances.min_seconds
+        ):
+            regressions.append(
+                f"{step}'s time grows with the scale to the power of {exponent}, "
+                f"more than {tolerances.max_exponent}."
+            )
+    return regressions
+
+
+def save_results(path: Path, results: Sequence[ScaleResult]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps([asdict(result) for result in results], indent=2))
+
+
+def load_results(path: Path) -> List[ScaleResult]:
+    return [ScaleResult(**result) for result in json.loads(path.read_text())]
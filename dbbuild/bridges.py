@@ -0,0 +1,69 @@
+from typing import NamedTuple
+
+# The separator of the values in list columns, e.g. "1234567890 | 1234567891".
+LIST_SEPARATOR = "|"
+
+
+class BridgeTable(NamedTuple):
+    """
+    A table with a row for each value in a list column of a dataset, so the
+    dataset's rows can be joined on the values (using an index) instead of
+    splitting the lists at query time.
+    """
+
+    table: str
+    # The column of the dataset that identifies its rows, and what it's
+    # called in the bridge table.
+    key_column: str
+    bridge_key_column: str
+    # The column of the dataset with the lists, and what its values are
+    # called in the bridge table.
+    list_column: str
+    value_column: str
+
+    def get_create_sql(self, source: str) -> str:
+        """
+        Return the SQL that creates the bridge table from the given table,
+        e.g.:
+
+            >>> bridge = BridgeTable('chi_permit_pins', 'id', 'permit_id',
+            ...                      'pin_list', 'pin10')
+            >>> print(bridge.get_create_sql('chi_permits'))
+            CREATE TABLE chi_permit_pins AS
+            SELECT s.id AS permit_id, trim(v.value) AS pin10
+            FROM chi_permits AS s,
+                unnest(string_to_array(s.pin_list, '|')) AS v(value)
+            WHERE trim(v.value) <> ''
+        """
+
+        return (
+            f"CREATE TABLE {self.table} AS\n"
+            f"SELECT s.{self.key_column} AS {self.bridge_key_column}, "
+            f"trim(v.value) AS {self.value_column}\n"
+            f"FROM {source} AS s,\n"
+            f"    unnest(string_to_array(s.{self.list_column}, '{LIST_SEPARATOR}'))"
+            f" AS v(value)\n"
+            f"WHERE trim(v.value) <> ''"
+        )
+
+
+def rebuild_bridge_table(cursor, bridge: BridgeTable, source: str) -> int:
+    """
+    Replace the bridge table with one built from the given table, and
+    return how many rows it has. Like a dataset's table, readers see either
+    the old rows or the new ones.
+    """
+
+    cursor.execute(f"DROP TABLE IF EXISTS {bridge.table}")
+    cursor.execute(bridge.get_create_sql(source))
+    rows = cursor.rowcount
+    cursor.execute(
+        f"CREATE INDEX {bridge.table}_{bridge.value_column}_idx "
+        f"ON {bridge.table} ({bridge.value_column})"
+    )
+    cursor.execute(
+        f"CREATE INDEX {bridge.table}_{bridge.bridge_key_column}_idx "
+        f"ON {bridge.table} ({bridge.bridge_key_column})"
+    )
+    cursor.execute(f"ANALYZE {bridge.table}")
+    return rows
@@ -0,0 +1,192 @@
+import re
+from datetime import datetime
+from typing import Callable, Iterable, NamedTuple, Optional
+
+REJECTS_TABLE = "chi_load_rejects"
+
+# We only keep this many rejected values per load, although we count them all.
+MAX_SAVED_REJECTS = 1000
+
+INTEGER_RE = re.compile(r"\s*[+-]?\d{1,10}\s*")
+
+NUMERIC_RE = re.compile(r"\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*")
+
+ISO_DATE_RE = re.compile(
+    r"\s*(\d{4})-(\d{1,2})-(\d{1,2})"
+    r"([ T](\d{1,2}):(\d{2})(:(\d{2})(\.\d+)?)?)?(Z|[+-]\d{2}(:?\d{2})?)?\s*"
+)
+
+US_DATE_RE = re.compile(
+    r"\s*(\d{1,2})/(\d{1,2})/(\d{4})"
+    r"( (\d{1,2}):(\d{2})(:(\d{2})(\.\d+)?)?( ?[AaPp][Mm])?)?\s*"
+)
+
+BOOLEANS = {"t", "f", "true", "false", "y", "n", "yes", "no", "on", "off", "1", "0"}
+
+
+class Reject(NamedTuple):
+    """A value that couldn't be cast to its column's type."""
+
+    row_number: int
+    column: str
+    value: str
+
+
+def is_integer(value: str) -> bool:
+    """
+    Return whether Postgres can cast the value to an integer, e.g.:
+
+        >>> is_integer('2024')
+        True
+        >>> is_integer('2024.5')
+        False
+        >>> is_integer('99999999999')
+        False
+    """
+
+    return (
+        INTEGER_RE.fullmatch(value) is not None and -(2**31) <= int(value) < 2**31
+    )
+
+
+def is_numeric(value: str) -> bool:
+    """
+    Return whether Postgres can cast the value to a numeric, e.g.:
+
+        >>> is_numeric('-87.63')
+        True
+        >>> is_numeric('1e5')
+        True
+        >>> is_numeric('N/A')
+        False
+    """
+
+    return NUMERIC_RE.fullmatch(value) is not None
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """
+    Return the timestamp that Postgres (with the MDY date style) would cast
+    the value to, ignoring any time zone, or None if it can't be cast. We
+    accept the ISO 8601 and US formats used by the city's data portal, e.g.:
+
+        >>> parse_timestamp('2023-02-01T13:45:00.5Z')
+        datetime.datetime(2023, 2, 1, 13, 45, 0, 500000)
+        >>> parse_timestamp('02/01/2023 01:45:00 PM')
+        datetime.datetime(2023, 2, 1, 13, 45)
+        >>> parse_timestamp('02/01/2023 12:05 AM')
+        datetime.datetime(2023, 2, 1, 0, 5)
+    """
+
+    match = ISO_DATE_RE.fullmatch(value)
+    if match:
+        year, month, day, _, hour, minute, _, second, fraction = match.groups()[:9]
+        ampm = None
+    else:
+        match = US_DATE_RE.fullmatch(value)
+        if not match:
+            return None
+        month, day, year, _, hour, minute, _, second, fraction, ampm = match.groups()
+    hour_value = int(hour or 0)
+    if ampm:
+        if not 1 <= hour_value <= 12:
+            return None
+        hour_value = hour_value % 12 + (12 if ampm.strip().lower() == "pm" else 0)
+    if second is not None and int(second) >= 60:
+        return None
+    microsecond = int((fraction or ".")[1:].ljust(6, "0")[:6])
+    try:
+        return datetime(
+            int(year),
+            int(month),
+            int(day),
+            hour_value,
+            int(minute or 0),
+            int(second or 0),
+            microsecond,
+        )
+    except ValueError:
+        return None
+
+
+def is_timestamp(value: str) -> bool:
+    """
+    Return whether Postgres (with the default MDY date style) can cast the
+    value to a timestamp, e.g.:
+
+        >>> is_timestamp('2023-02-01')
+        True
+        >>> is_timestamp('2023-02-01T13:45:00.000')
+        True
+        >>> is_timestamp('2023-02-01T13:45:00Z')
+        True
+        >>> is_timestamp('02/01/2023 01:45:00 PM')
+        True
+        >>> is_timestamp('2023-02-30')
+        False
+        >>> is_timestamp('13/01/2023')
+        False
+    """
+
+    return parse_timestamp(value) is not None
+
+
+def is_boolean(value: str) -> bool:
+    """
+    Return whether Postgres can cast the value to a boolean, e.g.:
+
+        >>> is_boolean('TRUE')
+        True
+        >>> is_boolean('maybe')
+        False
+    """
+
+    return value.strip().lower() in BOOLEANS
+
+
+VALIDATORS = {
+    "integer": is_integer,
+    "numeric": is_numeric,
+    "date": is_timestamp,
+    "timestamp": is_timestamp,
+    "boolean": is_boolean,
+}
+
+
+def get_validator(sql_type: str) -> Optional[Callable[[str], bool]]:
+    """
+    Return a function that checks whether a CSV value can be cast to the
+    given SQL type, or None if any value can (e.g. for text).
+    """
+
+    return VALIDATORS.get(sql_type.lower())
+
+
+def create_rejects_table(conn) -> None:
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {REJECTS_TABLE} (
+                    dataset text NOT NULL,
+                    row_number bigint NOT NULL,
+                    column_name text NOT NULL,
+                    value text,
+                    rejected_at timestamptz NOT NULL DEFAULT now()
+                )
+                """
+            )
+
+
+def save_rejects(cursor, dataset: str, rejects: Iterable[Reject]) -> None:
+    """Replace the rejected values recorded for the given dataset."""
+
+    cursor.execute(f"DELETE FROM {REJECTS_TABLE} WHERE dataset = %s", (dataset,))
+    for reject in rejects:
+        cursor.execute(
+            f"""
+            INSERT INTO {REJECTS_TABLE} (dataset, row_number, column_name, value)
+            VALUES (%s, %s, %s, %s)
+            """,
+            (dataset, *reject),
+        )
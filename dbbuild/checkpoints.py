@@ -0,0 +1,131 @@
+import hashlib
+from typing import Dict, Mapping, Sequence
+
+from psycopg2 import sql
+
+from .schemas import get_build_id
+
+CHECKPOINTS_TABLE = "public.build_checkpoints"
+
+
+def get_fingerprint(*parts: str) -> str:
+    """
+    Return a fingerprint of the given strings, which changes whenever any
+    of them do, e.g.:
+
+        >>> len(get_fingerprint('SELECT 1', 'abc'))
+        16
+        >>> get_fingerprint('SELECT 1', 'abc') == get_fingerprint('SELECT 1a', 'bc')
+        False
+    """
+
+    content_hash = hashlib.sha256()
+    for part in parts:
+        content_hash.update(part.encode("utf-8"))
+        content_hash.update(b"\0")
+    return content_hash.hexdigest()[:16]
+
+
+def get_step_fingerprints(
+    sources: Mapping[str, str],
+    dependencies: Mapping[str, Sequence[str]],
+    inputs: str,
+) -> Dict[str, str]:
+    """
+    Return the fingerprint of each build step, given its source (e.g. its
+    SQL), the steps it depends on and a fingerprint of the build's inputs.
+    A step's fingerprint changes when anything it depends on changes, e.g.:
+
+        >>> deps = {'a': [], 'b': ['a'], 'c': []}
+        >>> old = get_step_fingerprints({'a': '1', 'b': '2', 'c': '3'}, deps, 'x')
+        >>> new = get_step_fingerprints({'a': '9', 'b': '2', 'c': '3'}, deps, 'x')
+        >>> sorted(step for step in old if old[step] != new[step])
+        ['a', 'b']
+    """
+
+    result: Dict[str, str] = {}
+
+    def fingerprint(name: str) -> str:
+        if name not in result:
+            dep_fingerprints = [fingerprint(dep) for dep in dependencies[name]]
+            result[name] = get_fingerprint(
+                name, sources[name], inputs, *dep_fingerprints
+            )
+        return result[name]
+
+    for name in sources:
+        fingerprint(name)
+    return result
+
+
+def create_checkpoints_table(conn) -> None:
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {CHECKPOINTS_TABLE} (
+                    build_id integer NOT NULL,
+                    step text NOT NULL,
+                    fingerprint text NOT NULL,
+                    completed_at timestamptz NOT NULL DEFAULT now(),
+                    PRIMARY KEY (build_id, step)
+                )
+                """
+            )
+
+
+class Checkpoints:
+    """
+    The build steps that have been completed in a build schema, and the
+    fingerprints of their inputs at the time. `inputs` is a fingerprint of
+    what all the steps are built from (e.g. the datasets).
+    """
+
+    def __init__(self, conn, build_schema: str, inputs: str = "") -> None:
+        self.build_schema = build_schema
+        self.inputs = inputs
+        self.build_id = get_build_id(build_schema)
+        create_checkpoints_table(conn)
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT step, fingerprint FROM {CHECKPOINTS_TABLE} WHERE build_id = %s",
+                    (self.build_id,),
+                )
+                self.completed: Dict[str, str] = dict(cursor.fetchall())
+
+    def is_current(self, step: str, fingerprint: str) -> bool:
+        return self.completed.get(step) == fingerprint
+
+    def prepare(self, conn, step: str, tables: Sequence[str]) -> None:
+        """
+        Get ready to (re-)run a step, by dropping what it left behind in the
+        build schema if it ran before, and forgetting its checkpoint.
+        """
+
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {CHECKPOINTS_TABLE} WHERE build_id = %s AND step = %s",
+                    (self.build_id, step),
+                )
+                for table in tables:
+                    cursor.execute(
+                        sql.SQL("DROP TABLE IF EXISTS {} CASCADE").format(
+                            sql.Identifier(self.build_schema, table)
+                        )
+                    )
+
+    def save(self, conn, step: str, fingerprint: str) -> None:
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {CHECKPOINTS_TABLE} (build_id, step, fingerprint)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (build_id, step) DO UPDATE SET
+                        fingerprint = EXCLUDED.fingerprint,
+                        completed_at = now()
+                    """,
+                    (self.build_id, step, fingerprint),
+                )
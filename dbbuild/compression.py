@@ -0,0 +1,45 @@
+import gzip
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+try:
+    import zstandard
+except ModuleNotFoundError:
+    zstandard = None
+
+# Suffixes of the compressed versions of a data file that we can load, in
+# the order we look for them.
+COMPRESSED_SUFFIXES = [".gz", ".zst"]
+
+
+def find_data_file(data_dir: Path, filename: str) -> Optional[Path]:
+    """
+    Return the path of the given file in the data directory, or of its
+    compressed version (e.g. `chi_311.csv.gz` for `chi_311.csv`) if the
+    uncompressed file doesn't exist.
+    """
+
+    for name in [filename] + [filename + suffix for suffix in COMPRESSED_SUFFIXES]:
+        path = data_dir / name
+        if path.exists():
+            return path
+    return None
+
+
+def open_decompressed(f: BinaryIO, path: Path) -> Any:
+    """
+    Return a binary stream that decompresses the given stream, which
+    reads the file at the given path, as it's read. Uncompressed files are
+    returned as-is.
+    """
+
+    if path.suffix == ".gz":
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise ModuleNotFoundError(
+                f"Loading {path.name} requires the zstandard package, which "
+                f"you can install with 'pip install zstandard'."
+            )
+        return zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+    return f
@@ -0,0 +1,243 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+# How many times we try to connect to the database before giving up, and
+# the bounds of how long we wait between tries.
+CONNECT_TRIES = 6
+BACKOFF_BASE_SECS = 0.5
+BACKOFF_MAX_SECS = 10.0
+
+# Idle connections that haven't been used for this long are checked to
+# still be alive before they're handed out again.
+HEALTH_CHECK_IDLE_SECS = 30.0
+
+DEFAULT_POOL_SIZE = 4
+
+
+class PoolError(Exception):
+    pass
+
+
+def get_backoff_secs(
+    attempt: int,
+    base: float = BACKOFF_BASE_SECS,
+    cap: float = BACKOFF_MAX_SECS,
+    rand: Callable[[], float] = random.random,
+) -> float:
+    """
+    Return how long to wait before retrying after the given (zero-based)
+    failed attempt: a random amount of time up to a limit that doubles
+    with each attempt, so that many clients retrying at once spread out.
+    For example:
+
+        >>> [get_backoff_secs(n, rand=lambda: 1.0) for n in range(7)]
+        [0.5, 1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+        >>> get_backoff_secs(2, rand=lambda: 0.25)
+        0.5
+    """
+
+    return min(cap, base * 2**attempt) * rand()
+
+
+def connect_with_backoff(connect: Callable[[], Any], tries: int = CONNECT_TRIES) -> Any:
+    """
+    Connect to the database, retrying with backoff while it's unavailable
+    (e.g. because it's still starting up).
+    """
+
+    for attempt in range(tries - 1):
+        try:
+            return connect()
+        except psycopg2.OperationalError:
+            print("Failed to connect to db, retrying...")
+            time.sleep(get_backoff_secs(attempt))
+    return connect()
+
+
+def get_options(settings: Mapping[str, str]) -> str:
+    """
+    Return the libpq `options` that start a session with the given
+    settings, e.g.:
+
+        >>> get_options({'work_mem': '256MB', 'synchronous_commit': 'off'})
+        '-c work_mem=256MB -c synchronous_commit=off'
+
+    Since they're set when the session starts, they're also what `RESET`
+    (and `DISCARD ALL`) go back to.
+    """
+
+    return " ".join(f"-c {name}={value}" for name, value in settings.items())
+
+
+def get_free_connections(cursor) -> int:
+    """
+    Return how many more connections the database will accept from users
+    who aren't superusers.
+    """
+
+    # Activity statistics are otherwise only read once per transaction.
+    cursor.execute("SELECT pg_stat_clear_snapshot()")
+    cursor.execute(
+        """
+        SELECT current_setting('max_connections')::int
+            - current_setting('superuser_reserved_connections')::int
+            - (SELECT count(*) FROM pg_stat_activity WHERE backend_type = 'client backend')
+        """
+    )
+    return cursor.fetchone()[0]
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of up to `max_size` open database connections.
+    Connections are reset (with `DISCARD ALL`) when they're returned, and
+    ones that have been idle for a while are checked before they're reused.
+    """
+
+    def __init__(
+        self, connect: Callable[[], Any], max_size: int = DEFAULT_POOL_SIZE
+    ) -> None:
+        self.connect = connect
+        self.max_size = max_size
+        self.idle: List[Any] = []
+        self.idle_since: Dict[int, float] = {}
+        self.in_use = 0
+        # Connections opened before the pool was last closed aren't reused.
+        self.generation = 0
+        self.generations: Dict[int, int] = {}
+        self.condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        """How many connections are open (or reserved) in the pool."""
+
+        with self.condition:
+            return self.in_use + len(self.idle)
+
+    def grow(self, max_size: int) -> None:
+        with self.condition:
+            if max_size > self.max_size:
+                self.max_size = max_size
+                self.condition.notify_all()
+
+    def getconn(self, timeout: Optional[float] = None) -> Any:
+        """
+        Return a connection from the pool, opening one if none are idle. If
+        `max_size` connections are already in use, wait up to `timeout`
+        seconds (forever, if it's None) for one to be returned.
+        """
+
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.idle or self.in_use < self.max_size, timeout
+            ):
+                raise PoolError(f"All {self.max_size} connections are in use.")
+            self.in_use += 1
+            conn = self.idle.pop() if self.idle else None
+            idle_since = self.idle_since.pop(id(conn), 0.0)
+        try:
+            if conn is not None and not self.is_healthy(conn, idle_since):
+                conn.close()
+                conn = None
+            if conn is None:
+                conn = connect_with_backoff(self.connect)
+                with self.condition:
+                    self.generations[id(conn)] = self.generation
+        except BaseException:
+            with self.condition:
+                self.in_use -= 1
+                self.condition.notify()
+            raise
+        return conn
+
+    def is_healthy(self, conn: Any, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < HEALTH_CHECK_IDLE_SECS:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def putconn(self, conn: Any) -> None:
+        """Return a connection to the pool, closing it if it's broken."""
+
+        try:
+            if not conn.closed:
+                conn.rollback()
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    # Undo anything the connection's user changed, like its
+                    # search path.
+                    cursor.execute("DISCARD ALL")
+                conn.autocommit = False
+        except psycopg2.Error:
+            conn.close()
+        with self.condition:
+            self.in_use -= 1
+            if (
+                not conn.closed
+                and conn.info.transaction_status == TRANSACTION_STATUS_IDLE
+                and self.generations.get(id(conn)) == self.generation
+            ):
+                self.idle.append(conn)
+                self.idle_since[id(conn)] = time.monotonic()
+            else:
+                self.generations.pop(id(conn), None)
+                conn.close()
+            self.condition.notify()
+
+    @contextmanager
+    def reserve(self, count: int, timeout: Optional[float] = None) -> Iterator[int]:
+        """
+        Reserve room for up to `count` connections that are opened
+        elsewhere, like in other processes, waiting up to `timeout` seconds
+        for room for at least one, and yield how many were reserved.
+        """
+
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.in_use < self.max_size, timeout
+            ):
+                raise PoolError(f"All {self.max_size} connections are in use.")
+            reserved = min(count, self.max_size - self.in_use)
+            self.in_use += reserved
+        try:
+            yield reserved
+        finally:
+            with self.condition:
+                self.in_use -= reserved
+                self.condition.notify_all()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def closeall(self) -> None:
+        """
+        Close the pool's idle connections now, and the ones in use once
+        they're returned. New sessions pick up changes to the database's
+        default settings, like its search path, that existing ones don't.
+        """
+
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.idle_since.clear()
+            for conn in idle:
+                self.generations.pop(id(conn), None)
+            self.generation += 1
+        for conn in idle:
+            conn.close()
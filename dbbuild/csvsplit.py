@@ -0,0 +1,71 @@
+import io
+from typing import Any, BinaryIO, List, Tuple
+
+# Size of the blocks we read when looking for places to split a file.
+SCAN_BLOCK_SIZE = 1024 * 1024
+
+
+def find_record_ranges(f: BinaryIO, size: int, parts: int) -> List[Tuple[int, int]]:
+    """
+    Read the given CSV file (of the given size) and split the records after
+    its header row into up to the given number of byte ranges of roughly
+    equal size, each of which starts and ends on a record boundary, e.g.:
+
+        >>> data = b'id,note\\n1,"a\\nb"\\n2,c\\n3,d\\n'
+        >>> find_record_ranges(io.BytesIO(data), len(data), 2)
+        [(8, 16), (16, 24)]
+
+    Since quotes inside quoted fields are escaped by doubling them, a
+    newline ends a record only if it's preceded by an even number of
+    quotes, which is how we avoid splitting a multi-line value.
+
+    The whole file is always read, so it can be hashed along the way.
+    """
+
+    # The first target finds the end of the header row.
+    targets = [0] + [size * i // parts for i in range(1, parts)]
+    boundaries: List[int] = []
+    pos = 0
+    in_quotes = False
+    for block in iter(lambda: f.read(SCAN_BLOCK_SIZE), b""):
+        end = pos + len(block)
+        counted = 0
+        search_from = 0
+        while targets and targets[0] < end:
+            i = block.find(b"\n", max(targets[0] - pos, search_from))
+            if i < 0:
+                break
+            in_quotes ^= block.count(b'"', counted, i) % 2 == 1
+            counted = search_from = i + 1
+            if not in_quotes:
+                boundary = pos + i + 1
+                while targets and targets[0] < boundary:
+                    targets.pop(0)
+                boundaries.append(boundary)
+        in_quotes ^= block.count(b'"', counted) % 2 == 1
+        pos = end
+    if not boundaries:
+        return []
+    if boundaries[-1] < pos:
+        boundaries.append(pos)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+class ByteRangeReader(io.RawIOBase):
+    """A raw binary stream of the given byte range of a seekable file."""
+
+    def __init__(self, raw: BinaryIO, start: int, end: int) -> None:
+        self.raw = raw
+        self.raw.seek(start)
+        self.remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        if self.remaining <= 0:
+            return 0
+        view = memoryview(b)[: self.remaining]
+        n = self.raw.readinto(view)  # type: ignore[attr-defined]
+        self.remaining -= n
+        return n
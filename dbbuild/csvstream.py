@@ -0,0 +1,181 @@
+import csv
+import io
+import itertools
+from operator import itemgetter
+from typing import Callable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .casting import MAX_SAVED_REJECTS, Reject
+
+# How much projected CSV we buffer before handing it to the reader.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# How many rows we project and re-serialize at a time.
+ROWS_PER_BATCH = 1000
+
+
+def make_row_projector(indexes: Sequence[int]) -> Callable[[List[str]], Sequence[str]]:
+    """
+    Return a function that picks the given column indexes out of a CSV row,
+    e.g.:
+
+        >>> make_row_projector([2, 0])(['a', 'b', 'c'])
+        ('c', 'a')
+        >>> make_row_projector([1])(['a', 'b', 'c'])
+        ('b',)
+    """
+
+    if len(indexes) == 1:
+        index = indexes[0]
+        return lambda row: (row[index],)
+    return itemgetter(*indexes)
+
+
+class CsvProjection:
+    """
+    A read-only file-like object that streams a CSV file while only
+    re-emitting some of its columns, suitable for passing to psycopg2's
+    `copy_expert()`.
+
+    The header row is expected to have already been read from the file,
+    and isn't re-emitted. Rows are projected in batches and serialized into
+    a bounded buffer, so memory use doesn't depend on the size of the file,
+    and nothing is written to disk. For example:
+
+        >>> f = io.StringIO('1,2,3\\n4,"5,5",6\\n')
+        >>> CsvProjection(f, ['a', 'b', 'c'], ['c', 'b']).read()
+        '3,2\\n6,"5,5"\\n'
+
+    Optionally, `checks` maps column names to functions that validate their
+    non-empty values; invalid values are emptied (so that they're loaded as
+    NULL) and recorded in `rejects`, but the rest of their rows are kept:
+
+        >>> f = io.StringIO('1,2024\\n2,soon\\n')
+        >>> p = CsvProjection(f, ['id', 'year'], ['id', 'year'],
+        ...                   checks=[('year', str.isdigit)])
+        >>> p.read()
+        '1,2024\\n2,\\n'
+        >>> p.rejects
+        [Reject(row_number=2, column='year', value='soon')]
+
+    Rows can also be left out by passing a `row_filter` that's given each
+    (unprojected) row, and returns whether to keep it.
+
+    Columns that aren't in the file can be computed from each row by
+    passing `derived_columns`, a list of their names and the functions
+    that compute them:
+
+        >>> f = io.StringIO('1,a\\n2,b\\n')
+        >>> CsvProjection(f, ['id', 'code'], ['id', 'upper'],
+        ...               derived_columns=[('upper', lambda row: row[1].upper())]).read()
+        '1,A\\n2,B\\n'
+    """
+
+    def __init__(
+        self,
+        f: TextIO,
+        header: Sequence[str],
+        columns: Sequence[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        checks: Sequence[Tuple[str, Callable[[str], bool]]] = (),
+        max_saved_rejects: int = MAX_SAVED_REJECTS,
+        row_filter: Optional[Callable[[List[str]], bool]] = None,
+        derived_columns: Sequence[Tuple[str, Callable[[List[str]], str]]] = (),
+    ) -> None:
+        self.rows = csv.reader(f)
+        self.width = len(header)
+        self.derivers = [derive for _, derive in derived_columns]
+        header = list(header) + [name for name, _ in derived_columns]
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+        self.columns = list(columns)
+        self.indexes = [list(header).index(name) for name in self.columns]
+        self.checks = [
+            (name, list(header).index(name), check) for name, check in checks
+        ]
+        self.row_filter = row_filter
+        self.row_number = 0
+        # How many rows had values that failed their checks.
+        self.rejected_rows = 0
+        self.filtered_rows = 0
+        self.rejects: List[Reject] = []
+        self.max_saved_rejects = max_saved_rejects
+        self.project = make_row_projector(self.indexes)
+        self.chunk_size = chunk_size
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator="\n")
+        self.pending = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def _project_slowly(self, batch: List[List[str]]) -> Iterator[Sequence[str]]:
+        # Rows that are shorter than the header are padded with empty
+        # values, like csv.DictReader does.
+        for row in batch:
+            yield [row[i] if i < len(row) else "" for i in self.indexes]
+
+    def _derive_columns(self, row: List[str]) -> List[str]:
+        if len(row) != self.width:
+            row = (row + [""] * self.width)[: self.width]
+        row.extend([derive(row) for derive in self.derivers])
+        return row
+
+    def _select_rows(self, batch: List[List[str]]) -> List[List[str]]:
+        selected = []
+        for row in batch:
+            self.row_number += 1
+            if self.row_filter and not self.row_filter(row):
+                self.filtered_rows += 1
+                continue
+            if self.derivers:
+                row = self._derive_columns(row)
+            is_rejected = False
+            for name, index, check in self.checks:
+                value = row[index] if index < len(row) else ""
+                if value and not check(value):
+                    row[index] = ""
+                    is_rejected = True
+                    if len(self.rejects) < self.max_saved_rejects:
+                        self.rejects.append(Reject(self.row_number, name, value))
+            if is_rejected:
+                self.rejected_rows += 1
+            selected.append(row)
+        return selected
+
+    def _available(self) -> int:
+        return len(self.pending) - self.pos
+
+    def _fill(self, size: int) -> None:
+        """Buffer projected CSV until at least `size` characters are available."""
+
+        while not self.exhausted and self._available() + self.buffer.tell() < size:
+            batch = list(itertools.islice(self.rows, ROWS_PER_BATCH))
+            if not batch:
+                self.exhausted = True
+                break
+            if self.checks or self.row_filter or self.derivers:
+                batch = self._select_rows(batch)
+            try:
+                projected = list(map(self.project, batch))
+            except IndexError:
+                projected = list(self._project_slowly(batch))
+            self.writer.writerows(projected)
+        if self.buffer.tell():
+            self.pending = self.pending[self.pos :] + self.buffer.getvalue()
+            self.pos = 0
+            self.buffer.seek(0)
+            self.buffer.truncate()
+
+    def _take(self, size: int) -> str:
+        result = self.pending[self.pos : self.pos + size]
+        self.pos += len(result)
+        return result
+
+    def read(self, size: int = -1) -> str:
+        if size is None or size < 0:
+            while not self.exhausted:
+                self._fill(self._available() + self.chunk_size)
+            return self._take(self._available())
+        if self._available() < size:
+            self._fill(max(size, self.chunk_size))
+        return self._take(size)
@@ -0,0 +1,202 @@
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+STATS_TABLE = "chi_load_stats"
+
+# The types of columns whose smallest and largest values we record.
+ORDERED_TYPES = {"integer", "bigint", "numeric", "timestamp", "date", "text"}
+
+
+def _matches(pattern: str) -> Callable[[str], str]:
+    return lambda column: f"{column} ~ '{pattern}'"
+
+
+def _is_between(low: float, high: float) -> Callable[[str], str]:
+    return lambda column: f"{column} BETWEEN {low} AND {high}"
+
+
+# SQL conditions that values in columns with these names should meet.
+# Latitudes and longitudes should be somewhere in Cook County.
+FORMAT_CHECKS: Dict[str, Callable[[str], str]] = {
+    "pin": _matches("^[0-9]{14}$"),
+    "pin10": _matches("^[0-9]{10}$"),
+    "lat": _is_between(41.4, 42.2),
+    "latitude": _is_between(41.4, 42.2),
+    "lon": _is_between(-88.3, -87.5),
+    "longitude": _is_between(-88.3, -87.5),
+}
+
+# Loads fail if more than this fraction of a column's non-empty values fail
+# its format check.
+MAX_INVALID_RATE = 0.01
+
+
+class DataQualityError(Exception):
+    def __init__(
+        self, dataset: str, problems: Sequence[str], stats: "TableStats"
+    ) -> None:
+        super().__init__(
+            f"{dataset} failed its data quality checks: {'; '.join(problems)}"
+        )
+        self.dataset = dataset
+        self.problems = problems
+        self.stats = stats
+
+
+class ColumnStats(NamedTuple):
+    """What we know about the values of one column of a table."""
+
+    name: str
+    empty: int
+    invalid: int
+    distinct_estimate: int
+    min_value: Optional[str]
+    max_value: Optional[str]
+
+
+class TableStats(NamedTuple):
+    """
+    Per-column statistics of the rows of a table, e.g.:
+
+        >>> stats = TableStats(3, [ColumnStats('pin', 1, 1, 2, '123', '12345678901234')])
+        >>> stats.find_problems({'pin': 0.0})
+        ['pin is empty in 1 of 3 rows', 'pin has an invalid format in 1 of 2 values']
+    """
+
+    rows: int
+    columns: List[ColumnStats]
+
+    def find_problems(self, max_empty_rates: Mapping[str, float]) -> List[str]:
+        """
+        Return descriptions of the columns with more empty values than the
+        given fractions of rows, or with too many badly formatted values.
+        """
+
+        problems = []
+        for stats in self.columns:
+            max_empty_rate = max_empty_rates.get(stats.name)
+            if max_empty_rate is not None and stats.empty > max_empty_rate * self.rows:
+                problems.append(
+                    f"{stats.name} is empty in {stats.empty} of {self.rows} rows"
+                )
+            values = self.rows - stats.empty
+            if stats.invalid > MAX_INVALID_RATE * values:
+                problems.append(
+                    f"{stats.name} has an invalid format in {stats.invalid} of {values} values"
+                )
+        return problems
+
+
+def get_stats_sql(table: str, columns: Sequence[Tuple[str, str]]) -> str:
+    """
+    Return a query of the given table's row count, and the number of empty
+    and badly formatted values and the smallest and largest value of each of
+    the given columns, in that order. It reads the whole table, e.g.:
+
+        >>> print(get_stats_sql('t', [('pin', 'text'), ('ok', 'boolean')]))
+        SELECT count(*),
+            count(*) FILTER (WHERE pin IS NULL OR pin::text = ''),
+            count(*) FILTER (WHERE pin::text <> '' AND NOT (pin ~ '^[0-9]{14}$')),
+            min(pin)::text,
+            max(pin)::text,
+            count(*) FILTER (WHERE ok IS NULL OR ok::text = ''),
+            0,
+            NULL,
+            NULL
+        FROM t
+    """
+
+    selects = ["count(*)"]
+    for name, sql_type in columns:
+        check = FORMAT_CHECKS.get(name)
+        selects += [
+            f"count(*) FILTER (WHERE {name} IS NULL OR {name}::text = '')",
+            f"count(*) FILTER (WHERE {name}::text <> '' AND NOT ({check(name)}))"
+            if check
+            else "0",
+            f"min({name})::text" if sql_type in ORDERED_TYPES else "NULL",
+            f"max({name})::text" if sql_type in ORDERED_TYPES else "NULL",
+        ]
+    separator = ",\n    "
+    return f"SELECT {separator.join(selects)}\nFROM {table}"
+
+
+def gather_stats(cursor, table: str, columns: Sequence[Tuple[str, str]]) -> TableStats:
+    """
+    Return the statistics of the given columns of a freshly loaded table.
+    They aren't collected during the COPY: once it's done, the whole table
+    is read again by one query (for all the columns at once), and how many
+    distinct values each column has is estimated from the sample of rows
+    that ANALYZE looks at.
+    """
+
+    cursor.execute(f"ANALYZE {table}")
+    cursor.execute(get_stats_sql(table, columns))
+    rows, *values = cursor.fetchone()
+    column_values = [values[i : i + 4] for i in range(0, len(values), 4)]
+    cursor.execute(
+        """
+        SELECT attname, n_distinct FROM pg_stats
+        WHERE schemaname = current_schema() AND tablename = %s
+        """,
+        (table,),
+    )
+    # Negative estimates are fractions of the table's rows.
+    distinct = {name: round(-n * rows if n < 0 else n) for name, n in cursor.fetchall()}
+    return TableStats(
+        rows,
+        [
+            ColumnStats(
+                name, empty, invalid, distinct.get(name, 0), min_value, max_value
+            )
+            for (name, _), (empty, invalid, min_value, max_value) in zip(
+                columns, column_values
+            )
+        ],
+    )
+
+
+def create_stats_table(conn) -> None:
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+                    dataset text NOT NULL,
+                    column_name text NOT NULL,
+                    rows bigint NOT NULL,
+                    empty bigint NOT NULL,
+                    invalid bigint NOT NULL,
+                    distinct_estimate bigint NOT NULL,
+                    min_value text,
+                    max_value text,
+                    loaded_at timestamptz NOT NULL DEFAULT now(),
+                    PRIMARY KEY (dataset, column_name)
+                )
+                """
+            )
+
+
+def save_stats(cursor, dataset: str, stats: TableStats) -> None:
+    """Replace the column statistics recorded for the given dataset."""
+
+    cursor.execute(f"DELETE FROM {STATS_TABLE} WHERE dataset = %s", (dataset,))
+    for column in stats.columns:
+        cursor.execute(
+            f"""
+            INSERT INTO {STATS_TABLE} (
+                dataset, column_name, rows, empty, invalid, distinct_estimate,
+                min_value, max_value
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (
+                dataset,
+                column.name,
+                stats.rows,
+                column.empty,
+                column.invalid,
+                column.distinct_estimate,
+                column.min_value,
+                column.max_value,
+            ),
+        )
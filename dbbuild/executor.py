@@ -0,0 +1,196 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from .checkpoints import Checkpoints, get_step_fingerprints
+from .profiling import (
+    BuildProfiler,
+    StepProfile,
+    execute_statements,
+    get_created_tables,
+)
+
+
+class BuildStep(NamedTuple):
+    """
+    A step of the build, which is run in its own transaction. Its `tables`
+    are the ones it creates or fills, whose sizes are included in its
+    profile; the ones it `creates` are dropped before it's re-run. Its
+    `source` is what it runs (e.g. its SQL), so we can tell when it's
+    changed.
+    """
+
+    name: str
+    run: Callable[[Any, StepProfile], None]
+    depends_on: Sequence[str]
+    tables: Sequence[str] = ()
+    source: str = ""
+    creates: Sequence[str] = ()
+
+
+class BuildFailedError(Exception):
+    """Raised when any build steps fail, once all the steps that could run have."""
+
+    def __init__(self, failed: Dict[str, BaseException], skipped: List[str]) -> None:
+        self.failed = failed
+        self.skipped = skipped
+        message = ", ".join(f"{name} ({err})" for name, err in failed.items())
+        if skipped:
+            message += f"; skipped {', '.join(skipped)}"
+        super().__init__(f"Build steps failed: {message}")
+
+
+def resolve_dependencies(
+    names: Sequence[str], declared: Mapping[str, Sequence[str]]
+) -> Dict[str, List[str]]:
+    """
+    Return what each of the given (ordered) steps depends on. Steps with
+    no declared dependencies depend on every step before them, e.g.:
+
+        >>> resolve_dependencies(['a', 'b', 'c'], {'b': []})
+        {'a': [], 'b': [], 'c': ['a', 'b']}
+
+    Dependencies on unknown steps, or on later steps, are errors:
+
+        >>> resolve_dependencies(['a', 'b'], {'a': ['b']})
+        Traceback (most recent call last):
+        ...
+        ValueError: Step 'a' must come after the steps it depends on: b
+    """
+
+    result: Dict[str, List[str]] = {}
+    for i, name in enumerate(names):
+        if name not in declared:
+            result[name] = list(names[:i])
+            continue
+        deps = list(declared[name])
+        later = [dep for dep in deps if dep not in names[:i]]
+        if later:
+            raise ValueError(
+                f"Step {name!r} must come after the steps it depends on: "
+                f"{', '.join(later)}"
+            )
+        result[name] = deps
+    return result
+
+
+def sql_file_step(path: Path, depends_on: Sequence[str]) -> BuildStep:
+    sql = path.read_text()
+
+    def run(conn, profile: StepProfile) -> None:
+        with conn:
+            with conn.cursor() as cursor:
+                execute_statements(cursor, sql, profile)
+
+    tables = get_created_tables(sql)
+    return BuildStep(path.name, run, depends_on, tables, sql, creates=tables)
+
+
+def run_steps(
+    steps: Sequence[BuildStep],
+    connect: Callable[[], Any],
+    jobs: int = 1,
+    profiler: Optional[BuildProfiler] = None,
+    checkpoints: Optional[Checkpoints] = None,
+    release: Callable[[Any], None] = lambda conn: conn.close(),
+) -> None:
+    """
+    Run the given build steps, running up to `jobs` of them at once, each
+    as soon as the steps it depends on have finished.
+
+    Each worker thread gets its own connection from `connect()`, which is
+    passed to `release()` (which closes it by default) at the end, and each
+    step is profiled with the given profiler, if any. If a step
+    fails, the steps that depend on it (directly or not) are skipped, but
+    the others still run; a BuildFailedError is raised at the end.
+
+    If `checkpoints` are given, steps that were already completed with the
+    same inputs are skipped, and each completed step is checkpointed.
+    """
+
+    remaining = {step.name: step for step in steps}
+    done: set = set()
+    fingerprints = get_step_fingerprints(
+        {step.name: step.source for step in steps},
+        {step.name: step.depends_on for step in steps},
+        checkpoints.inputs if checkpoints else "",
+    )
+    if checkpoints:
+        for step in steps:
+            if checkpoints.is_current(step.name, fingerprints[step.name]):
+                print(f"Skipping {step.name}, which is already done.")
+                del remaining[step.name]
+                done.add(step.name)
+    failed: Dict[str, BaseException] = {}
+    skipped: List[str] = []
+    running: Dict[Future, str] = {}
+    local = threading.local()
+    conns: List[Any] = []
+    conns_lock = threading.Lock()
+
+    def run(step: BuildStep) -> None:
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = connect()
+            with conns_lock:
+                conns.append(conn)
+        print(f"Running {step.name}...")
+        if checkpoints:
+            checkpoints.prepare(conn, step.name, step.creates)
+        if profiler is None:
+            step.run(conn, StepProfile(step.name))
+        else:
+            with profiler.step(step.name, conn, step.tables) as profile:
+                step.run(conn, profile)
+        if checkpoints:
+            checkpoints.save(conn, step.name, fingerprints[step.name])
+
+    def skip_blocked_steps() -> None:
+        blocked = True
+        while blocked:
+            blocked = False
+            for name, step in list(remaining.items()):
+                if any(dep in failed or dep in skipped for dep in step.depends_on):
+                    del remaining[name]
+                    skipped.append(name)
+                    blocked = True
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            while remaining or running:
+                for name, step in list(remaining.items()):
+                    if len(running) >= max(jobs, 1):
+                        break
+                    if all(dep in done for dep in step.depends_on):
+                        del remaining[name]
+                        running[executor.submit(run, step)] = name
+                if not running:
+                    break
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    err = future.exception()
+                    if err is None:
+                        done.add(name)
+                    else:
+                        print(f"{name} failed: {err}")
+                        failed[name] = err
+                skip_blocked_steps()
+    finally:
+        for conn in conns:
+            release(conn)
+
+    skipped.extend(remaining)
+
+    if failed or skipped:
+        raise BuildFailedError(failed, skipped)
@@ -0,0 +1,212 @@
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional
+
+from .bridges import BridgeTable
+
+CHANGES_TABLE = "chi_indicator_changes"
+
+# The datasets whose rows are counted in wow_indicators.
+INDICATOR_DATASETS = ["chi_permits", "chi_violations", "chi_311"]
+
+# The indicator datasets that are only counted through their bridge tables,
+# by the PIN10s in them, rather than by address (see get_indicators()).
+PIN10_BRIDGE_DATASETS = ["chi_permits"]
+
+INDICATOR_COLUMNS = [
+    "permits_total",
+    "violations_open",
+    "violations_total",
+    "requests_311_total",
+]
+
+
+class PendingChanges(NamedTuple):
+    """The changes to the indicator datasets since wow_indicators was updated."""
+
+    # The id of the latest change, or None if there aren't any.
+    last_id: Optional[int]
+    # Whether a dataset was reloaded from scratch, so any parcel's
+    # indicators may have changed.
+    everything: bool
+    # The address keys of the rows that were upserted, before and after.
+    address_keys: List[str]
+    # The PIN10s whose rows in a bridge table changed.
+    pin10s: List[str]
+
+
+def create_changes_table(conn) -> None:
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {CHANGES_TABLE} (
+                    id bigserial PRIMARY KEY,
+                    dataset text NOT NULL,
+                    -- Both NULL if the whole dataset was reloaded.
+                    address_key text,
+                    pin10 text,
+                    changed_at timestamptz NOT NULL DEFAULT now()
+                )
+                """
+            )
+
+
+def record_reload(cursor, dataset: str) -> None:
+    """Record that every row of the given dataset may have changed."""
+
+    cursor.execute(
+        f"INSERT INTO {CHANGES_TABLE} (dataset, address_key) VALUES (%s, NULL)",
+        (dataset,),
+    )
+
+
+def record_upserted_addresses(
+    cursor, dataset: str, table: str, staging: str, key_columns: List[str]
+) -> None:
+    """
+    Record the address keys of the rows in the given staging table, which
+    are about to be upserted into the dataset's table, along with the
+    current address keys of the rows they'll replace.
+    """
+
+    key_sql = ", ".join(key_columns)
+    cursor.execute(
+        f"""
+        INSERT INTO {CHANGES_TABLE} (dataset, address_key)
+        SELECT %s, address_key FROM {staging} WHERE address_key IS NOT NULL
+        UNION
+        SELECT %s, t.address_key FROM {table} AS t
+        JOIN {staging} AS s USING ({key_sql})
+        WHERE t.address_key IS NOT NULL
+        """,
+        (dataset, dataset),
+    )
+
+
+@contextmanager
+def record_bridge_changes(cursor, dataset: str, bridge: BridgeTable) -> Iterator[None]:
+    """
+    Record the PIN10s whose rows in the given bridge table are changed in
+    the `with` block, if the dataset is only counted through it. Datasets
+    like chi_permits are reloaded from scratch, but only a few of the
+    parcels' counts change each time.
+    """
+
+    if dataset not in PIN10_BRIDGE_DATASETS:
+        yield
+        return
+    counts = f"{bridge.table}__counts"
+    count_sql = (
+        f"SELECT {bridge.value_column} AS pin10, count(*) AS count "
+        f"FROM {bridge.table} GROUP BY 1"
+    )
+    cursor.execute("SELECT to_regclass(%s)", (bridge.table,))
+    exists = cursor.fetchone()[0] is not None
+    cursor.execute(
+        f"CREATE TEMPORARY TABLE {counts} ON COMMIT DROP AS "
+        + (
+            count_sql
+            if exists
+            else "SELECT ''::text AS pin10, 0::bigint AS count WHERE false"
+        )
+    )
+    yield
+    cursor.execute(
+        f"""
+        INSERT INTO {CHANGES_TABLE} (dataset, pin10)
+        SELECT %s, coalesce(old.pin10, new.pin10)
+        FROM {counts} AS old
+        FULL JOIN ({count_sql}) AS new ON new.pin10 = old.pin10
+        WHERE old.count IS DISTINCT FROM new.count
+        """,
+        (dataset,),
+    )
+    cursor.execute(f"DROP TABLE {counts}")
+
+
+def get_last_change_id(cursor) -> Optional[int]:
+    cursor.execute(f"SELECT max(id) FROM {CHANGES_TABLE}")
+    return cursor.fetchone()[0]
+
+
+def get_pending_changes(cursor) -> PendingChanges:
+    cursor.execute(
+        f"""
+        SELECT
+            max(id),
+            bool_or(address_key IS NULL AND pin10 IS NULL),
+            array_remove(array_agg(DISTINCT address_key), NULL),
+            array_remove(array_agg(DISTINCT pin10), NULL)
+        FROM {CHANGES_TABLE}
+        WHERE dataset = ANY(%s)
+        """,
+        (INDICATOR_DATASETS,),
+    )
+    last_id, everything, address_keys, pin10s = cursor.fetchone()
+    return PendingChanges(last_id, bool(everything), address_keys or [], pin10s or [])
+
+
+def clear_changes(cursor, up_to_id: Optional[int]) -> None:
+    """Forget the changes up to the given id, once they've been applied."""
+
+    if up_to_id is not None:
+        cursor.execute(f"DELETE FROM {CHANGES_TABLE} WHERE id <= %s", (up_to_id,))
+
+
+def refresh_indicators(cursor, full: bool = False) -> int:
+    """
+    Update the rows of wow_indicators (in the current search path) whose
+    counts may have changed since it was last updated, and return how many
+    parcels' indicators were recomputed. If `full` is true, or a dataset
+    was reloaded from scratch, every parcel's are.
+    """
+
+    changes = get_pending_changes(cursor)
+    pins: Optional[List[str]] = None
+    if not (full or changes.everything):
+        cursor.execute(
+            """
+            SELECT DISTINCT pin FROM wow_parcels
+            WHERE address_key = ANY(%s) OR pin10 = ANY(%s)
+            """,
+            (changes.address_keys, changes.pin10s),
+        )
+        pins = [row[0] for row in cursor.fetchall()]
+    updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in INDICATOR_COLUMNS)
+    cursor.execute(
+        f"""
+        INSERT INTO wow_indicators (pin, {", ".join(INDICATOR_COLUMNS)})
+        SELECT * FROM get_indicators(%s)
+        ON CONFLICT (pin) DO UPDATE SET {updates}
+        """,
+        (pins,),
+    )
+    recomputed = cursor.rowcount
+    if pins is None:
+        cursor.execute(
+            """
+            DELETE FROM wow_indicators AS i
+            WHERE NOT EXISTS (SELECT 1 FROM wow_parcels AS p WHERE p.pin = i.pin)
+            """
+        )
+    clear_changes(cursor, changes.last_id)
+    return recomputed
+
+
+def find_stale_indicators(cursor) -> List[str]:
+    """
+    Return the PINs whose rows in wow_indicators don't match what a full
+    rebuild would compute.
+    """
+
+    cursor.execute(
+        """
+        SELECT DISTINCT pin FROM (
+            (SELECT * FROM get_indicators() EXCEPT SELECT * FROM wow_indicators)
+            UNION
+            (SELECT * FROM wow_indicators EXCEPT SELECT * FROM get_indicators())
+        ) AS stale
+        ORDER BY pin
+        """
+    )
+    return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,141 @@
+import hashlib
+import io
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+# Size of the blocks we read when hashing a file.
+HASH_BLOCK_SIZE = 1024 * 1024
+
+MANIFEST_TABLE = "chi_load_manifest"
+
+
+class ManifestEntry(NamedTuple):
+    """
+    What we knew about a dataset's source file the last time we loaded it.
+    """
+
+    dataset: str
+    file_size: int
+    file_mtime: float
+    content_hash: str
+    column_signature: str
+
+
+def new_content_hash() -> Any:
+    return hashlib.sha256()
+
+
+def hash_file(path: Path) -> str:
+    """Return the content hash of the given file, reading it in blocks."""
+
+    content_hash = new_content_hash()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            content_hash.update(block)
+    return content_hash.hexdigest()
+
+
+def get_column_signature(columns: List[Tuple[str, str]]) -> str:
+    """
+    Return a short signature of a table's column definitions, so we can
+    tell when a dataset's schema has changed, e.g.:
+
+        >>> get_column_signature([('pin', 'text'), ('year', 'text')])
+        '8528380da5d5765e'
+    """
+
+    spec = ",".join(f"{name} {sql_type}" for name, sql_type in columns)
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()[:16]
+
+
+class HashingReader(io.RawIOBase):
+    """
+    A raw binary stream that hashes everything read through it, so a file
+    can be hashed in the same pass that loads it.
+    """
+
+    def __init__(self, raw: io.BufferedIOBase) -> None:
+        self.raw = raw
+        self.content_hash = new_content_hash()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        n = self.raw.readinto(b)
+        self.content_hash.update(memoryview(b)[:n])
+        return n
+
+    def hexdigest(self) -> str:
+        return self.content_hash.hexdigest()
+
+
+def create_manifest_table(conn) -> None:
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+                    dataset text PRIMARY KEY,
+                    file_size bigint NOT NULL,
+                    file_mtime double precision NOT NULL,
+                    content_hash text NOT NULL,
+                    column_signature text NOT NULL,
+                    loaded_at timestamptz NOT NULL DEFAULT now()
+                )
+                """
+            )
+
+
+def get_manifest_entry(cursor, dataset: str) -> Optional[ManifestEntry]:
+    cursor.execute(
+        f"""
+        SELECT dataset, file_size, file_mtime, content_hash, column_signature
+        FROM {MANIFEST_TABLE}
+        WHERE dataset = %s
+        """,
+        (dataset,),
+    )
+    row = cursor.fetchone()
+    return ManifestEntry(*row) if row else None
+
+
+def save_manifest_entry(cursor, entry: ManifestEntry) -> None:
+    cursor.execute(
+        f"""
+        INSERT INTO {MANIFEST_TABLE}
+            (dataset, file_size, file_mtime, content_hash, column_signature)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (dataset) DO UPDATE SET
+            file_size = EXCLUDED.file_size,
+            file_mtime = EXCLUDED.file_mtime,
+            content_hash = EXCLUDED.content_hash,
+            column_signature = EXCLUDED.column_signature,
+            loaded_at = now()
+        """,
+        entry,
+    )
+
+
+def delete_manifest_entry(cursor, dataset: str) -> None:
+    cursor.execute(f"DELETE FROM {MANIFEST_TABLE} WHERE dataset = %s", (dataset,))
+
+
+def is_unchanged(
+    entry: Optional[ManifestEntry], path: Path, column_signature: str
+) -> bool:
+    """
+    Return whether the given file still matches what was recorded when it
+    was last loaded. The (comparatively slow) content hash is only computed
+    if everything else matches.
+    """
+
+    if entry is None:
+        return False
+    stat = path.stat()
+    return (
+        entry.file_size == stat.st_size
+        and entry.file_mtime == stat.st_mtime
+        and entry.column_signature == column_signature
+        and entry.content_hash == hash_file(path)
+    )
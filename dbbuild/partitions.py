@@ -0,0 +1,138 @@
+import csv
+from datetime import datetime
+from typing import Iterable, List, Literal, TextIO, Tuple
+
+from .casting import parse_timestamp
+
+# How much time each partition of a time-partitioned table covers.
+PartitionInterval = Literal["month", "year"]
+
+
+def get_partition_bounds(
+    value: datetime, interval: PartitionInterval
+) -> Tuple[datetime, datetime]:
+    """
+    Return the start (inclusive) and end (exclusive) of the partition that
+    the given timestamp belongs in, e.g.:
+
+        >>> get_partition_bounds(datetime(2023, 12, 25, 9, 30), 'month')
+        (datetime.datetime(2023, 12, 1, 0, 0), datetime.datetime(2024, 1, 1, 0, 0))
+        >>> get_partition_bounds(datetime(2023, 12, 25), 'year')
+        (datetime.datetime(2023, 1, 1, 0, 0), datetime.datetime(2024, 1, 1, 0, 0))
+    """
+
+    if interval == "year":
+        return datetime(value.year, 1, 1), datetime(value.year + 1, 1, 1)
+    start = datetime(value.year, value.month, 1)
+    if value.month == 12:
+        return start, datetime(value.year + 1, 1, 1)
+    return start, datetime(value.year, value.month + 1, 1)
+
+
+def get_partition_name(table: str, start: datetime, interval: PartitionInterval) -> str:
+    """
+    Return the name of the partition of the given table that starts at the
+    given time, e.g.:
+
+        >>> get_partition_name('chi_311', datetime(2024, 3, 1), 'month')
+        'chi_311_p2024_03'
+        >>> get_partition_name('chi_permits', datetime(2024, 1, 1), 'year')
+        'chi_permits_p2024'
+    """
+
+    if interval == "year":
+        return f"{table}_p{start:%Y}"
+    return f"{table}_p{start:%Y_%m}"
+
+
+def create_default_partition(cursor, table: str) -> None:
+    """
+    Create the partition of the given table that holds the rows without a
+    partition value.
+    """
+
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+    )
+
+
+def create_partitions(
+    cursor, table: str, column: str, interval: PartitionInterval, source: str
+) -> List[str]:
+    """
+    Create the partitions of the given table that the rows of the source
+    table will be routed into, if they don't exist yet, and return the
+    names of the new ones.
+    """
+
+    cursor.execute(
+        f"""
+        SELECT DISTINCT date_trunc(%s, {column}) FROM {source}
+        WHERE {column} IS NOT NULL
+        """,
+        (interval,),
+    )
+    return create_period_partitions(
+        cursor, table, interval, [row[0] for row in cursor.fetchall()]
+    )
+
+
+def create_period_partitions(
+    cursor, table: str, interval: PartitionInterval, periods: Iterable[datetime]
+) -> List[str]:
+    """
+    Create the partitions of the given table that the given times belong
+    in, along with its default partition, if they don't exist yet, and
+    return the names of the new ones.
+    """
+
+    cursor.execute(
+        """
+        SELECT c.relname FROM pg_inherits AS i
+        JOIN pg_class AS c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        """,
+        (table,),
+    )
+    existing = {row[0] for row in cursor.fetchall()}
+    created = []
+    for period in sorted(periods):
+        start, end = get_partition_bounds(period, interval)
+        name = get_partition_name(table, start, interval)
+        if name in existing:
+            continue
+        cursor.execute(
+            f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+            (start, end),
+        )
+        created.append(name)
+    create_default_partition(cursor, table)
+    return created
+
+
+def get_csv_periods(
+    f: TextIO, column: str, interval: PartitionInterval
+) -> List[datetime]:
+    """
+    Return the start of each partition that the rows of the given CSV
+    (starting with its header row) belong in, going by the given column.
+    Values that Postgres can't cast to a timestamp are loaded as NULL, so
+    they're left out, e.g.:
+
+        >>> import io
+        >>> f = io.StringIO('id,created\\n1,03/02/2024\\n2,2024-03-31\\n3,\\n4,2023-01-05\\n')
+        >>> get_csv_periods(f, 'created', 'month')
+        [datetime.datetime(2023, 1, 1, 0, 0), datetime.datetime(2024, 3, 1, 0, 0)]
+    """
+
+    reader = csv.reader(f)
+    header = next(reader, [])
+    if column not in header:
+        return []
+    i = header.index(column)
+    periods = set()
+    for row in reader:
+        value = parse_timestamp(row[i]) if i < len(row) else None
+        if value is not None:
+            periods.add(get_partition_bounds(value, interval)[0])
+    return sorted(periods)
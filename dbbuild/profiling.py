@@ -0,0 +1,344 @@
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import sqlparse
+
+RUNS_TABLE = "public.build_runs"
+
+STEPS_TABLE = "public.build_steps"
+
+# How much of each SQL statement we keep to identify it in reports.
+STATEMENT_SUMMARY_LENGTH = 80
+
+CREATE_TABLE_RE = re.compile(
+    r"\bCREATE\s+(?:UNLOGGED\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.]+)",
+    re.IGNORECASE,
+)
+
+
+class StatementProfile(NamedTuple):
+    """How long one statement of a SQL script took, and how many rows it affected."""
+
+    number: int
+    summary: str
+    seconds: float
+    rows: Optional[int]
+
+
+@dataclass
+class StepProfile:
+    """
+    What happened during one step of the build. Sizes are of the tables
+    (and their indexes) that the step creates or loads, and `temp_bytes` is
+    how much the database spilled to temporary files while the step ran;
+    since that's tracked for the whole database, it includes the spills of
+    any steps running at the same time.
+    """
+
+    step: str
+    started_at: str = ""
+    seconds: float = 0.0
+    rows: Optional[int] = None
+    table_bytes: Optional[int] = None
+    index_bytes: Optional[int] = None
+    temp_bytes: Optional[int] = None
+    error: Optional[str] = None
+    statements: List[StatementProfile] = field(default_factory=list)
+
+    def add_rows(self, rows: Optional[int]) -> None:
+        if rows is not None and rows >= 0:
+            self.rows = (self.rows or 0) + rows
+
+
+class StepComparison(NamedTuple):
+    step: str
+    previous_seconds: Optional[float]
+    latest_seconds: Optional[float]
+
+    @property
+    def change(self) -> float:
+        return (self.latest_seconds or 0.0) - (self.previous_seconds or 0.0)
+
+
+def summarize_statement(sql: str) -> str:
+    """
+    Return a one-line summary of a SQL statement, e.g.:
+
+        >>> summarize_statement('CREATE INDEX ON wow_parcels (pin);')
+        'CREATE INDEX ON wow_parcels (pin);'
+        >>> summarize_statement('-- Hi\\nSELECT\\n    1')
+        'SELECT 1'
+    """
+
+    sql = sqlparse.format(sql, strip_comments=True)
+    return " ".join(sql.split())[:STATEMENT_SUMMARY_LENGTH]
+
+
+def get_created_tables(sql: str) -> List[str]:
+    """
+    Return the tables that the given SQL creates, e.g.:
+
+        >>> get_created_tables('CREATE TABLE a AS SELECT 1; create table if not exists b ();')
+        ['a', 'b']
+    """
+
+    return CREATE_TABLE_RE.findall(sql)
+
+
+def execute_statements(cursor, sql: str, profile: StepProfile) -> None:
+    """Run the given SQL one statement at a time, profiling each statement."""
+
+    for number, statement in enumerate(sqlparse.split(sql), start=1):
+        start = time.perf_counter()
+        cursor.execute(statement)
+        rows = cursor.rowcount if cursor.rowcount >= 0 else None
+        profile.statements.append(
+            StatementProfile(
+                number,
+                summarize_statement(statement),
+                time.perf_counter() - start,
+                rows,
+            )
+        )
+        profile.add_rows(rows)
+
+
+def get_temp_bytes(conn) -> Optional[int]:
+    with conn:
+        with conn.cursor() as cursor:
+            # Otherwise we'd get the statistics cached earlier in the session.
+            cursor.execute("SELECT pg_stat_clear_snapshot()")
+            cursor.execute(
+                "SELECT temp_bytes FROM pg_stat_database WHERE datname = current_database()"
+            )
+            row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def get_table_sizes(conn, tables: Sequence[str]) -> Dict[str, int]:
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT
+                    coalesce(sum(pg_table_size(p.relid)), 0),
+                    coalesce(sum(pg_indexes_size(p.relid)), 0)
+                FROM unnest(%s::text[]) AS t
+                -- Partitioned tables are empty; their partitions hold the data.
+                CROSS JOIN LATERAL (
+                    SELECT to_regclass(t) AS relid
+                    UNION SELECT relid FROM pg_partition_tree(to_regclass(t))
+                ) AS p
+                WHERE p.relid IS NOT NULL
+                """,
+                (list(tables),),
+            )
+            table_bytes, index_bytes = cursor.fetchone()
+    return {"table_bytes": int(table_bytes), "index_bytes": int(index_bytes)}
+
+
+class BuildProfiler:
+    """
+    Collects the profiles of a build's steps, which may run on different
+    threads (and connections) at the same time.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = datetime.now(timezone.utc)
+        self.steps: List[StepProfile] = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def step(
+        self, name: str, conn, tables: Sequence[str] = ()
+    ) -> Iterator[StepProfile]:
+        """
+        Profile a step run on the given connection, which mustn't be in the
+        middle of a transaction when the step starts or ends.
+        """
+
+        profile = StepProfile(name, started_at=datetime.now(timezone.utc).isoformat())
+        temp_bytes_before = get_temp_bytes(conn)
+        start = time.perf_counter()
+        try:
+            yield profile
+        except Exception as e:
+            profile.error = str(e)
+            raise
+        finally:
+            profile.seconds = time.perf_counter() - start
+            with self.lock:
+                self.steps.append(profile)
+        if tables:
+            sizes = get_table_sizes(conn, tables)
+            profile.table_bytes = sizes["table_bytes"]
+            profile.index_bytes = sizes["index_bytes"]
+        temp_bytes_after = get_temp_bytes(conn)
+        if temp_bytes_before is not None and temp_bytes_after is not None:
+            profile.temp_bytes = temp_bytes_after - temp_bytes_before
+
+    def to_json(self, run_id: int, status: str, build_schema: Optional[str]) -> str:
+        return json.dumps(
+            {
+                "run_id": run_id,
+                "status": status,
+                "build_schema": build_schema,
+                "started_at": self.started_at.isoformat(),
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+                "steps": [asdict(step) for step in self.steps],
+            },
+            indent=2,
+        )
+
+    def save(
+        self,
+        conn,
+        status: str,
+        build_schema: Optional[str] = None,
+        report_dir: Optional[Path] = None,
+    ) -> int:
+        """
+        Save the profiled steps to the database (and, optionally, a JSON
+        report in the given directory), and return the build run's id.
+        """
+
+        create_profile_tables(conn)
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {RUNS_TABLE} (started_at, status, build_schema)
+                    VALUES (%s, %s, %s)
+                    RETURNING id
+                    """,
+                    (self.started_at, status, build_schema),
+                )
+                run_id = cursor.fetchone()[0]
+                for step in self.steps:
+                    cursor.execute(
+                        f"""
+                        INSERT INTO {STEPS_TABLE} (
+                            run_id, step, started_at, seconds, rows_affected,
+                            table_bytes, index_bytes, temp_bytes, error, statements
+                        )
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        """,
+                        (
+                            run_id,
+                            step.step,
+                            step.started_at,
+                            step.seconds,
+                            step.rows,
+                            step.table_bytes,
+                            step.index_bytes,
+                            step.temp_bytes,
+                            step.error,
+                            json.dumps([s._asdict() for s in step.statements]),
+                        ),
+                    )
+        if report_dir is not None:
+            report_dir.mkdir(parents=True, exist_ok=True)
+            path = report_dir / f"build-run-{run_id}.json"
+            path.write_text(self.to_json(run_id, status, build_schema))
+            print(f"Wrote build profile to {path}.")
+        return run_id
+
+
+def create_profile_tables(conn) -> None:
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {RUNS_TABLE} (
+                    id serial PRIMARY KEY,
+                    started_at timestamptz NOT NULL,
+                    finished_at timestamptz NOT NULL DEFAULT now(),
+                    status text NOT NULL,
+                    build_schema text
+                )
+                """
+            )
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {STEPS_TABLE} (
+                    run_id integer NOT NULL REFERENCES {RUNS_TABLE} (id) ON DELETE CASCADE,
+                    step text NOT NULL,
+                    started_at timestamptz NOT NULL,
+                    seconds double precision NOT NULL,
+                    rows_affected bigint,
+                    table_bytes bigint,
+                    index_bytes bigint,
+                    temp_bytes bigint,
+                    error text,
+                    statements jsonb NOT NULL DEFAULT '[]'
+                )
+                """
+            )
+
+
+def get_latest_run_ids(conn, count: int = 2) -> List[int]:
+    """Return the ids of the most recent build runs, oldest first."""
+
+    create_profile_tables(conn)
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM {RUNS_TABLE} ORDER BY id DESC LIMIT %s", (count,)
+            )
+            return sorted(row[0] for row in cursor.fetchall())
+
+
+def get_step_seconds(conn, run_id: int) -> Dict[str, float]:
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"SELECT step, seconds FROM {STEPS_TABLE} WHERE run_id = %s", (run_id,)
+            )
+            return dict(cursor.fetchall())
+
+
+def compare_runs(
+    previous: Dict[str, float], latest: Dict[str, float]
+) -> List[StepComparison]:
+    """
+    Compare how long each step took in two runs, biggest slowdowns first,
+    e.g.:
+
+        >>> [c.step for c in compare_runs({'a': 1.0, 'b': 5.0}, {'a': 4.0, 'c': 1.0})]
+        ['a', 'c', 'b']
+    """
+
+    steps = list(latest) + [step for step in previous if step not in latest]
+    comparisons = [
+        StepComparison(step, previous.get(step), latest.get(step)) for step in steps
+    ]
+    return sorted(comparisons, key=lambda c: c.change, reverse=True)
+
+
+def format_comparison(comparisons: Sequence[StepComparison]) -> str:
+    """
+    Format step comparisons as a table, e.g.:
+
+        >>> print(format_comparison([StepComparison('load chi_311', 2.0, 5.0)]))
+        step                                previous     latest     change
+        load chi_311                           2.00s      5.00s     +3.00s (2.5x)
+    """
+
+    def secs(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.2f}s"
+
+    lines = [f"{'step':<32}{'previous':>12}{'latest':>11}{'change':>11}"]
+    for c in comparisons:
+        line = f"{c.step:<32}{secs(c.previous_seconds):>12}{secs(c.latest_seconds):>11}"
+        line += f"{c.change:>+10.2f}s"
+        if c.previous_seconds and c.latest_seconds:
+            line += f" ({c.latest_seconds / c.previous_seconds:.1f}x)"
+        lines.append(line)
+    return "\n".join(lines)
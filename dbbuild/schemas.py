@@ -0,0 +1,234 @@
+from typing import List, Optional
+
+from psycopg2 import sql
+
+BUILDS_TABLE = "wow_build_schemas"
+
+SCHEMA_PREFIX = "wow_build_"
+
+# How many activated builds we keep around, so we can roll back to them.
+DEFAULT_KEEP_BUILDS = 3
+
+
+def get_schema_name(build_id: int) -> str:
+    """
+    Return the name of the schema that the given build's derived tables
+    are written to, e.g.:
+
+        >>> get_schema_name(12)
+        'wow_build_12'
+    """
+
+    return f"{SCHEMA_PREFIX}{build_id}"
+
+
+def get_build_id(schema: str) -> int:
+    """
+    Return the id of the build whose derived tables are in the given
+    schema, e.g.:
+
+        >>> get_build_id('wow_build_12')
+        12
+    """
+
+    return int(schema[len(SCHEMA_PREFIX) :])
+
+
+def get_search_path(schema: str) -> str:
+    """
+    Return the search path that sees the given build's derived tables, as
+    well as the Chicago datasets they're built from, e.g.:
+
+        >>> get_search_path('wow_build_12')
+        'wow_build_12, public'
+    """
+
+    return f"{schema}, public"
+
+
+def create_builds_table(conn) -> None:
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS public.{BUILDS_TABLE} (
+                    id serial PRIMARY KEY,
+                    created_at timestamptz NOT NULL DEFAULT now(),
+                    activated_at timestamptz
+                )
+                """
+            )
+
+
+def create_build_schema(conn) -> str:
+    """Create an empty schema for a new build, and return its name."""
+
+    create_builds_table(conn)
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO public.{BUILDS_TABLE} DEFAULT VALUES RETURNING id"
+            )
+            schema = get_schema_name(cursor.fetchone()[0])
+            cursor.execute(sql.SQL("CREATE SCHEMA {}").format(sql.Identifier(schema)))
+    return schema
+
+
+def get_active_build_schema(conn) -> Optional[str]:
+    """Return the schema of the build the API is currently using, if any."""
+
+    create_builds_table(conn)
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT id FROM public.{BUILDS_TABLE}
+                WHERE activated_at IS NOT NULL
+                ORDER BY activated_at DESC
+                LIMIT 1
+                """
+            )
+            row = cursor.fetchone()
+    return get_schema_name(row[0]) if row else None
+
+
+def prewarm_build_schema(conn, schema: str) -> None:
+    """
+    Analyze the tables in the given build's schema, so the planner has
+    statistics for them as soon as they're live. If the pg_prewarm
+    extension is installed, also load the tables and their indexes into
+    the buffer cache.
+    """
+
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT c.oid::regclass::text, c.relkind
+                FROM pg_class AS c
+                WHERE c.relnamespace = %s::regnamespace AND c.relkind IN ('r', 'i')
+                ORDER BY c.relkind DESC, c.relname
+                """,
+                (schema,),
+            )
+            relations = cursor.fetchall()
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_prewarm'")
+            has_prewarm = cursor.fetchone() is not None
+            for name, relkind in relations:
+                if relkind == "r":
+                    cursor.execute(f"ANALYZE {name}")
+                if has_prewarm:
+                    cursor.execute("SELECT pg_prewarm(%s::regclass)", (name,))
+
+
+def activate_build_schema(conn, database: str, schema: str) -> None:
+    """
+    Point new connections to the database at the given build's schema.
+
+    Connections that are already open (and the queries running on them)
+    keep using the schema they started with, which is why we keep old
+    builds around for a while rather than dropping them right away.
+    """
+
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                sql.SQL("ALTER DATABASE {} SET search_path = {}, public").format(
+                    sql.Identifier(database), sql.Identifier(schema)
+                )
+            )
+            cursor.execute(
+                f"UPDATE public.{BUILDS_TABLE} SET activated_at = now() WHERE id = %s",
+                (get_build_id(schema),),
+            )
+
+
+def get_previous_build_schema(conn) -> Optional[str]:
+    """Return the schema of the last build activated before the active one."""
+
+    active = get_active_build_schema(conn)
+    if active is None:
+        return None
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT id FROM public.{BUILDS_TABLE}
+                WHERE activated_at IS NOT NULL AND id < %s
+                ORDER BY id DESC
+                LIMIT 1
+                """,
+                (get_build_id(active),),
+            )
+            row = cursor.fetchone()
+    return get_schema_name(row[0]) if row else None
+
+
+def get_unfinished_build_schema(conn) -> Optional[str]:
+    """
+    Return the schema of the most recent build that was started after the
+    active one, but never activated (e.g. because it failed), if any.
+    """
+
+    active = get_active_build_schema(conn)
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT id FROM public.{BUILDS_TABLE}
+                WHERE activated_at IS NULL AND id > %s
+                    AND to_regnamespace(%s || id) IS NOT NULL
+                ORDER BY id DESC
+                LIMIT 1
+                """,
+                (get_build_id(active) if active else 0, SCHEMA_PREFIX),
+            )
+            row = cursor.fetchone()
+    return get_schema_name(row[0]) if row else None
+
+
+def drop_old_build_schemas(conn, keep: int = DEFAULT_KEEP_BUILDS) -> List[str]:
+    """
+    Drop all but the `keep` most recently activated builds (always keeping
+    the active one), along with any builds that never finished, and return
+    the names of the dropped schemas.
+    """
+
+    active = get_active_build_schema(conn)
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT id FROM public.{BUILDS_TABLE}
+                WHERE activated_at IS NOT NULL
+                ORDER BY id DESC
+                LIMIT %s
+                """,
+                (max(keep, 1),),
+            )
+            kept = {get_schema_name(row[0]) for row in cursor.fetchall()}
+            if active:
+                kept.add(active)
+            cursor.execute(
+                f"SELECT id, activated_at IS NOT NULL FROM public.{BUILDS_TABLE} ORDER BY id"
+            )
+            dropped = []
+            for build_id, was_activated in cursor.fetchall():
+                schema = get_schema_name(build_id)
+                if schema in kept:
+                    continue
+                if not was_activated and (
+                    active is None or build_id > get_build_id(active)
+                ):
+                    # This build might still be in progress.
+                    continue
+                cursor.execute(
+                    sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(
+                        sql.Identifier(schema)
+                    )
+                )
+                cursor.execute(
+                    f"DELETE FROM public.{BUILDS_TABLE} WHERE id = %s", (build_id,)
+                )
+                dropped.append(schema)
+    return dropped
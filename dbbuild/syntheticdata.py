@@ -0,0 +1,498 @@
+import csv
+import functools
+import random
+import string
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, TextIO, Tuple
+
+# At a scale of 1, we generate about 1% of Cook County's parcels, so a scale
+# of 100 is about the size of the real thing.
+PARCELS_PER_SCALE = 18_000
+
+# How many rows of each event dataset there are for each parcel. At full
+# scale, that's tens of millions of 311 requests.
+VIOLATIONS_PER_PARCEL = 1.5
+REQUESTS_311_PER_PARCEL = 12.0
+PERMITS_PER_PARCEL = 0.3
+
+# The fraction of buildings that are condos, with a PIN for each unit, and
+# the most units a condo building can have.
+CONDO_RATE = 0.08
+MAX_CONDO_UNITS = 400
+
+# The fraction of parcels owned by landlords with (possibly) many buildings,
+# rather than by someone who owns just the one, and how many buildings
+# landlords own on average.
+LANDLORD_RATE = 0.35
+BUILDINGS_PER_LANDLORD = 40
+
+# The fraction of permits that apply to several PINs, and the most they
+# can apply to.
+MULTI_PIN_PERMIT_RATE = 0.1
+MAX_PERMIT_PINS = 100
+
+YEAR = 2024
+
+# How many buildings we remember, rather than working them out again each
+# time a row refers to one.
+BUILDING_CACHE_SIZE = 100_000
+FIRST_EVENT_DATE = datetime(2015, 1, 1)
+EVENT_SECONDS = 10 * 365 * 86400
+
+# fmt: off
+STREET_NAMES = [
+    "ASHLAND", "AUSTIN", "CALIFORNIA", "CENTRAL PARK", "CICERO", "CLARK",
+    "CLYBOURN", "DAMEN", "DIVISION", "ELSTON", "FULLERTON", "GRAND", "HALSTED",
+    "HARLEM", "IRVING PARK", "JEFFERY", "KEDZIE", "KOSTNER", "LAWRENCE",
+    "LINCOLN", "MADISON", "MICHIGAN", "MILWAUKEE", "MONTROSE", "NARRAGANSETT",
+    "NORTH", "PULASKI", "RACINE", "ROOSEVELT", "SHERIDAN", "STATE", "STONY ISLAND",
+    "WESTERN", "WOOD", "COTTAGE GROVE", "KING", "LOOMIS", "PAULINA", "WENTWORTH",
+    "ST LAWRENCE",
+]
+NUMBERED_STREETS = 130
+STREET_TYPES = ["AVE", "ST", "BLVD", "RD", "DR", "PL", "PKWY"]
+DIRECTIONS = ["N", "S", "E", "W"]
+
+COMMUNITY_AREAS = [
+    "AUSTIN", "AVONDALE", "BRIDGEPORT", "CHATHAM", "EDGEWATER", "HUMBOLDT PARK",
+    "HYDE PARK", "LAKE VIEW", "LINCOLN PARK", "LOGAN SQUARE", "LOOP",
+    "NEAR NORTH SIDE", "NEAR WEST SIDE", "PILSEN", "ROGERS PARK", "SOUTH SHORE",
+    "UPTOWN", "WEST TOWN", "WOODLAWN",
+]
+
+FIRST_NAMES = ["MARIA", "JAMES", "LATOYA", "JOSE", "MARY", "WEI", "DAVID", "ANA"]
+LAST_NAMES = ["GARCIA", "SMITH", "JOHNSON", "NGUYEN", "KOWALSKI", "BROWN", "PATEL"]
+LANDLORD_WORDS = [
+    "LAKESHORE", "PRAIRIE", "GOLD COAST", "MIDWEST", "WINDY CITY", "LAKEVIEW",
+    "PARKWAY", "CORNERSTONE", "HERITAGE", "SUMMIT", "BRICK", "GREYSTONE",
+]
+# fmt: on
+LANDLORD_SUFFIXES = ["LLC", "PROPERTIES LLC", "HOLDINGS LLC", "MGMT INC", "TRUST"]
+
+# The fraction of landlords' contacts that give a registered agent's address
+# rather than their own, and the registered agents' addresses, which
+# thousands of unrelated landlords share.
+REGISTERED_AGENT_RATE = 0.3
+REGISTERED_AGENTS = [
+    ("208 S LASALLE ST", "60604"),
+    ("120 N LASALLE ST", "60602"),
+    ("33 N LASALLE ST", "60602"),
+]
+AGENT_SUITES = ["", "STE 814", "SUITE 814", "STE 1700"]
+
+VIOLATION_CODES = [
+    ("CN132016", "MAINTAIN WINDOWS"),
+    ("CN190019", "ARRANGE PREMISE INSPECTION"),
+    ("CN070024", "REPAIR PORCH SYSTEM"),
+    ("CN133016", "FIX SMOKE DETECTORS"),
+    ("CN110018", "HEAT THE UNITS"),
+]
+VIOLATION_STATUSES = ["OPEN", "COMPLIED", "NO ENTRY"]
+REQUEST_TYPES = [
+    ("No Heat Complaint", "HDF"),
+    ("Building Violation", "BBA"),
+    ("Rodent Baiting/Rat Complaint", "SGA"),
+    ("Graffiti Removal Request", "GRAF"),
+    ("Pothole in Street Complaint", "PHF"),
+    ("Abandoned Vehicle Complaint", "SKA"),
+]
+PERMIT_TYPES = [
+    "PERMIT - RENOVATION/ALTERATION",
+    "PERMIT - ELECTRIC WIRING",
+    "PERMIT - EASY PERMIT PROCESS",
+    "PERMIT - WRECKING/DEMOLITION",
+    "PERMIT - NEW CONSTRUCTION",
+]
+
+# fmt: off
+PARCELS_HEADER = [
+    "pin", "pin10", "year", "class", "zip_code", "lon", "lat", "ward_num",
+    "chicago_community_area_name", "census_tract_geoid",
+]
+OWNERS_HEADER = [
+    "pin", "pin10", "year", "prop_address_full", "prop_address_city_name",
+    "prop_address_state", "prop_address_zipcode_1", "mail_address_name",
+    "mail_address_full", "mail_address_city_name", "mail_address_state",
+    "mail_address_zipcode_1", "row_id",
+]
+PERMITS_HEADER = [
+    "id", "permit_", "permit_status", "permit_type", "application_start_date",
+    "issue_date", "street_number", "street_direction", "street_name",
+    "work_description", "reported_cost", "pin_list", "latitude", "longitude",
+]
+VIOLATIONS_HEADER = [
+    "id", "violation_last_modified_date", "violation_date", "violation_code",
+    "violation_status", "violation_description", "address", "street_number",
+    "street_direction", "street_name", "street_type", "latitude", "longitude",
+]
+REQUESTS_311_HEADER = [
+    "sr_number", "sr_type", "sr_short_code", "status", "created_date",
+    "last_modified_date", "closed_date", "street_address", "city", "state",
+    "zip_code", "street_number", "street_direction", "street_name", "street_type",
+    "latitude", "longitude",
+]
+# fmt: on
+
+
+class Building(NamedTuple):
+    number: int
+    pin10: str
+    house: str
+    direction: str
+    street_name: str
+    street_type: str
+    zip_code: str
+    lat: float
+    lon: float
+    ward: str
+    community_area: str
+
+    @property
+    def address(self) -> str:
+        return " ".join(
+            [self.house, self.direction, self.street_name, self.street_type]
+        )
+
+
+def get_street(index: int) -> Tuple[str, str, str]:
+    """
+    Return the direction, name and type of the street with the given index,
+    e.g.:
+
+        >>> get_street(0)
+        ('N', 'ASHLAND', 'AVE')
+        >>> get_street(45)
+        ('S', '6TH', 'PL')
+    """
+
+    direction = DIRECTIONS[index % len(DIRECTIONS)]
+    count = len(STREET_NAMES)
+    if index % (count + NUMBERED_STREETS) < count:
+        name = STREET_NAMES[index % (count + NUMBERED_STREETS)]
+        return direction, name, STREET_TYPES[index % len(STREET_TYPES)]
+    number = index % (count + NUMBERED_STREETS) - count + 1
+    suffix = {1: "ST", 2: "ND", 3: "RD"}.get(number % 10, "TH")
+    if 10 <= number % 100 <= 20:
+        suffix = "TH"
+    return direction, f"{number}{suffix}", "ST" if number % 2 else "PL"
+
+
+@functools.lru_cache(maxsize=BUILDING_CACHE_SIZE)
+def get_building(index: int) -> Building:
+    """
+    Return the building with the given index. Everything about it is worked
+    out from its index, so rows of any dataset can refer to it without us
+    having to keep track of the buildings we've generated, e.g.:
+
+        >>> get_building(3).address
+        '100 W CENTRAL PARK RD'
+        >>> get_building(3).pin10
+        '1700000003'
+    """
+
+    streets = len(STREET_NAMES) + NUMBERED_STREETS
+    direction, street_name, street_type = get_street(index % streets)
+    block, lot = divmod(index // streets, 50)
+    house = 100 * (block + 1) + 2 * lot
+    return Building(
+        number=index,
+        pin10=f"{1700000000 + index:010d}",
+        house=str(house),
+        direction=direction,
+        street_name=street_name,
+        street_type=street_type,
+        zip_code=str(60601 + index % 60),
+        lat=round(41.65 + (index * 7919 % 35000) / 100000, 6),
+        lon=round(-87.9 + (index * 104729 % 35000) / 100000, 6),
+        ward=str(1 + index % 50),
+        community_area=COMMUNITY_AREAS[index % len(COMMUNITY_AREAS)],
+    )
+
+
+def get_landlord(index: int) -> Tuple[str, str]:
+    """
+    Return the name and mailing address of the landlord with the given
+    index, e.g.:
+
+        >>> get_landlord(13)
+        ('PRAIRIE 13 MGMT INC', '113 W MADISON ST')
+    """
+
+    word = LANDLORD_WORDS[index % len(LANDLORD_WORDS)]
+    suffix = LANDLORD_SUFFIXES[index % len(LANDLORD_SUFFIXES)]
+    return f"{word} {index} {suffix}", f"{100 + index} W MADISON ST"
+
+
+def pick_skewed(rng: random.Random, count: int, skew: float = 2.0) -> int:
+    """
+    Pick a number below the given count, where smaller numbers are much
+    likelier to be picked, so that e.g. a few landlords own most buildings.
+    """
+
+    return min(count - 1, int(count * rng.random() ** skew))
+
+
+def get_condo_units(rng: random.Random) -> int:
+    if rng.random() >= CONDO_RATE:
+        return 1
+    return min(MAX_CONDO_UNITS, 1 + int(rng.paretovariate(1.2) * 3))
+
+
+def get_event_date(rng: random.Random) -> datetime:
+    return FIRST_EVENT_DATE + timedelta(seconds=int(rng.random() * EVENT_SECONDS))
+
+
+def format_date(value: datetime) -> str:
+    return value.isoformat(timespec="seconds")
+
+
+def get_messy_street_name(rng: random.Random, building: Building) -> str:
+    """
+    Return the building's street name, sometimes written the way people
+    type it into forms, which address normalization has to cope with.
+    """
+
+    roll = rng.random()
+    if roll < 0.05:
+        return building.street_name.lower()
+    if roll < 0.07:
+        return building.street_name.title() + "."
+    return building.street_name
+
+
+def write_parcels_and_owners(
+    parcels_file: TextIO, owners_file: TextIO, scale: float, seed: int
+) -> Tuple[int, int]:
+    """
+    Write the parcels and owners CSVs, and return how many parcels and
+    buildings there are.
+    """
+
+    rng = random.Random(f"{seed}:parcels")
+    target = max(1, round(PARCELS_PER_SCALE * scale))
+    landlords = max(1, target // BUILDINGS_PER_LANDLORD)
+    parcels = csv.writer(parcels_file)
+    owners = csv.writer(owners_file)
+    parcels.writerow(PARCELS_HEADER)
+    owners.writerow(OWNERS_HEADER)
+    pins = 0
+    index = 0
+    while pins < target:
+        building = get_building(index)
+        units = min(get_condo_units(rng), target - pins)
+        landlord = pick_skewed(rng, landlords) if rng.random() < LANDLORD_RATE else None
+        for unit in range(units):
+            pin = building.pin10 + (f"{1000 + unit + 1:04d}" if units > 1 else "0000")
+            address = building.address + (f" UNIT {unit + 1}" if units > 1 else "")
+            parcels.writerow(
+                [
+                    pin,
+                    building.pin10,
+                    YEAR,
+                    "299" if units > 1 else rng.choice(["202", "203", "211", "212"]),
+                    building.zip_code,
+                    building.lon,
+                    building.lat,
+                    building.ward,
+                    building.community_area,
+                    f"17031{building.number % 8000:06d}",
+                ]
+            )
+            if landlord is not None:
+                owner_name, mail_address = get_landlord(landlord)
+                owner_id = f"LL{landlord}"
+            else:
+                # Some people who own one building have the same name.
+                owner_name = " ".join(
+                    [
+                        rng.choice(FIRST_NAMES),
+                        rng.choice(string.ascii_uppercase),
+                        rng.choice(LAST_NAMES),
+                    ]
+                )
+                mail_address = address
+                owner_id = f"IND{pins}"
+            owners.writerow(
+                [
+                    pin,
+                    building.pin10,
+                    YEAR,
+                    address,
+                    "CHICAGO",
+                    "IL",
+                    building.zip_code,
+                    owner_name,
+                    mail_address,
+                    "CHICAGO",
+                    "IL",
+                    "60602" if landlord is not None else building.zip_code,
+                    owner_id,
+                ]
+            )
+            pins += 1
+        index += 1
+    return pins, index
+
+
+def write_permits(f: TextIO, count: int, buildings: int, seed: int) -> None:
+    rng = random.Random(f"{seed}:permits")
+    writer = csv.writer(f)
+    writer.writerow(PERMITS_HEADER)
+    for i in range(count):
+        building = get_building(rng.randrange(buildings))
+        pins = 1
+        if rng.random() < MULTI_PIN_PERMIT_RATE:
+            pins = min(MAX_PERMIT_PINS, 1 + int(rng.paretovariate(1.1)))
+        pin_list = " | ".join(
+            get_building((building.number + offset) % buildings).pin10
+            for offset in range(pins)
+        )
+        started = get_event_date(rng)
+        issued = started + timedelta(days=rng.randrange(120))
+        writer.writerow(
+            [
+                str(100000 + i),
+                f"10{i:07d}",
+                rng.choice(["ACTIVE", "COMPLETE", "EXPIRED"]),
+                rng.choice(PERMIT_TYPES),
+                format_date(started),
+                format_date(issued),
+                building.house,
+                building.direction,
+                building.street_name,
+                "SYNTHETIC PERMIT",
+                rng.randrange(500, 500000),
+                pin_list,
+                building.lat,
+                building.lon,
+            ]
+        )
+
+
+def write_violations(f: TextIO, count: int, buildings: int, seed: int) -> None:
+    rng = random.Random(f"{seed}:violations")
+    writer = csv.writer(f)
+    writer.writerow(VIOLATIONS_HEADER)
+    for i in range(count):
+        # A few buildings get a lot of the violations.
+        building = get_building(pick_skewed(rng, buildings, skew=1.5))
+        code, description = rng.choice(VIOLATION_CODES)
+        date = get_event_date(rng)
+        modified = date + timedelta(days=rng.randrange(365))
+        house = building.house if rng.random() >= 0.01 else ""
+        writer.writerow(
+            [
+                str(1000000 + i),
+                format_date(modified),
+                format_date(date),
+                code,
+                rng.choice(VIOLATION_STATUSES),
+                description,
+                building.address,
+                house,
+                building.direction,
+                get_messy_street_name(rng, building),
+                building.street_type,
+                building.lat,
+                building.lon,
+            ]
+        )
+
+
+def write_311_requests(f: TextIO, count: int, buildings: int, seed: int) -> None:
+    rng = random.Random(f"{seed}:311")
+    writer = csv.writer(f)
+    writer.writerow(REQUESTS_311_HEADER)
+    for i in range(count):
+        building = get_building(pick_skewed(rng, buildings, skew=1.5))
+        sr_type, short_code = rng.choice(REQUEST_TYPES)
+        created = get_event_date(rng)
+        closed = created + timedelta(hours=rng.randrange(24 * 60))
+        is_open = rng.random() < 0.1
+        # Some requests, like potholes, aren't at a building's address.
+        has_address = rng.random() >= 0.03
+        writer.writerow(
+            [
+                f"SR{created.year % 100:02d}-{i:08d}",
+                sr_type,
+                short_code,
+                "Open" if is_open else "Completed",
+                format_date(created),
+                format_date(created if is_open else closed),
+                "" if is_open else format_date(closed),
+                building.address if has_address else "",
+                "CHICAGO",
+                "IL",
+                building.zip_code,
+                building.house if has_address else "",
+                building.direction if has_address else "",
+                get_messy_street_name(rng, building) if has_address else "",
+                building.street_type if has_address else "",
+                building.lat,
+                building.lon,
+            ]
+        )
+
+
+def iter_landlord_contacts(
+    count: int, seed: int = 0
+) -> Iterator[Tuple[str, int, str, str, str, str, str]]:
+    """
+    Yield rows of synthetic landlord contacts for the `wow_landlords` table
+    (see sql/create_landlords_table.sql), one for each of the given number
+    of buildings. Like the real ones, many share a common name or a
+    registered agent's address.
+    """
+
+    rng = random.Random(f"{seed}:landlords")
+    landlords = max(1, count // BUILDINGS_PER_LANDLORD)
+    for index in range(count):
+        building = get_building(index)
+        apt = ""
+        if rng.random() < LANDLORD_RATE:
+            name, street = get_landlord(pick_skewed(rng, landlords))
+            zip_code = "60602"
+            if rng.random() < REGISTERED_AGENT_RATE:
+                street, zip_code = rng.choice(REGISTERED_AGENTS)
+                apt = rng.choice(AGENT_SUITES)
+        else:
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            street = building.address
+            zip_code = building.zip_code
+            if rng.random() < 0.2:
+                apt = f"APT {rng.randrange(1, 4)}"
+        bizaddr = f"{street} {apt}".strip() + f", CHICAGO IL {zip_code}"
+        yield building.pin10, index, name, bizaddr, street, apt, zip_code
+
+
+def generate(out_dir: Path, scale: float, seed: int = 0) -> Dict[str, int]:
+    """
+    Write CSVs of synthetic Chicago datasets to the given directory, at the
+    given scale (see PARCELS_PER_SCALE), and return how many rows each has.
+
+    The datasets refer to each other the way the real ones do: owners and
+    permits by PIN, and violations and 311 requests by address. Rows are
+    written as they're generated, so memory use doesn't grow with the scale,
+    and the same seed always generates the same data.
+    """
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def open_csv(name: str) -> TextIO:
+        return (out_dir / f"{name}.csv").open("w", newline="")
+
+    with open_csv("chi_parcels") as parcels_file, open_csv("chi_owners") as owners:
+        parcels, buildings = write_parcels_and_owners(parcels_file, owners, scale, seed)
+    counts = {"chi_parcels": parcels, "chi_owners": parcels}
+    event_writers: List[Tuple[str, float, Callable[[TextIO, int, int, int], None]]] = [
+        ("chi_permits", PERMITS_PER_PARCEL, write_permits),
+        ("chi_violations", VIOLATIONS_PER_PARCEL, write_violations),
+        ("chi_311", REQUESTS_311_PER_PARCEL, write_311_requests),
+    ]
+    for name, rate, write in event_writers:
+        count = round(parcels * rate)
+        with open_csv(name) as f:
+            write(f, count, buildings, seed)
+        counts[name] = count
+    return counts
@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence
+
+from .casting import parse_timestamp
+
+WATERMARKS_TABLE = "chi_load_watermarks"
+
+
+def make_watermark_filter(
+    header: Sequence[str], column: str, watermark: datetime
+) -> Callable[[List[str]], bool]:
+    """
+    Return a function that tells whether a CSV row with the given header
+    might be new or changed since the given high-water mark, e.g.:
+
+        >>> is_new = make_watermark_filter(['id', 'modified'], 'modified',
+        ...                                datetime(2024, 1, 1))
+        >>> is_new(['1', '2023-12-31T23:59:59']), is_new(['2', '2024-01-01'])
+        (False, True)
+
+    Rows whose timestamp is missing or invalid are always considered new.
+    """
+
+    index = list(header).index(column)
+
+    def is_new(row: List[str]) -> bool:
+        value = row[index] if index < len(row) else ""
+        timestamp = parse_timestamp(value) if value else None
+        return timestamp is None or timestamp >= watermark
+
+    return is_new
+
+
+def create_watermarks_table(conn) -> None:
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {WATERMARKS_TABLE} (
+                    dataset text PRIMARY KEY,
+                    watermark_column text NOT NULL,
+                    high_water_mark timestamp,
+                    updated_at timestamptz NOT NULL DEFAULT now()
+                )
+                """
+            )
+
+
+def get_watermark(cursor, dataset: str, column: str) -> Optional[datetime]:
+    """
+    Return the latest value of the given column the last time the dataset
+    was loaded, if we know it.
+    """
+
+    cursor.execute(
+        f"""
+        SELECT high_water_mark FROM {WATERMARKS_TABLE}
+        WHERE dataset = %s AND watermark_column = %s
+        """,
+        (dataset, column),
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def save_watermark(cursor, dataset: str, table: str, column: str) -> None:
+    """Record the latest value of the given column in the dataset's table."""
+
+    cursor.execute(
+        f"""
+        INSERT INTO {WATERMARKS_TABLE} (dataset, watermark_column, high_water_mark)
+        SELECT %s, %s, max({column}) FROM {table}
+        ON CONFLICT (dataset) DO UPDATE SET
+            watermark_column = EXCLUDED.watermark_column,
+            high_water_mark = EXCLUDED.high_water_mark,
+            updated_at = now()
+        """,
+        (dataset, column),
+    )
@@ -2,14 +2,57 @@ import os
 import sys
 import argparse
 import csv
+import inspect
+import io
+import math
+import multiprocessing
+import tempfile
+import threading
 import time
 import yaml
-import tempfile
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Iterable, Literal
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Tuple,
+    Iterable,
+    Literal,
+    Sequence,
+    TextIO,
+)
 from urllib.parse import urlparse
 
+from dbbuild import (
+    addresses,
+    benchmark,
+    bridges,
+    casting,
+    checkpoints,
+    compression,
+    connpool,
+    csvsplit,
+    datastats,
+    executor,
+    indicators,
+    manifest,
+    partitions,
+    profiling,
+    schemas,
+    syntheticdata,
+    watermarks,
+)
+from dbbuild.csvstream import CsvProjection
+from portfoliograph import matching
 from portfoliograph.table import export_portfolios_table_json, populate_portfolios_table
 
 try:
@@ -25,10 +68,39 @@ ROOT_DIR = Path(__file__).parent.resolve()
 SQL_DIR = ROOT_DIR / "sql"
 WOW_YML = yaml.full_load((ROOT_DIR / "who-owns-what.yml").read_text())
 TESTS_DIR = ROOT_DIR / "tests"
+BUILD_REPORTS_DIR = ROOT_DIR / "build-reports"
+SYNTHETIC_DATA_DIR = ROOT_DIR / "data" / "synthetic"
+BENCHMARK_BASELINE = ROOT_DIR / "benchmarks" / "baseline.json"
+
+# The scales of synthetic data that `benchmarkdb` builds by default.
+BENCHMARK_SCALES = [0.25, 0.5, 1.0]
+
+# How many synthetic landlord contacts `benchmarkmatching` matches up by
+# default, and how many of them to insert at a time.
+MATCHING_BENCHMARK_LANDLORDS = 10_000
+MATCHING_BENCHMARK_PAGE_SIZE = 1000
+
+# How many bytes of CSV we hand to each COPY ... FROM STDIN write.
+COPY_BUFFER_SIZE = 64 * 1024
+
+# Uncompressed CSVs are split into parts of at least this many bytes, which
+# are loaded over separate connections at the same time (up to `--jobs`).
+COPY_SPLIT_SIZE = 256 * 1024 * 1024
+
+# The name of the build step that populates the wow_portfolios table.
+PORTFOLIOS_STEP = "populate_portfolios_table"
 
 # Just an alias for our database connection.
 DbConnection = Any
 
+# Session settings for the connections that load data and build tables.
+# Losing the last few commits in a crash is fine, since we'd rebuild anyway.
+BUILD_SESSION_SETTINGS = {
+    "work_mem": "256MB",
+    "maintenance_work_mem": "1GB",
+    "synchronous_commit": "off",
+}
+
 
 class DbContext(tuple):
     host: str
@@ -40,6 +112,10 @@ class DbContext(tuple):
     def __new__(cls, host: str, database: str, user: str, password: str, port: int):
         return super().__new__(cls, (host, database, user, password, port))
 
+    def __getnewargs__(self) -> Tuple[str, str, str, str, int]:
+        # So we can be pickled, and passed to other processes.
+        return (self.host, self.database, self.user, self.password, self.port)
+
     @property
     def host(self) -> str:
         return self[0]
@@ -92,23 +168,46 @@ class DbContext(tuple):
             port=self.port,
         )
 
-    def connection(self) -> DbConnection:
+    def connection(self, settings: Mapping[str, str] | None = None) -> DbConnection:
+        """
+        Open a new connection, whose session has the given settings (e.g.
+        `{"work_mem": "256MB"}`).
+        """
+
         import psycopg2
 
-        tries_left = 5
-        secs_between_tries = 2
+        kwargs = self.psycopg2_connect_kwargs()
+        if settings:
+            kwargs["options"] = connpool.get_options(settings)
+        return connpool.connect_with_backoff(lambda: psycopg2.connect(**kwargs))
+
+    def get_pool(
+        self,
+        settings: Mapping[str, str] | None = None,
+        max_size: int = connpool.DEFAULT_POOL_SIZE,
+    ) -> connpool.ConnectionPool:
+        """
+        Return the shared pool of connections whose sessions have the given
+        settings, making sure it can hold at least `max_size` connections.
+        """
 
-        def connect():
-            return psycopg2.connect(**self.psycopg2_connect_kwargs())
+        key = (self, tuple(sorted((settings or {}).items())))
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                pool = _POOLS[key] = connpool.ConnectionPool(
+                    lambda: self.connection(settings), max_size
+                )
+        pool.grow(max_size)
+        return pool
 
-        while tries_left > 1:
-            try:
-                return connect()
-            except psycopg2.OperationalError:
-                print("Failed to connect to db, retrying...")
-                time.sleep(secs_between_tries)
-                tries_left -= 1
-        return connect()
+    def close_pools(self) -> None:
+        """Close the idle connections of all this database's pools."""
+
+        with _POOLS_LOCK:
+            pools = [pool for (db, _), pool in _POOLS.items() if db == self]
+        for pool in pools:
+            pool.closeall()
 
     def get_pg_env_and_args(self) -> Tuple[Dict[str, str], List[str]]:
         env = os.environ.copy()
@@ -117,14 +216,67 @@ class DbContext(tuple):
         return (env, args)
 
 
+_POOLS: Dict[Tuple[DbContext, Tuple[Tuple[str, str], ...]], connpool.ConnectionPool] = {}
+
+_POOLS_LOCK = threading.Lock()
+
+
 @dataclass(frozen=True)
 class DatasetSpec:
     name: str
     table: str
     csv_filename: str
+    # Column names and SQL types. Values that can't be cast to their column's
+    # type are loaded as NULL and reported in chi_load_rejects.
     columns: List[Tuple[str, str]]
+    # The column(s) that identify a record, and the timestamp column that
+    # says when it was last modified. Datasets with both are loaded
+    # incrementally, by upserting the rows modified since the last load.
     primary_key: str | None = None
+    watermark_column: str | None = None
+    # Index definitions, e.g. "pin, year DESC NULLS LAST".
+    indexes: List[str] = field(default_factory=list)
+    # The timestamp column to partition the table by, if any, and how much
+    # time each partition covers. Rows without a value in the column go in
+    # the table's default partition.
+    partition_by: str | None = None
+    partition_interval: partitions.PartitionInterval = "month"
+    # The most a column can be empty, as a fraction of rows, before the load
+    # fails, e.g. {"pin": 0.0} if every row needs a PIN.
+    max_empty_rates: Dict[str, float] = field(default_factory=dict)
+    # The columns the table's address_key is computed from as it's loaded:
+    # either the house number, direction, street name and street type, or a
+    # single full address (see dbbuild/addresses.py).
+    address_columns: List[str] = field(default_factory=list)
+    # Tables with a row for each value of the dataset's list columns, which
+    # are rebuilt whenever it's loaded.
+    bridge_tables: List[bridges.BridgeTable] = field(default_factory=list)
 
+    @property
+    def primary_key_columns(self) -> List[str]:
+        """The columns that identify a record."""
+
+        return [name.strip() for name in (self.primary_key or "").split(",") if name]
+
+    @property
+    def key_columns(self) -> List[str]:
+        """
+        The columns of the table's unique key. Postgres requires the unique
+        indexes of a partitioned table to include its partition column.
+        """
+
+        columns = self.primary_key_columns
+        if columns and self.partition_by and self.partition_by not in columns:
+            columns.append(self.partition_by)
+        return columns
+
+
+STREET_ADDRESS_COLUMNS = [
+    "street_number",
+    "street_direction",
+    "street_name",
+    "street_type",
+]
 
 DATASETS: Dict[str, DatasetSpec] = {
     "chi_parcels": DatasetSpec(
@@ -134,7 +286,7 @@ DATASETS: Dict[str, DatasetSpec] = {
         columns=[
             ("pin", "text"),
             ("pin10", "text"),
-            ("year", "text"),
+            ("year", "integer"),
             ("class", "text"),
             ("triad_name", "text"),
             ("triad_code", "text"),
@@ -143,10 +295,10 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("nbhd_code", "text"),
             ("tax_code", "text"),
             ("zip_code", "text"),
-            ("lon", "text"),
-            ("lat", "text"),
-            ("x_3435", "text"),
-            ("y_3435", "text"),
+            ("lon", "numeric"),
+            ("lat", "numeric"),
+            ("x_3435", "numeric"),
+            ("y_3435", "numeric"),
             ("census_block_group_geoid", "text"),
             ("census_block_geoid", "text"),
             ("census_congressional_district_geoid", "text"),
@@ -163,7 +315,7 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("census_state_senate_num", "text"),
             ("census_tract_geoid", "text"),
             ("census_zcta_geoid", "text"),
-            ("census_data_year", "text"),
+            ("census_data_year", "integer"),
             ("census_acs5_congressional_district_geoid", "text"),
             ("census_acs5_congressional_district_num", "text"),
             ("census_acs5_county_subdivision_geoid", "text"),
@@ -177,47 +329,47 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("census_acs5_state_senate_geoid", "text"),
             ("census_acs5_state_senate_num", "text"),
             ("census_acs5_tract_geoid", "text"),
-            ("census_acs5_data_year", "text"),
+            ("census_acs5_data_year", "integer"),
             ("cook_board_of_review_district_num", "text"),
-            ("cook_board_of_review_district_data_year", "text"),
+            ("cook_board_of_review_district_data_year", "integer"),
             ("cook_commissioner_district_num", "text"),
-            ("cook_commissioner_district_data_year", "text"),
+            ("cook_commissioner_district_data_year", "integer"),
             ("cook_judicial_district_num", "text"),
-            ("cook_judicial_district_data_year", "text"),
+            ("cook_judicial_district_data_year", "integer"),
             ("cook_municipality_num", "text"),
             ("cook_municipality_name", "text"),
-            ("cook_municipality_data_year", "text"),
+            ("cook_municipality_data_year", "integer"),
             ("ward_num", "text"),
-            ("ward_chicago_data_year", "text"),
-            ("ward_evanston_data_year", "text"),
+            ("ward_chicago_data_year", "integer"),
+            ("ward_evanston_data_year", "integer"),
             ("chicago_community_area_num", "text"),
             ("chicago_community_area_name", "text"),
-            ("chicago_community_area_data_year", "text"),
+            ("chicago_community_area_data_year", "integer"),
             ("chicago_industrial_corridor_num", "text"),
             ("chicago_industrial_corridor_name", "text"),
-            ("chicago_industrial_corridor_data_year", "text"),
+            ("chicago_industrial_corridor_data_year", "integer"),
             ("chicago_police_district_num", "text"),
-            ("chicago_police_district_data_year", "text"),
+            ("chicago_police_district_data_year", "integer"),
             ("econ_coordinated_care_area_num", "text"),
-            ("econ_coordinated_care_area_data_year", "text"),
+            ("econ_coordinated_care_area_data_year", "integer"),
             ("econ_enterprise_zone_num", "text"),
-            ("econ_enterprise_zone_data_year", "text"),
+            ("econ_enterprise_zone_data_year", "integer"),
             ("econ_industrial_growth_zone_num", "text"),
-            ("econ_industrial_growth_zone_data_year", "text"),
+            ("econ_industrial_growth_zone_data_year", "integer"),
             ("econ_qualified_opportunity_zone_num", "text"),
-            ("econ_qualified_opportunity_zone_data_year", "text"),
+            ("econ_qualified_opportunity_zone_data_year", "integer"),
             ("econ_central_business_district_num", "text"),
-            ("econ_central_business_district_data_year", "text"),
+            ("econ_central_business_district_data_year", "integer"),
             ("env_flood_fema_sfha", "text"),
-            ("env_flood_fema_data_year", "text"),
+            ("env_flood_fema_data_year", "integer"),
             ("env_flood_fs_factor", "text"),
             ("env_flood_fs_risk_direction", "text"),
-            ("env_flood_fs_data_year", "text"),
-            ("env_ohare_noise_contour_no_buffer_bool", "text"),
-            ("env_ohare_noise_contour_half_mile_buffer_bool", "text"),
-            ("env_ohare_noise_contour_data_year", "text"),
-            ("env_airport_noise_dnl", "text"),
-            ("env_airport_noise_data_year", "text"),
+            ("env_flood_fs_data_year", "integer"),
+            ("env_ohare_noise_contour_no_buffer_bool", "boolean"),
+            ("env_ohare_noise_contour_half_mile_buffer_bool", "boolean"),
+            ("env_ohare_noise_contour_data_year", "integer"),
+            ("env_airport_noise_dnl", "numeric"),
+            ("env_airport_noise_data_year", "integer"),
             ("school_elementary_district_geoid", "text"),
             ("school_elementary_district_name", "text"),
             ("school_secondary_district_geoid", "text"),
@@ -225,7 +377,7 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("school_unified_district_geoid", "text"),
             ("school_unified_district_name", "text"),
             ("school_school_year", "text"),
-            ("school_data_year", "text"),
+            ("school_data_year", "integer"),
             ("tax_municipality_num", "text"),
             ("tax_municipality_name", "text"),
             ("tax_school_elementary_district_num", "text"),
@@ -248,15 +400,17 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("tax_special_service_area_name", "text"),
             ("tax_tif_district_num", "text"),
             ("tax_tif_district_name", "text"),
-            ("tax_data_year", "text"),
+            ("tax_data_year", "integer"),
             ("access_cmap_walk_id", "text"),
-            ("access_cmap_walk_nta_score", "text"),
-            ("access_cmap_walk_total_score", "text"),
-            ("access_cmap_walk_data_year", "text"),
+            ("access_cmap_walk_nta_score", "numeric"),
+            ("access_cmap_walk_total_score", "numeric"),
+            ("access_cmap_walk_data_year", "integer"),
             ("misc_subdivision_id", "text"),
-            ("misc_subdivision_data_year", "text"),
+            ("misc_subdivision_data_year", "integer"),
             ("row_id", "text"),
         ],
+        indexes=["pin, year DESC NULLS LAST"],
+        max_empty_rates={"pin": 0.0},
     ),
     "chi_owners": DatasetSpec(
         name="chi_owners",
@@ -265,7 +419,7 @@ DATASETS: Dict[str, DatasetSpec] = {
         columns=[
             ("pin", "text"),
             ("pin10", "text"),
-            ("year", "text"),
+            ("year", "integer"),
             ("prop_address_full", "text"),
             ("prop_address_city_name", "text"),
             ("prop_address_state", "text"),
@@ -276,7 +430,11 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("mail_address_state", "text"),
             ("mail_address_zipcode_1", "text"),
             ("row_id", "text"),
+            ("address_key", "text"),
         ],
+        indexes=["pin, year DESC NULLS LAST"],
+        max_empty_rates={"pin": 0.0},
+        address_columns=["prop_address_full"],
     ),
     "chi_permits": DatasetSpec(
         name="chi_permits",
@@ -289,31 +447,31 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("permit_milestone", "text"),
             ("permit_type", "text"),
             ("review_type", "text"),
-            ("application_start_date", "text"),
-            ("issue_date", "text"),
-            ("processing_time", "text"),
+            ("application_start_date", "timestamp"),
+            ("issue_date", "timestamp"),
+            ("processing_time", "integer"),
             ("street_number", "text"),
             ("street_direction", "text"),
             ("street_name", "text"),
             ("work_type", "text"),
             ("work_description", "text"),
             ("permit_condition", "text"),
-            ("building_fee_paid", "text"),
-            ("zoning_fee_paid", "text"),
-            ("other_fee_paid", "text"),
-            ("subtotal_paid", "text"),
-            ("building_fee_unpaid", "text"),
-            ("zoning_fee_unpaid", "text"),
-            ("other_fee_unpaid", "text"),
-            ("subtotal_unpaid", "text"),
-            ("building_fee_waived", "text"),
-            ("building_fee_subtotal", "text"),
-            ("zoning_fee_subtotal", "text"),
-            ("other_fee_subtotal", "text"),
-            ("zoning_fee_waived", "text"),
-            ("other_fee_waived", "text"),
-            ("subtotal_waived", "text"),
-            ("total_fee", "text"),
+            ("building_fee_paid", "numeric"),
+            ("zoning_fee_paid", "numeric"),
+            ("other_fee_paid", "numeric"),
+            ("subtotal_paid", "numeric"),
+            ("building_fee_unpaid", "numeric"),
+            ("zoning_fee_unpaid", "numeric"),
+            ("other_fee_unpaid", "numeric"),
+            ("subtotal_unpaid", "numeric"),
+            ("building_fee_waived", "numeric"),
+            ("building_fee_subtotal", "numeric"),
+            ("zoning_fee_subtotal", "numeric"),
+            ("other_fee_subtotal", "numeric"),
+            ("zoning_fee_waived", "numeric"),
+            ("other_fee_waived", "numeric"),
+            ("subtotal_waived", "numeric"),
+            ("total_fee", "numeric"),
             ("contact_1_type", "text"),
             ("contact_1_name", "text"),
             ("contact_1_city", "text"),
@@ -389,17 +547,28 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("contact_15_city", "text"),
             ("contact_15_state", "text"),
             ("contact_15_zipcode", "text"),
-            ("reported_cost", "text"),
+            ("reported_cost", "numeric"),
             ("pin_list", "text"),
             ("community_area", "text"),
             ("census_tract", "text"),
             ("ward", "text"),
-            ("xcoordinate", "text"),
-            ("ycoordinate", "text"),
-            ("latitude", "text"),
-            ("longitude", "text"),
+            ("xcoordinate", "numeric"),
+            ("ycoordinate", "numeric"),
+            ("latitude", "numeric"),
+            ("longitude", "numeric"),
             ("location", "text"),
         ],
+        partition_by="issue_date",
+        partition_interval="year",
+        bridge_tables=[
+            bridges.BridgeTable(
+                table="chi_permit_pins",
+                key_column="id",
+                bridge_key_column="permit_id",
+                list_column="pin_list",
+                value_column="pin10",
+            )
+        ],
     ),
     "chi_violations": DatasetSpec(
         name="chi_violations",
@@ -407,11 +576,11 @@ DATASETS: Dict[str, DatasetSpec] = {
         csv_filename="chi_violations.csv",
         columns=[
             ("id", "text"),
-            ("violation_last_modified_date", "text"),
-            ("violation_date", "text"),
+            ("violation_last_modified_date", "timestamp"),
+            ("violation_date", "timestamp"),
             ("violation_code", "text"),
             ("violation_status", "text"),
-            ("violation_status_date", "text"),
+            ("violation_status_date", "timestamp"),
             ("violation_description", "text"),
             ("violation_location", "text"),
             ("violation_inspector_comments", "text"),
@@ -429,10 +598,16 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("street_type", "text"),
             ("property_group", "text"),
             ("ssa", "text"),
-            ("latitude", "text"),
-            ("longitude", "text"),
+            ("latitude", "numeric"),
+            ("longitude", "numeric"),
             ("location", "text"),
+            ("address_key", "text"),
         ],
+        primary_key="id",
+        watermark_column="violation_last_modified_date",
+        indexes=["violation_date", "address_key"],
+        partition_by="violation_date",
+        address_columns=STREET_ADDRESS_COLUMNS,
     ),
     "chi_311": DatasetSpec(
         name="chi_311",
@@ -446,9 +621,9 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("owner_department", "text"),
             ("status", "text"),
             ("origin", "text"),
-            ("created_date", "text"),
-            ("last_modified_date", "text"),
-            ("closed_date", "text"),
+            ("created_date", "timestamp"),
+            ("last_modified_date", "timestamp"),
+            ("closed_date", "timestamp"),
             ("street_address", "text"),
             ("city", "text"),
             ("state", "text"),
@@ -457,8 +632,8 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("street_direction", "text"),
             ("street_name", "text"),
             ("street_type", "text"),
-            ("duplicate", "text"),
-            ("legacy_record", "text"),
+            ("duplicate", "boolean"),
+            ("legacy_record", "boolean"),
             ("legacy_sr_number", "text"),
             ("parent_sr_number", "text"),
             ("community_area", "text"),
@@ -470,15 +645,21 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("police_beat", "text"),
             ("precinct", "text"),
             ("sanitation_division_days", "text"),
-            ("created_hour", "text"),
-            ("created_day_of_week", "text"),
-            ("created_month", "text"),
-            ("x_coordinate", "text"),
-            ("y_coordinate", "text"),
-            ("latitude", "text"),
-            ("longitude", "text"),
+            ("created_hour", "integer"),
+            ("created_day_of_week", "integer"),
+            ("created_month", "integer"),
+            ("x_coordinate", "numeric"),
+            ("y_coordinate", "numeric"),
+            ("latitude", "numeric"),
+            ("longitude", "numeric"),
             ("location", "text"),
+            ("address_key", "text"),
         ],
+        primary_key="sr_number",
+        watermark_column="last_modified_date",
+        indexes=["created_date", "address_key"],
+        partition_by="created_date",
+        address_columns=STREET_ADDRESS_COLUMNS,
     ),
     "chi_geographies": DatasetSpec(
         name="chi_geographies",
@@ -492,10 +673,10 @@ DATASETS: Dict[str, DatasetSpec] = {
             ("edit_date", "text"),
             ("globalid", "text"),
             ("objectid", "text"),
-            ("shape_area", "text"),
-            ("shape_len", "text"),
-            ("st_area_sh", "text"),
-            ("st_length_", "text"),
+            ("shape_area", "numeric"),
+            ("shape_len", "numeric"),
+            ("st_area_sh", "numeric"),
+            ("st_length_", "numeric"),
             ("the_geom", "text"),
             ("ward", "text"),
             ("ward_id", "text"),
@@ -505,15 +686,111 @@ DATASETS: Dict[str, DatasetSpec] = {
 }
 
 
+class CopyPlan(NamedTuple):
+    """How to COPY the rows of a CSV with a given header into a table."""
+
+    sql: str
+    header: List[str]
+    columns: List[Tuple[str, str]]
+    checks: List[Tuple[str, Callable[[str], bool]]]
+    row_filter: Callable[[List[str]], bool] | None
+    derived_columns: List[Tuple[str, Callable[[List[str]], str]]]
+    needs_projection: bool
+
+    def get_source(self, f: TextIO) -> Tuple[Any, CsvProjection | None]:
+        """
+        Return what to pass to `copy_expert()` to COPY the rest of the given
+        file, and the projection it's streamed through, if any.
+        """
+
+        if not self.needs_projection:
+            return f, None
+        projection = CsvProjection(
+            f,
+            self.header,
+            [name for name, _ in self.columns],
+            checks=self.checks,
+            row_filter=self.row_filter,
+            derived_columns=self.derived_columns,
+        )
+        return projection, projection
+
+
+class CopyResult(NamedTuple):
+    content_hash: str
+    rows: int
+    rejected_rows: int
+    rejects: List[casting.Reject]
+
+
+class CopyRangeResult(NamedTuple):
+    rows: int
+    rejected_rows: int
+    rejects: List[casting.Reject]
+    # How many rows of the CSV were read, including the ones left out.
+    rows_read: int
+
+
+def copy_csv_range(
+    db: DbContext,
+    spec: DatasetSpec,
+    csv_path: Path,
+    header: List[str],
+    table: str,
+    watermark: datetime | None,
+    start: int,
+    end: int,
+) -> CopyRangeResult:
+    """
+    COPY the records in the given byte range of the dataset's CSV into the
+    given table, over (this process's) pooled build connection. This is run
+    in worker processes, so it takes everything it needs as arguments.
+    """
+
+    plan = ChiDbBuilder.get_copy_plan(spec, csv_path, header, table, watermark)
+    with db.get_pool(BUILD_SESSION_SETTINGS).connection() as conn:
+        with conn:
+            with conn.cursor() as cursor:
+                # The same settings the rest of the load uses.
+                cursor.execute("SET LOCAL search_path = public")
+                cursor.execute("SET LOCAL datestyle = 'ISO, MDY'")
+                with csv_path.open("rb") as raw:
+                    f = io.TextIOWrapper(
+                        io.BufferedReader(csvsplit.ByteRangeReader(raw, start, end)),
+                        newline="",
+                    )
+                    source, projection = plan.get_source(f)
+                    cursor.copy_expert(plan.sql, source, size=COPY_BUFFER_SIZE)
+                if projection is None:
+                    return CopyRangeResult(cursor.rowcount, 0, [], cursor.rowcount)
+                return CopyRangeResult(
+                    cursor.rowcount,
+                    projection.rejected_rows,
+                    projection.rejects,
+                    projection.row_number,
+                )
+
+
 class ChiDbBuilder:
     db: DbContext
     conn: DbConnection
     data_dir: Path
     is_testing: bool
-
-    def __init__(self, db: DbContext, is_testing: bool, data_dir: Path | None = None) -> None:
+    jobs: int
+    profiler: profiling.BuildProfiler | None
+
+    def __init__(
+        self,
+        db: DbContext,
+        is_testing: bool,
+        data_dir: Path | None = None,
+        jobs: int = 1,
+    ) -> None:
         self.db = db
         self.is_testing = is_testing
+        # We need a connection to find out how many jobs we can run.
+        self.jobs = 1
+        self.profiler = None
 
         if data_dir is None:
             if is_testing:
@@ -523,7 +800,55 @@ class ChiDbBuilder:
         data_dir.mkdir(parents=True, exist_ok=True)
         self.data_dir = data_dir
 
-        self.conn = db.connection()
+        self.conn = self.get_pool().getconn()
+        # The database's default search path points at the active build's
+        # schema, but the Chicago datasets themselves always live in public.
+        self.set_search_path("public")
+        self.jobs = self.get_max_jobs(max(jobs, 1))
+
+    def get_pool(self) -> connpool.ConnectionPool:
+        """
+        Return the pool of build connections. Each dataset being loaded at
+        once can be split into parts loaded over their own connections, so
+        there's room for twice as many connections as jobs (plus ours).
+        """
+
+        return self.db.get_pool(BUILD_SESSION_SETTINGS, max_size=2 * self.jobs + 1)
+
+    def get_max_jobs(self, jobs: int) -> int:
+        """
+        Return how many of the given jobs we can run at once, without the
+        pool of build connections needing more than the database has free.
+        """
+
+        with self.conn:
+            with self.conn.cursor() as cursor:
+                free = connpool.get_free_connections(cursor)
+        # The pool's own connections are already counted as taken.
+        max_jobs = max((free + self.get_pool().size - 1) // 2, 1)
+        if max_jobs < jobs:
+            print(
+                f"Running {max_jobs} jobs at once, since the database only has "
+                f"{free} free connections."
+            )
+        return min(jobs, max_jobs)
+
+    def close(self) -> None:
+        """Return our connection to the pool."""
+
+        self.get_pool().putconn(self.conn)
+
+    def profile_step(
+        self, name: str, tables: Sequence[str] = ()
+    ) -> ContextManager[profiling.StepProfile]:
+        if self.profiler is None:
+            return nullcontext(profiling.StepProfile(name))
+        return self.profiler.step(name, self.conn, tables)
+
+    def set_search_path(self, search_path: str) -> None:
+        with self.conn:
+            with self.conn.cursor() as cursor:
+                cursor.execute(f"SET search_path = {search_path}")
 
     def do_tables_exist(self, *names: str) -> bool:
         with self.conn:
@@ -540,107 +865,743 @@ class ChiDbBuilder:
                 with self.conn.cursor() as cursor:
                     cursor.execute(f"DROP TABLE IF EXISTS {name}")
 
-    def create_table(self, spec: DatasetSpec) -> None:
+    def get_create_table_sql(
+        self,
+        spec: DatasetSpec,
+        table: str | None = None,
+        unlogged: bool = False,
+        partitioned: bool = False,
+    ) -> str:
         column_defs = [f"{name} {sql_type}" for name, sql_type in spec.columns]
-        if spec.primary_key:
-            column_defs.append(f"PRIMARY KEY ({spec.primary_key})")
         columns_sql = ",\n    ".join(column_defs)
-        sql = f"""
-        CREATE TABLE IF NOT EXISTS {spec.table} (
+        unlogged_sql = "UNLOGGED " if unlogged else ""
+        partition_sql = f" PARTITION BY RANGE ({spec.partition_by})" if partitioned else ""
+        return f"""
+        CREATE {unlogged_sql}TABLE IF NOT EXISTS {table or spec.table} (
             {columns_sql}
-        );
+        ){partition_sql};
         """
+
+    def create_indexes(
+        self, cursor, spec: DatasetSpec, table: str | None = None
+    ) -> None:
+        table = table or spec.table
+        if spec.key_columns:
+            # This is a unique index rather than a primary key constraint,
+            # since some records (and our test fixtures) don't have keys.
+            cursor.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_key "
+                f"ON {table} ({', '.join(spec.key_columns)})"
+            )
+        for i, index_sql in enumerate(spec.indexes):
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_idx{i} ON {table} ({index_sql})"
+            )
+
+    def create_table(self, spec: DatasetSpec) -> None:
         with self.conn:
             with self.conn.cursor() as cursor:
-                cursor.execute(sql)
+                cursor.execute(
+                    self.get_create_table_sql(spec, partitioned=bool(spec.partition_by))
+                )
+                if spec.partition_by:
+                    partitions.create_default_partition(cursor, spec.table)
+                self.create_indexes(cursor, spec)
+                for bridge in spec.bridge_tables:
+                    bridges.rebuild_bridge_table(cursor, bridge, spec.table)
+
+    def does_table_match_spec(self, spec: DatasetSpec) -> bool:
+        """Return whether the dataset's table exists with the columns and types in its spec."""
 
-    def load_csv(self, spec: DatasetSpec) -> None:
-        csv_path = self.data_dir / spec.csv_filename
-        if not csv_path.exists():
-            print(f"Skipping {spec.name}: {csv_path.name} not found in {self.data_dir}.")
-            return
+        if not self.do_tables_exist(spec.table):
+            return False
+        with self.conn:
+            with self.conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT attname, format_type(atttypid, atttypmod)
+                    FROM pg_attribute
+                    WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+                    ORDER BY attnum
+                    """,
+                    (spec.table,),
+                )
+                actual = cursor.fetchall()
+                cursor.execute(
+                    "SELECT t::regtype::text FROM unnest(%s::text[]) WITH ORDINALITY AS t "
+                    "ORDER BY ordinality",
+                    ([sql_type for _, sql_type in spec.columns],),
+                )
+                expected_types = [row[0] for row in cursor.fetchall()]
+                cursor.execute("SELECT pg_get_partkeydef(%s::regclass)", (spec.table,))
+                partition_key = cursor.fetchone()[0]
+        expected = [(name, t) for (name, _), t in zip(spec.columns, expected_types)]
+        expected_partition_key = (
+            f"RANGE ({spec.partition_by})" if spec.partition_by else None
+        )
+        return actual == expected and partition_key == expected_partition_key
+
+    def swap_in_staging_table(self, cursor, spec: DatasetSpec, staging: str) -> None:
+        """
+        Replace the dataset's table with the given staging table. Since this
+        happens in the loading transaction, readers of the table see either
+        the old data or the new data, and are only blocked while we commit.
+        """
+
+        cursor.execute(f"DROP TABLE IF EXISTS {spec.table}")
+        cursor.execute(f"ALTER TABLE {staging} RENAME TO {spec.table}")
+        # Rename the staging table's indexes and partitions (and their
+        # indexes) along with it.
+        cursor.execute(
+            """
+            SELECT relname, relkind IN ('i', 'I') FROM pg_class
+            WHERE relnamespace = current_schema()::regnamespace
+            AND starts_with(relname, %s)
+            """,
+            (f"{staging}_",),
+        )
+        for name, is_index in cursor.fetchall():
+            new_name = spec.table + name[len(staging) :]
+            kind = "INDEX" if is_index else "TABLE"
+            cursor.execute(f"ALTER {kind} {name} RENAME TO {new_name}")
+
+    def create_staging_table(
+        self, cursor, spec: DatasetSpec, csv_path: Path, staging: str, incremental: bool
+    ) -> None:
+        """
+        Create the staging table that the dataset's CSV is copied into.
+
+        Incremental loads are upserted from an unlogged table, which is
+        dropped afterwards. Full reloads are copied into a logged table
+        that's swapped in as it is, so their rows are only written once;
+        if the dataset is partitioned, so is the table, with the
+        partitions that the CSV's rows need.
+        """
+
+        partitioned = bool(spec.partition_by) and not incremental
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        cursor.execute(
+            self.get_create_table_sql(
+                spec, staging, unlogged=incremental, partitioned=partitioned
+            )
+        )
+        if partitioned:
+            assert spec.partition_by
+            with csv_path.open("rb") as raw:
+                f = io.TextIOWrapper(
+                    compression.open_decompressed(raw, csv_path), newline=""
+                )
+                periods = partitions.get_csv_periods(
+                    f, spec.partition_by, spec.partition_interval
+                )
+            partitions.create_period_partitions(
+                cursor, staging, spec.partition_interval, periods
+            )
+
+    @staticmethod
+    def get_copy_plan(
+        spec: DatasetSpec,
+        csv_path: Path,
+        header: List[str] | None,
+        table: str,
+        watermark: datetime | None = None,
+    ) -> CopyPlan:
+        if not header:
+            raise ValueError(f"{csv_path} is missing a CSV header row.")
+
+        column_types = dict(spec.columns)
+        derived_columns = []
+        if (
+            spec.address_columns
+            and "address_key" not in header
+            and all(name in header for name in spec.address_columns)
+        ):
+            get_address_key = addresses.make_address_key_getter(
+                header, spec.address_columns
+            )
+            derived_columns.append(("address_key", get_address_key))
+        source_columns = header + [name for name, _ in derived_columns]
+        columns_to_load = [name for name in source_columns if name in column_types]
+        if not columns_to_load:
+            raise ValueError(f"{csv_path} has no columns matching table {spec.table}.")
+
+        columns = ",".join(columns_to_load)
+        checks = []
+        for name in columns_to_load:
+            check = casting.get_validator(column_types[name])
+            if check:
+                checks.append((name, check))
+        copy_options = "FORMAT csv"
+        if checks:
+            # Treat quoted empty strings as NULL too, rather than
+            # failing to cast them.
+            typed_columns = ",".join(name for name, _ in checks)
+            copy_options += f", FORCE_NULL ({typed_columns})"
+        row_filter = None
+        if watermark is not None and spec.watermark_column in header:
+            row_filter = watermarks.make_watermark_filter(
+                header, spec.watermark_column, watermark
+            )
+
+        return CopyPlan(
+            sql=f"COPY {table} ({columns}) FROM STDIN WITH ({copy_options})",
+            header=header,
+            columns=[(name, column_types[name]) for name in columns_to_load],
+            checks=checks,
+            row_filter=row_filter,
+            derived_columns=derived_columns,
+            # Legacy fixtures can include columns that are no longer present
+            # in the table schema, typed columns need their values checked,
+            # incremental loads only want new rows, and some columns (like
+            # address keys) are computed; in those cases we stream only the
+            # rows and columns we want.
+            needs_projection=bool(
+                len(columns_to_load) != len(header)
+                or checks
+                or row_filter
+                or derived_columns
+            ),
+        )
+
+    def get_copy_parts(self, csv_path: Path) -> int:
+        """
+        Return how many parts to split the given CSV into, to COPY them at
+        the same time. Compressed files have to be read from the start, so
+        they're never split.
+        """
+
+        if self.jobs <= 1 or csv_path.suffix in compression.COMPRESSED_SUFFIXES:
+            return 1
+        return min(self.jobs, math.ceil(csv_path.stat().st_size / COPY_SPLIT_SIZE))
+
+    def copy_csv(
+        self,
+        cursor,
+        spec: DatasetSpec,
+        csv_path: Path,
+        table: str,
+        watermark: datetime | None = None,
+    ) -> CopyResult:
+        """
+        COPY the dataset's CSV into the given table. If a watermark is
+        given, only rows that were modified since then (going by the spec's
+        watermark column) are copied.
 
-        expected_column_set = {name for name, _ in spec.columns}
+        Big CSVs are split into parts that are copied over their own
+        connections (and transactions), so the table needs to have been
+        committed beforehand.
+        """
+
+        parts = self.get_copy_parts(csv_path)
+        if parts > 1:
+            return self.copy_csv_in_parts(spec, csv_path, table, watermark, parts)
+
+        with csv_path.open("rb") as raw:
+            # We hash the file as it's stored, and decompress it (if
+            # needed) as it's streamed into the database.
+            hashed = manifest.HashingReader(raw)
+            decompressed = compression.open_decompressed(
+                io.BufferedReader(hashed), csv_path
+            )
+            f = io.TextIOWrapper(decompressed, newline="")
+            header = next(csv.reader(f), None)
+            plan = self.get_copy_plan(spec, csv_path, header, table, watermark)
+            source, projection = plan.get_source(f)
+            cursor.copy_expert(plan.sql, source, size=COPY_BUFFER_SIZE)
+        return CopyResult(
+            content_hash=hashed.hexdigest(),
+            rows=cursor.rowcount,
+            rejected_rows=projection.rejected_rows if projection else 0,
+            rejects=projection.rejects if projection else [],
+        )
+
+    def copy_csv_in_parts(
+        self,
+        spec: DatasetSpec,
+        csv_path: Path,
+        table: str,
+        watermark: datetime | None,
+        parts: int,
+    ) -> CopyResult:
+        """
+        COPY the dataset's CSV into the given table by splitting it into
+        byte ranges on record boundaries, and copying each one over its own
+        connection at the same time.
+        """
+
+        with csv_path.open("rb") as raw:
+            hashed = manifest.HashingReader(raw)
+            ranges = csvsplit.find_record_ranges(
+                io.BufferedReader(hashed), csv_path.stat().st_size, parts
+            )
+        with csv_path.open(newline="") as f:
+            header = next(csv.reader(f), None)
+        # Each worker makes its own plan, but this fails early if the CSV
+        # can't be loaded at all.
+        plan = self.get_copy_plan(spec, csv_path, header, table, watermark)
+        print(f"Loading {csv_path.name} in {len(ranges)} parts.")
+
+        # Projecting and checking rows is CPU-bound Python, so each part is
+        # copied in a process of its own, over its own connection. We wait
+        # for room for one connection, but only use as many more as are free.
+        with self.get_pool().reserve(len(ranges)) as workers:
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        copy_csv_range,
+                        self.db,
+                        spec,
+                        csv_path,
+                        plan.header,
+                        table,
+                        watermark,
+                        start,
+                        end,
+                    )
+                    for start, end in ranges
+                ]
+                results = [future.result() for future in futures]
+
+        rows = rejected_rows = rows_before = 0
+        rejects: List[casting.Reject] = []
+        for result in results:
+            rows += result.rows
+            # Each part numbers its rows from the start of the part.
+            rejected_rows += result.rejected_rows
+            rejects.extend(
+                reject._replace(row_number=reject.row_number + rows_before)
+                for reject in result.rejects
+            )
+            rows_before += result.rows_read
+        return CopyResult(
+            content_hash=hashed.hexdigest(),
+            rows=rows,
+            rejected_rows=rejected_rows,
+            rejects=rejects[: casting.MAX_SAVED_REJECTS],
+        )
+
+    def get_watermark(self, spec: DatasetSpec) -> datetime | None:
+        """
+        Return the dataset's high-water mark, if it can be loaded
+        incrementally, i.e. upserted by its primary key.
+        """
+
+        if not (spec.primary_key and spec.watermark_column):
+            return None
         with self.conn:
             with self.conn.cursor() as cursor:
-                cursor.execute(f"TRUNCATE {spec.table}")
-                with csv_path.open("r", newline="") as f:
-                    header = next(csv.reader(f), None)
-                    if not header:
-                        raise ValueError(f"{csv_path} is missing a CSV header row.")
-
-                    columns_to_load = [name for name in header if name in expected_column_set]
-                    if not columns_to_load:
-                        raise ValueError(
-                            f"{csv_path} has no columns matching table {spec.table}."
+                cursor.execute("SELECT to_regclass(%s)", (f"{spec.table}_key",))
+                if cursor.fetchone()[0] is None:
+                    return None
+                return watermarks.get_watermark(cursor, spec.name, spec.watermark_column)
+
+    def upsert_from_staging(self, cursor, spec: DatasetSpec, staging: str) -> int:
+        """
+        Insert the rows in the given staging table into the dataset's table,
+        replacing the existing rows with the same primary keys, and return
+        how many rows were upserted. Rows without primary keys can't be
+        matched up, so they're skipped.
+
+        Rows are matched up by their primary key alone, rather than the
+        table's unique key, since a row's partition column can be corrected
+        (moving it to another partition), or be missing.
+        """
+
+        assert spec.primary_key_columns and spec.watermark_column
+        key_sql = ", ".join(spec.primary_key_columns)
+        columns_sql = ", ".join(name for name, _ in spec.columns)
+        match_sql = " AND ".join(f"t.{name} = s.{name}" for name in spec.primary_key_columns)
+        if spec.partition_by:
+            partitions.create_partitions(
+                cursor, spec.table, spec.partition_by, spec.partition_interval, staging
+            )
+        cursor.execute(
+            f"""
+            DELETE FROM {spec.table} AS t USING {staging} AS s
+            WHERE {match_sql}
+            """
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {spec.table} ({columns_sql})
+            SELECT DISTINCT ON ({key_sql}) {columns_sql}
+            FROM {staging}
+            WHERE ({key_sql}) IS NOT NULL
+            ORDER BY {key_sql}, {spec.watermark_column} DESC NULLS LAST
+            """
+        )
+        return cursor.rowcount
+
+    def load_csv(
+        self,
+        spec: DatasetSpec,
+        force_reload: bool = False,
+        profile: profiling.StepProfile | None = None,
+    ) -> None:
+        """
+        Load the dataset's CSV into a staging table with no indexes, then
+        index and analyze it, and swap it in for the dataset's table.
+
+        If the dataset has a primary key and watermark column, and was loaded
+        before, only the rows modified since its high-water mark are loaded,
+        and they're upserted into the dataset's table instead.
+        """
+
+        csv_path = compression.find_data_file(self.data_dir, spec.csv_filename)
+        if csv_path is None:
+            print(f"Skipping {spec.name}: {spec.csv_filename} not found in {self.data_dir}.")
+            return
+
+        column_signature = manifest.get_column_signature(spec.columns)
+        watermark = None
+        if not force_reload:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    entry = manifest.get_manifest_entry(cursor, spec.name)
+            if manifest.is_unchanged(entry, csv_path, column_signature):
+                print(f"Skipping {spec.name}: {csv_path.name} is unchanged since last load.")
+                return
+            if entry and entry.column_signature == column_signature:
+                watermark = self.get_watermark(spec)
+
+        staging = f"{spec.table}__staging"
+        stat = csv_path.stat()
+        # A table that's created in the same transaction as its COPY isn't
+        # WAL-logged (with wal_level = minimal), so we only commit it up
+        # front when big CSVs are copied into it over several connections.
+        create_in_load = self.get_copy_parts(csv_path) == 1
+        if not create_in_load:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    self.create_staging_table(
+                        cursor, spec, csv_path, staging, watermark is not None
+                    )
+        try:
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    if create_in_load:
+                        self.create_staging_table(
+                            cursor, spec, csv_path, staging, watermark is not None
+                        )
+                    # Our date validation assumes US-style dates are month-first.
+                    cursor.execute("SET LOCAL datestyle = 'ISO, MDY'")
+                    result = self.copy_csv(cursor, spec, csv_path, staging, watermark)
+                    stats = datastats.gather_stats(cursor, staging, spec.columns)
+                    datastats.save_stats(cursor, spec.name, stats)
+                    problems = stats.find_problems(spec.max_empty_rates)
+                    if problems:
+                        raise datastats.DataQualityError(spec.name, problems, stats)
+
+                    casting.save_rejects(cursor, spec.name, result.rejects)
+                    if result.rejected_rows:
+                        print(
+                            f"Loaded values that don't match their column types as NULL "
+                            f"in {result.rejected_rows} rows of {csv_path.name}; "
+                            f"see the {casting.REJECTS_TABLE} table for details."
                         )
 
-                    columns = ",".join(columns_to_load)
-                    has_unknown_columns = len(columns_to_load) != len(header)
-                    f.seek(0)
-
-                    if has_unknown_columns:
-                        # Legacy fixtures can include columns that are no longer
-                        # present in the table schema; write a filtered CSV stream.
-                        reader = csv.DictReader(f)
-                        with tempfile.NamedTemporaryFile(mode="w+", newline="") as filtered:
-                            writer = csv.DictWriter(filtered, fieldnames=columns_to_load)
-                            writer.writeheader()
-                            for row in reader:
-                                writer.writerow({name: row.get(name, "") for name in columns_to_load})
-                            filtered.seek(0)
-                            cursor.copy_expert(
-                                f"COPY {spec.table} ({columns}) FROM STDIN WITH CSV HEADER",
-                                filtered,
+                    # Keep track of what changed, so that refreshing the
+                    # indicators only has to recompute the affected ones.
+                    is_indicator_dataset = spec.name in indicators.INDICATOR_DATASETS
+                    if watermark is not None:
+                        if is_indicator_dataset:
+                            indicators.record_upserted_addresses(
+                                cursor,
+                                spec.name,
+                                spec.table,
+                                staging,
+                                spec.primary_key_columns,
                             )
+                        rows_upserted = self.upsert_from_staging(cursor, spec, staging)
+                        cursor.execute(f"DROP TABLE {staging}")
+                        cursor.execute(f"ANALYZE {spec.table}")
+                        print(
+                            f"Upserted {rows_upserted} rows of {spec.name} modified "
+                            f"since {watermark}."
+                        )
+                        if profile:
+                            profile.add_rows(rows_upserted)
                     else:
-                        cursor.copy_expert(
-                            f"COPY {spec.table} ({columns}) FROM STDIN WITH CSV HEADER",
-                            f,
+                        self.create_indexes(cursor, spec, staging)
+                        cursor.execute(f"ANALYZE {staging}")
+                        self.swap_in_staging_table(cursor, spec, staging)
+                        if (
+                            is_indicator_dataset
+                            and spec.name not in indicators.PIN10_BRIDGE_DATASETS
+                        ):
+                            indicators.record_reload(cursor, spec.name)
+                        if profile:
+                            profile.add_rows(result.rows)
+                    for bridge in spec.bridge_tables:
+                        with indicators.record_bridge_changes(cursor, spec.name, bridge):
+                            bridges.rebuild_bridge_table(cursor, bridge, spec.table)
+
+                    if spec.watermark_column:
+                        watermarks.save_watermark(
+                            cursor, spec.name, spec.table, spec.watermark_column
                         )
+                    manifest.save_manifest_entry(
+                        cursor,
+                        manifest.ManifestEntry(
+                            dataset=spec.name,
+                            file_size=stat.st_size,
+                            file_mtime=stat.st_mtime,
+                            content_hash=result.content_hash,
+                            column_signature=column_signature,
+                        ),
+                    )
+        except datastats.DataQualityError as e:
+            # The load was rolled back, but we keep the statistics that
+            # show what's wrong with the data.
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    datastats.save_stats(cursor, spec.name, e.stats)
+            raise
         print(f"Loaded {spec.name} from {csv_path.name}.")
 
     def ensure_dataset(self, name: str, force_refresh: bool = False) -> None:
         spec = DATASETS[name]
         print(f"Ensuring Chicago dataset '{name}' is loaded...")
 
-        if force_refresh:
-            self.drop_tables(spec.table)
+        manifest.create_manifest_table(self.conn)
+        casting.create_rejects_table(self.conn)
+        watermarks.create_watermarks_table(self.conn)
+        datastats.create_stats_table(self.conn)
+        indicators.create_changes_table(self.conn)
+
+        # Loading always builds a fresh table from the spec, so a missing or
+        # outdated table just means the CSV can't be skipped.
+        is_table_current = self.does_table_match_spec(spec)
+        if self.do_tables_exist(spec.table) and not is_table_current:
+            print(f"The columns of {spec.table} have changed, so it will be re-created.")
+        # Bridge tables are built as the dataset is loaded, so if one is
+        # missing the CSV can't be skipped either.
+        bridge_tables = [bridge.table for bridge in spec.bridge_tables]
+        are_bridges_current = self.do_tables_exist(*bridge_tables)
+        tables = [spec.table] + bridge_tables
+        with self.profile_step(f"load {name}", tables=tables) as profile:
+            self.load_csv(
+                spec,
+                force_reload=force_refresh
+                or not is_table_current
+                or not are_bridges_current,
+                profile=profile,
+            )
 
-        if not self.do_tables_exist(spec.table):
+        if not self.do_tables_exist(spec.table, *bridge_tables):
+            # There was no CSV to load, but our SQL still expects the tables.
             self.create_table(spec)
 
-        if not self.is_testing or force_refresh:
-            self.load_csv(spec)
-        else:
-            # For tests, always load from fixtures if present.
-            self.load_csv(spec)
+    def load_datasets(self, names: List[str], force_refresh: bool = False) -> None:
+        """
+        Load the given datasets, running up to `self.jobs` loads at once.
+
+        The datasets don't depend on each other, so each worker thread gets
+        its own builder (and therefore its own database connection). This
+        returns only once every load has finished, and re-raises the first
+        error encountered.
+        """
+
+        jobs = min(self.jobs, len(names))
+        if jobs <= 1:
+            for name in names:
+                self.ensure_dataset(name, force_refresh=force_refresh)
+            return
 
-    def run_sql_file(self, sqlpath: Path) -> None:
-        sql = sqlpath.read_text()
+        print(f"Loading {len(names)} datasets using {jobs} workers.")
+        manifest.create_manifest_table(self.conn)
+        casting.create_rejects_table(self.conn)
+        watermarks.create_watermarks_table(self.conn)
+        datastats.create_stats_table(self.conn)
+        indicators.create_changes_table(self.conn)
+        local = threading.local()
+        workers: List[ChiDbBuilder] = []
+        workers_lock = threading.Lock()
+
+        def load(name: str) -> None:
+            worker = getattr(local, "builder", None)
+            if worker is None:
+                # Big CSVs can still be split into parts, each loaded over
+                # its own connection.
+                worker = ChiDbBuilder(self.db, self.is_testing, self.data_dir, self.jobs)
+                worker.profiler = self.profiler
+                local.builder = worker
+                with workers_lock:
+                    workers.append(worker)
+            worker.ensure_dataset(name, force_refresh=force_refresh)
+
+        try:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(load, name) for name in names]
+                for future in futures:
+                    future.result()
+        finally:
+            for worker in workers:
+                worker.close()
+
+    def get_datasets_fingerprint(self) -> str:
+        """
+        Return a fingerprint of the datasets as they were last loaded, which
+        changes whenever any of them are loaded with different data.
+        """
+
+        parts = []
         with self.conn:
             with self.conn.cursor() as cursor:
-                cursor.execute(sql)
+                for name in get_dataset_dependencies(for_api=True):
+                    entry = manifest.get_manifest_entry(cursor, name)
+                    if entry:
+                        parts += [name, entry.content_hash, entry.column_signature]
+                    else:
+                        parts += [name, "missing"]
+        return checkpoints.get_fingerprint(*parts)
+
+    def get_build_steps(self) -> List[executor.BuildStep]:
+        """
+        Return the steps that build our derived tables and functions from
+        the Chicago datasets.
+        """
+
+        def populate_portfolios(conn, profile: profiling.StepProfile) -> None:
+            with conn:
+                profile.add_rows(populate_portfolios_table(conn, jobs=self.jobs))
+
+        pre_sql = get_sqlfile_paths("pre")
+        post_sql = get_sqlfile_paths("post")
+        names = [path.name for path in pre_sql]
+        names += [PORTFOLIOS_STEP] + [path.name for path in post_sql]
+        dependencies = executor.resolve_dependencies(
+            names, WOW_YML.get("wow_sql_dependencies", {})
+        )
+        steps = [executor.sql_file_step(p, dependencies[p.name]) for p in pre_sql]
+        steps.append(
+            executor.BuildStep(
+                PORTFOLIOS_STEP,
+                populate_portfolios,
+                dependencies[PORTFOLIOS_STEP],
+                tables=["wow_portfolios"],
+                source=inspect.getsource(populate_portfolios_table),
+            )
+        )
+        steps += [executor.sql_file_step(p, dependencies[p.name]) for p in post_sql]
+        return steps
+
+    def build(
+        self,
+        force_refresh: bool,
+        keep_builds: int = schemas.DEFAULT_KEEP_BUILDS,
+        report_dir: Path | None = None,
+        resume: bool = False,
+    ) -> None:
+        """
+        Load the Chicago datasets, then build our derived tables and
+        functions in a new build schema, and switch the API over to it.
+
+        Each step is profiled, and the profile is saved to the build_runs
+        and build_steps tables, as well as a JSON report in `report_dir`.
+
+        Completed steps are checkpointed, so if `resume` is true and a
+        previous build failed, we continue that build instead, skipping
+        the steps whose inputs haven't changed since they were completed.
+        """
 
-    def build(self, force_refresh: bool) -> None:
         if self.is_testing:
             print("Loading the database with Chicago test data.")
         else:
             print("Loading the database with Chicago data (this could take a while).")
 
-        for dataset in get_dataset_dependencies(for_api=True):
-            self.ensure_dataset(dataset, force_refresh=force_refresh)
+        self.profiler = profiling.BuildProfiler()
+        schema: str | None = None
+        status = "failed"
+        try:
+            self.load_datasets(
+                get_dataset_dependencies(for_api=True), force_refresh=force_refresh
+            )
+            # The new build's indicators count everything loaded so far.
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    last_change_id = indicators.get_last_change_id(cursor)
 
-        for sqlpath in get_sqlfile_paths("pre"):
-            print(f"Running {sqlpath.name}...")
-            self.run_sql_file(sqlpath)
+            # Extensions must stay in public, so they outlive the build schemas.
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public")
 
-        with self.conn:
-            populate_portfolios_table(self.conn)
+            if resume:
+                schema = schemas.get_unfinished_build_schema(self.conn)
+            if schema:
+                print(f"Resuming the build in {schema}.")
+            else:
+                schema = schemas.create_build_schema(self.conn)
+                print(f"Building derived tables in {schema}.")
+            build_checkpoints = checkpoints.Checkpoints(
+                self.conn, schema, inputs=self.get_datasets_fingerprint()
+            )
+            search_path = schemas.get_search_path(schema)
+
+            def connect_to_build() -> DbConnection:
+                conn = self.get_pool().getconn()
+                with conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(f"SET search_path = {search_path}")
+                return conn
+
+            executor.run_steps(
+                self.get_build_steps(),
+                connect_to_build,
+                release=self.get_pool().putconn,
+                jobs=self.jobs,
+                profiler=self.profiler,
+                checkpoints=build_checkpoints,
+            )
+
+            print(f"Pre-warming {schema}...")
+            with self.profile_step("prewarm"):
+                schemas.prewarm_build_schema(self.conn, schema)
+
+            schemas.activate_build_schema(self.conn, self.db.database, schema)
+            # Pooled sessions would otherwise keep using the old search path.
+            self.db.close_pools()
+            print(f"The API now uses {schema}.")
+            with self.conn:
+                with self.conn.cursor() as cursor:
+                    indicators.clear_changes(cursor, last_change_id)
+            for dropped in schemas.drop_old_build_schemas(self.conn, keep=keep_builds):
+                print(f"Dropped old build schema {dropped}.")
+            status = "succeeded"
+        finally:
+            run_id = self.profiler.save(self.conn, status, schema, report_dir)
+            print(f"Saved the profile of build run {run_id}.")
+            self.profiler = None
+
+    def refresh_indicators(self, full: bool = False) -> int:
+        """
+        Load the datasets that our indicators count, then update the
+        indicators in the active build that they changed, and return how
+        many parcels' indicators were recomputed.
+        """
+
+        self.load_datasets(indicators.INDICATOR_DATASETS)
+        if schemas.get_active_build_schema(self.conn) is None:
+            raise ValueError("There is no build to refresh the indicators of.")
+        # New sessions use the active build's search path.
+        with self.get_pool().connection() as conn:
+            with conn:
+                with conn.cursor() as cursor:
+                    return indicators.refresh_indicators(cursor, full=full)
+
+    def find_stale_indicators(self) -> List[str]:
+        """
+        Return the PINs whose indicators in the active build don't match
+        what a full rebuild would compute.
+        """
 
-        for sqlpath in get_sqlfile_paths("post"):
-            print(f"Running {sqlpath.name}...")
-            self.run_sql_file(sqlpath)
+        with self.get_pool().connection() as conn:
+            with conn:
+                with conn.cursor() as cursor:
+                    return indicators.find_stale_indicators(cursor)
 
 
 def get_dataset_dependencies(for_api: bool) -> List[str]:
@@ -668,6 +1629,203 @@ def dbshell(db: DbContext):
     sys.exit(retval)
 
 
+def buildreport(db: DbContext):
+    conn = db.connection()
+    run_ids = profiling.get_latest_run_ids(conn, 2)
+    if len(run_ids) < 2:
+        print("There need to be at least two build runs to compare.")
+        sys.exit(1)
+    previous, latest = run_ids
+    print(f"Comparing how long each step of build run {latest} took to run {previous}.\n")
+    comparisons = profiling.compare_runs(
+        profiling.get_step_seconds(conn, previous),
+        profiling.get_step_seconds(conn, latest),
+    )
+    print(profiling.format_comparison(comparisons))
+
+
+def rollbackdb(db: DbContext):
+    conn = db.connection()
+    schema = schemas.get_previous_build_schema(conn)
+    if schema is None:
+        print("There is no previous build to roll back to.")
+        sys.exit(1)
+    schemas.activate_build_schema(conn, db.database, schema)
+    print(f"The API now uses {schema}.")
+
+
+def refreshindicators(db: DbContext, jobs: int, full: bool, verify: bool):
+    builder = ChiDbBuilder(db, is_testing=False, jobs=jobs)
+    try:
+        recomputed = builder.refresh_indicators(full=full)
+        print(f"Recomputed the indicators of {recomputed} parcels.")
+        if verify:
+            stale = builder.find_stale_indicators()
+            if stale:
+                print(
+                    f"The indicators of {len(stale)} parcels are stale, "
+                    f"e.g. {stale[0]}."
+                )
+                sys.exit(1)
+            print("The indicators match a full rebuild.")
+    finally:
+        builder.close()
+
+
+def generatedata(out_dir: Path, scale: float, seed: int):
+    counts = syntheticdata.generate(out_dir, scale, seed=seed)
+    for name, count in counts.items():
+        print(f"Wrote {count} rows to {out_dir / name}.csv.")
+
+
+@contextmanager
+def scratch_database(db: DbContext, name: str) -> Iterator[DbContext]:
+    """
+    Create an empty database with the given name on the same server as the
+    given one (replacing any left over from before), and drop it afterwards.
+    """
+
+    scratch = DbContext(db.host, name, db.user, db.password, db.port)
+    conn = db.connection()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+            cursor.execute(f"CREATE DATABASE {name}")
+        try:
+            yield scratch
+        finally:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+    finally:
+        conn.close()
+
+
+def benchmark_build(
+    db: DbContext, data_dir: Path, scale: float, parcels: int, jobs: int
+) -> benchmark.ScaleResult:
+    """
+    Build the database from the synthetic data (at the given scale) in the
+    given directory, and return how long it and each of its steps took.
+    This is meant to be run in a process of its own, so that the peak
+    memory is the build's alone.
+    """
+
+    builder = ChiDbBuilder(db, is_testing=False, data_dir=data_dir, jobs=jobs)
+    try:
+        temp_bytes_before = profiling.get_temp_bytes(builder.conn)
+        start = time.perf_counter()
+        builder.build(force_refresh=True)
+        seconds = time.perf_counter() - start
+        temp_bytes_after = profiling.get_temp_bytes(builder.conn)
+        (run_id,) = profiling.get_latest_run_ids(builder.conn, count=1)
+        steps = profiling.get_step_seconds(builder.conn, run_id)
+    finally:
+        builder.close()
+    return benchmark.ScaleResult(
+        scale=scale,
+        parcels=parcels,
+        seconds=seconds,
+        peak_memory_bytes=benchmark.get_peak_memory_bytes(),
+        temp_bytes=(
+            None
+            if temp_bytes_before is None or temp_bytes_after is None
+            else temp_bytes_after - temp_bytes_before
+        ),
+        steps=steps,
+    )
+
+
+def run_benchmark(
+    db: DbContext, scales: Sequence[float], seed: int, jobs: int
+) -> List[benchmark.ScaleResult]:
+    """
+    Build synthetic data at each of the given scales, each in a scratch
+    database of its own, and return how the builds went.
+    """
+
+    results = []
+    for scale in sorted(scales):
+        with tempfile.TemporaryDirectory() as dirname:
+            data_dir = Path(dirname)
+            print(f"Generating synthetic data at scale {scale:g}...")
+            counts = syntheticdata.generate(data_dir, scale, seed=seed)
+            with scratch_database(db, f"{db.database}_benchmark") as scratch:
+                with ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn")
+                ) as pool:
+                    result = pool.submit(
+                        benchmark_build,
+                        scratch,
+                        data_dir,
+                        scale,
+                        counts["chi_parcels"],
+                        jobs,
+                    ).result()
+        print(f"Built scale {scale:g} in {result.seconds:.2f}s.")
+        results.append(result)
+    return results
+
+
+def benchmarkdb(
+    db: DbContext,
+    scales: Sequence[float],
+    seed: int,
+    jobs: int,
+    baseline_path: Path,
+    save_baseline: bool,
+    tolerances: benchmark.Tolerances,
+    report_dir: Path,
+):
+    results = run_benchmark(db, scales, seed=seed, jobs=jobs)
+    print(benchmark.format_scaling_curve(results))
+    report_path = report_dir / f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+    benchmark.save_results(report_path, results)
+    print(f"Wrote benchmark results to {report_path}.")
+    if save_baseline:
+        benchmark.save_results(baseline_path, results)
+        print(f"Saved the results as the baseline in {baseline_path}.")
+        return
+    baseline = []
+    if baseline_path.exists():
+        baseline = benchmark.load_results(baseline_path)
+    else:
+        print(f"There is no baseline in {baseline_path} to compare with.")
+    regressions = benchmark.find_regressions(results, baseline, tolerances)
+    for regression in regressions:
+        print(regression)
+    if regressions:
+        sys.exit(1)
+    print("No regressions found.")
+
+
+def benchmarkmatching(db: DbContext, landlords: int, seed: int):
+    """
+    Match up synthetic landlord contacts in a scratch database with both
+    landlords_with_connections.sql and portfoliograph/matching.py, and
+    print how they compare.
+    """
+
+    from psycopg2.extras import execute_values
+
+    with scratch_database(db, f"{db.database}_benchmark") as scratch:
+        conn = scratch.connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute((SQL_DIR / "create_landlords_table.sql").read_text())
+                execute_values(
+                    cursor,
+                    "INSERT INTO wow_landlords VALUES %s",
+                    syntheticdata.iter_landlord_contacts(landlords, seed),
+                    page_size=MATCHING_BENCHMARK_PAGE_SIZE,
+                )
+            print(f"Matching {landlords} synthetic landlord contacts...")
+            results = matching.benchmark_matching(conn)
+        finally:
+            conn.close()
+    print(matching.format_matching_results(results))
+
+
 def loadtestdata(db: DbContext):
     ChiDbBuilder(db, is_testing=True).build(force_refresh=True)
 
@@ -697,16 +1855,214 @@ if __name__ == "__main__":
         "--update",
         action="store_true",
         help=(
-            "Delete tables for the datasets so they can be re-installed."
+            "Reload the datasets, even if their CSVs haven't changed since "
+            "they were last loaded."
+        ),
+    )
+    parser_builddb.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help=(
+            "Maximum number of datasets to load at once. Defaults to the CPU "
+            "count, and is limited by the database's free connections."
+        ),
+    )
+    parser_builddb.add_argument(
+        "--keep-builds",
+        type=int,
+        default=schemas.DEFAULT_KEEP_BUILDS,
+        help=(
+            "Number of builds to keep for rolling back to, including the new one. "
+            f"Defaults to {schemas.DEFAULT_KEEP_BUILDS}."
+        ),
+    )
+    parser_builddb.add_argument(
+        "--report-dir",
+        type=Path,
+        default=BUILD_REPORTS_DIR,
+        help="Directory to write the build's JSON profile to. Defaults to build-reports/.",
+    )
+    parser_builddb.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Continue the last build if it failed, skipping the steps that it "
+            "completed whose inputs haven't changed since."
         ),
     )
+    parser_builddb.add_argument(
+        "--data-dir",
+        type=Path,
+        default=None,
+        help="Directory to load the datasets' CSVs from. Defaults to data/.",
+    )
     parser_builddb.set_defaults(cmd="builddb")
 
+    parser_generatedata = subparsers.add_parser("generatedata")
+    parser_generatedata.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help=(
+            "Size of the data, where 1 is about 1%% of Cook County's parcels "
+            "and 100 is about all of them. Defaults to 1."
+        ),
+    )
+    parser_generatedata.add_argument(
+        "--out-dir",
+        type=Path,
+        default=SYNTHETIC_DATA_DIR,
+        help="Directory to write the CSVs to. Defaults to data/synthetic/.",
+    )
+    parser_generatedata.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed. The same seed always generates the same data.",
+    )
+    parser_generatedata.set_defaults(cmd="generatedata")
+
+    parser_refreshindicators = subparsers.add_parser("refreshindicators")
+    parser_refreshindicators.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help=(
+            "Maximum number of datasets to load at once. Defaults to the CPU "
+            "count, and is limited by the database's free connections."
+        ),
+    )
+    parser_refreshindicators.add_argument(
+        "--full",
+        action="store_true",
+        help="Recompute the indicators of every parcel, not just the changed ones.",
+    )
+    parser_refreshindicators.add_argument(
+        "--verify",
+        action="store_true",
+        help="Afterwards, check that the indicators match a full rebuild.",
+    )
+    parser_refreshindicators.set_defaults(cmd="refreshindicators")
+
+    parser_benchmarkdb = subparsers.add_parser("benchmarkdb")
+    parser_benchmarkdb.add_argument(
+        "--scales",
+        type=float,
+        nargs="+",
+        default=BENCHMARK_SCALES,
+        help=(
+            "Scales of synthetic data to build (see generatedata). "
+            f"Defaults to {' '.join(format(s, 'g') for s in BENCHMARK_SCALES)}."
+        ),
+    )
+    parser_benchmarkdb.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for the synthetic data.",
+    )
+    parser_benchmarkdb.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help=(
+            "Maximum number of datasets to load at once. Defaults to the CPU "
+            "count, and is limited by the database's free connections."
+        ),
+    )
+    parser_benchmarkdb.add_argument(
+        "--baseline",
+        type=Path,
+        default=BENCHMARK_BASELINE,
+        help="JSON file of baseline results. Defaults to benchmarks/baseline.json.",
+    )
+    parser_benchmarkdb.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Save the results as the new baseline, instead of comparing with it.",
+    )
+    parser_benchmarkdb.add_argument(
+        "--tolerance",
+        type=float,
+        default=benchmark.Tolerances.slowdown,
+        help=(
+            "Fraction by which a step can be slower than its baseline. "
+            f"Defaults to {benchmark.Tolerances.slowdown}."
+        ),
+    )
+    parser_benchmarkdb.add_argument(
+        "--min-seconds",
+        type=float,
+        default=benchmark.Tolerances.min_seconds,
+        help=(
+            "Ignore slowdowns smaller than this many seconds. "
+            f"Defaults to {benchmark.Tolerances.min_seconds}."
+        ),
+    )
+    parser_benchmarkdb.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=benchmark.Tolerances.memory,
+        help=(
+            "Fraction by which the peak memory can be higher than its baseline. "
+            f"Defaults to {benchmark.Tolerances.memory}."
+        ),
+    )
+    parser_benchmarkdb.add_argument(
+        "--max-exponent",
+        type=float,
+        default=benchmark.Tolerances.max_exponent,
+        help=(
+            "Largest exponent a step's time can grow with the scale by. "
+            f"Defaults to {benchmark.Tolerances.max_exponent}."
+        ),
+    )
+    parser_benchmarkdb.add_argument(
+        "--report-dir",
+        type=Path,
+        default=BUILD_REPORTS_DIR,
+        help="Directory to write the JSON results to. Defaults to build-reports/.",
+    )
+    parser_benchmarkdb.set_defaults(cmd="benchmarkdb")
+
+    parser_benchmarkmatching = subparsers.add_parser("benchmarkmatching")
+    parser_benchmarkmatching.add_argument(
+        "--landlords",
+        type=int,
+        default=MATCHING_BENCHMARK_LANDLORDS,
+        help=(
+            "Number of synthetic landlord contacts to match up. "
+            f"Defaults to {MATCHING_BENCHMARK_LANDLORDS}."
+        ),
+    )
+    parser_benchmarkmatching.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for the synthetic landlord contacts.",
+    )
+    parser_benchmarkmatching.set_defaults(cmd="benchmarkmatching")
+
+    parser_buildreport = subparsers.add_parser("buildreport")
+    parser_buildreport.set_defaults(cmd="buildreport")
+
+    parser_rollbackdb = subparsers.add_parser("rollbackdb")
+    parser_rollbackdb.set_defaults(cmd="rollbackdb")
+
     parser_dbshell = subparsers.add_parser("dbshell")
     parser_dbshell.set_defaults(cmd="dbshell")
 
     args = parser.parse_args()
 
+    if getattr(args, "cmd", "") == "generatedata":
+        # This doesn't need a database.
+        generatedata(args.out_dir, args.scale, args.seed)
+        sys.exit(0)
+
     database_url: str = args.database_url
 
     if not database_url:
@@ -732,7 +2088,38 @@ if __name__ == "__main__":
     elif cmd == "dbshell":
         dbshell(db)
     elif cmd == "builddb":
-        ChiDbBuilder(db, is_testing=False).build(force_refresh=args.update)
+        ChiDbBuilder(
+            db, is_testing=False, data_dir=args.data_dir, jobs=args.jobs
+        ).build(
+            force_refresh=args.update,
+            keep_builds=args.keep_builds,
+            report_dir=args.report_dir,
+            resume=args.resume,
+        )
+    elif cmd == "refreshindicators":
+        refreshindicators(db, jobs=args.jobs, full=args.full, verify=args.verify)
+    elif cmd == "benchmarkdb":
+        benchmarkdb(
+            db,
+            scales=args.scales,
+            seed=args.seed,
+            jobs=args.jobs,
+            baseline_path=args.baseline,
+            save_baseline=args.save_baseline,
+            tolerances=benchmark.Tolerances(
+                slowdown=args.tolerance,
+                min_seconds=args.min_seconds,
+                memory=args.memory_tolerance,
+                max_exponent=args.max_exponent,
+            ),
+            report_dir=args.report_dir,
+        )
+    elif cmd == "benchmarkmatching":
+        benchmarkmatching(db, landlords=args.landlords, seed=args.seed)
+    elif cmd == "buildreport":
+        buildreport(db)
+    elif cmd == "rollbackdb":
+        rollbackdb(db)
     elif cmd == "exportgraph":
         with open(args.outfile, "w") as f:
             with db.connection() as conn:
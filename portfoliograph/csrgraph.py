@@ -0,0 +1,406 @@
+from typing import Iterator, List, NamedTuple, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+from numpy.typing import ArrayLike
+
+# The types of edges, which are stored as their index in this list.
+EDGE_TYPES = ["name", "bizaddr"]
+
+# The indptr of a graph of one node without any edges.
+NO_EDGES_INDPTR = np.zeros(2, dtype=np.int64)
+
+
+def get_component_labels(
+    node_count: int, sources: np.ndarray, targets: np.ndarray
+) -> np.ndarray:
+    """
+    Return the connected component of each node, given the ends of the
+    edges between them, labeled by the smallest node in it, e.g.:
+
+        >>> get_component_labels(6, np.array([4, 1, 5]), np.array([1, 0, 3]))
+        array([0, 0, 2, 3, 0, 3])
+
+    This is a union-find done on all the edges at once: each pass links the
+    roots of the two ends of every edge to the smaller one, then points every
+    node straight at its root, until no edge connects two roots.
+    """
+
+    labels = np.arange(node_count)
+    while True:
+        source_roots = labels[sources]
+        target_roots = labels[targets]
+        lower_roots = np.minimum(source_roots, target_roots)
+        linked: np.ndarray = labels.copy()
+        np.minimum.at(linked, source_roots, lower_roots)
+        np.minimum.at(linked, target_roots, lower_roots)
+        while True:
+            jumped = linked[linked]
+            if np.array_equal(jumped, linked):
+                break
+            linked = jumped
+        if np.array_equal(linked, labels):
+            return labels
+        labels = linked
+
+
+def get_positions(node_ids: np.ndarray, ids: ArrayLike) -> np.ndarray:
+    """
+    Return the positions of the given ids in an array of node ids, e.g.:
+
+        >>> get_positions(np.array([7, 3, 5]), [5, 7])
+        array([2, 0])
+    """
+
+    order = np.argsort(node_ids, kind="stable")
+    return order[np.searchsorted(node_ids, ids, sorter=order)]
+
+
+def gather_ranges(
+    starts: np.ndarray, ends: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the indexes in the given ranges, along with how many there are in
+    each range, e.g.:
+
+        >>> gather_ranges(np.array([5, 0, 2]), np.array([7, 0, 3]))
+        (array([5, 6, 2]), array([2, 0, 1]))
+    """
+
+    counts = ends - starts
+    offsets = np.cumsum(counts) - counts
+    indexes = np.arange(counts.sum()) + np.repeat(starts - offsets, counts)
+    return indexes, counts
+
+
+def get_indptr(counts: np.ndarray) -> np.ndarray:
+    indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return indptr
+
+
+class CsrGraph:
+    """
+    An undirected graph of owners, stored as NumPy arrays rather than
+    Python objects, so that it stays compact and fast with hundreds of
+    thousands of nodes.
+
+    Nodes are numbered by their position. Their ids, names and business
+    addresses are in arrays with an item for each node, and their BBLs (or
+    PINs) are in `bbls`, with node i's in bbls[bbl_indptr[i]:bbl_indptr[i + 1]].
+
+    The edges are stored as an adjacency matrix in compressed sparse row
+    (CSR) form: node i's neighbors are indices[indptr[i]:indptr[i + 1]], and
+    the weights and types (as indexes of EDGE_TYPES) of those edges are at
+    the same positions in `weights` and `types`. Each edge is in the rows of
+    both of its ends.
+    """
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        names: np.ndarray,
+        bizaddrs: np.ndarray,
+        bbl_indptr: np.ndarray,
+        bbls: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray,
+        types: np.ndarray,
+    ) -> None:
+        self.node_ids = node_ids
+        self.names = names
+        self.bizaddrs = bizaddrs
+        self.bbl_indptr = bbl_indptr
+        self.bbls = bbls
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.types = types
+
+    @classmethod
+    def from_edges(
+        cls,
+        node_ids: ArrayLike,
+        names: Sequence[str],
+        bizaddrs: Sequence[str],
+        bbls: Sequence[Sequence[str]],
+        sources: ArrayLike,
+        targets: ArrayLike,
+        weights: ArrayLike,
+        types: ArrayLike,
+    ) -> "CsrGraph":
+        """
+        Make a graph of the given nodes, and the edges between the nodes at
+        the given positions. Edges from a node to itself are dropped, and
+        of the edges between the same two nodes, only the first is kept,
+        e.g.:
+
+            >>> g = CsrGraph.from_edges(
+            ...     [10, 20, 30], ['A', 'B', 'C'], ['1 X ST', '1 X ST', '2 Y AVE'],
+            ...     [['1'], ['2', '3'], []],
+            ...     [0, 1, 1, 2], [1, 0, 1, 1], [2.0, 1.0, 1.0, 1.5], [1, 0, 0, 0],
+            ... )
+            >>> len(g), g.edge_count, g.bbl_count
+            (3, 2, 3)
+            >>> list(g.iter_edges())
+            [(0, 1, 2.0, 'bizaddr'), (1, 2, 1.5, 'name')]
+        """
+
+        return cls.from_edge_arrays(
+            np.asarray(node_ids, dtype=np.int64),
+            np.asarray(names, dtype=object),
+            np.asarray(bizaddrs, dtype=object),
+            get_indptr(np.array([len(b) for b in bbls], dtype=np.int64)),
+            np.array([bbl for node_bbls in bbls for bbl in node_bbls], dtype=object),
+            np.asarray(sources, dtype=np.int64),
+            np.asarray(targets, dtype=np.int64),
+            np.asarray(weights, dtype=np.float64),
+            np.asarray(types, dtype=np.int8),
+        )
+
+    @classmethod
+    def from_edge_arrays(
+        cls,
+        node_ids: np.ndarray,
+        names: np.ndarray,
+        bizaddrs: np.ndarray,
+        bbl_indptr: np.ndarray,
+        bbls: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        weights: np.ndarray,
+        types: np.ndarray,
+    ) -> "CsrGraph":
+        """
+        Like from_edges(), but for nodes and edges that are already in the
+        arrays the graph stores, with the nodes' BBLs as in `bbl_indptr`.
+        """
+
+        low = np.minimum(sources, targets)
+        high = np.maximum(sources, targets)
+        edges = np.flatnonzero(low != high)
+        _, first = np.unique(
+            low[edges] * len(node_ids) + high[edges], return_index=True
+        )
+        edges = edges[np.sort(first)]
+        return cls.from_unique_edges(
+            node_ids,
+            names,
+            bizaddrs,
+            bbl_indptr,
+            bbls,
+            low[edges],
+            high[edges],
+            weights[edges],
+            types[edges],
+        )
+
+    @classmethod
+    def from_unique_edges(
+        cls,
+        node_ids: np.ndarray,
+        names: np.ndarray,
+        bizaddrs: np.ndarray,
+        bbl_indptr: np.ndarray,
+        bbls: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        weights: np.ndarray,
+        types: np.ndarray,
+    ) -> "CsrGraph":
+        """Make a graph of edges that are known to be unique and not loops."""
+
+        rows = np.concatenate([sources, targets])
+        order = np.argsort(rows, kind="stable")
+        return cls(
+            node_ids,
+            names,
+            bizaddrs,
+            bbl_indptr,
+            bbls,
+            get_indptr(np.bincount(rows, minlength=len(node_ids))),
+            np.concatenate([targets, sources])[order],
+            np.concatenate([weights, weights])[order],
+            np.concatenate([types, types])[order],
+        )
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    @property
+    def bbl_count(self) -> int:
+        return len(self.bbls)
+
+    def get_bbls(self, node: int) -> List[str]:
+        return self.bbls[self.bbl_indptr[node] : self.bbl_indptr[node + 1]].tolist()
+
+    def get_edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the sources, targets, weights and types of the edges, with
+        each edge once (from the lower node to the higher one).
+        """
+
+        rows = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        once = rows < self.indices
+        return rows[once], self.indices[once], self.weights[once], self.types[once]
+
+    def iter_edges(self) -> Iterator[Tuple[int, int, float, str]]:
+        """Yield the (source, target, weight, type) of each edge."""
+
+        if not len(self.indices):
+            return
+        sources, targets, weights, types = self.get_edge_arrays()
+        for source, target, weight, type in zip(
+            sources.tolist(), targets.tolist(), weights.tolist(), types.tolist()
+        ):
+            yield source, target, weight, EDGE_TYPES[type]
+
+    def subgraph(self, nodes: np.ndarray) -> "CsrGraph":
+        """
+        Return the graph of the nodes at the given (ascending) positions,
+        and the edges between them.
+        """
+
+        edges, edge_counts = gather_ranges(self.indptr[nodes], self.indptr[nodes + 1])
+        rows = np.repeat(np.arange(len(nodes)), edge_counts)
+        # Find the neighbors' positions in the subgraph by searching the
+        # nodes, so that this takes time in proportion to the size of the
+        # subgraph rather than the whole graph.
+        neighbors = self.indices[edges]
+        indices = np.searchsorted(nodes, neighbors)
+        inside = nodes[np.minimum(indices, len(nodes) - 1)] == neighbors
+        bbls, bbl_counts = gather_ranges(
+            self.bbl_indptr[nodes], self.bbl_indptr[nodes + 1]
+        )
+        return CsrGraph(
+            self.node_ids[nodes],
+            self.names[nodes],
+            self.bizaddrs[nodes],
+            get_indptr(bbl_counts),
+            self.bbls[bbls],
+            get_indptr(np.bincount(rows[inside], minlength=len(nodes))),
+            indices[inside],
+            self.weights[edges][inside],
+            self.types[edges][inside],
+        )
+
+    def get_component_labels(self) -> np.ndarray:
+        sources, targets, _, _ = self.get_edge_arrays()
+        return get_component_labels(len(self), sources, targets)
+
+    def get_components(self) -> "Components":
+        """Return the connected components, in order of their first node."""
+
+        labels = self.get_component_labels()
+        order = np.argsort(labels, kind="stable")
+        _, starts = np.unique(labels[order], return_index=True)
+        ends = np.append(starts[1:], len(self))
+        bbl_counts: np.ndarray = np.diff(self.bbl_indptr)
+        bbl_sums = np.add.reduceat(bbl_counts[order], starts) if len(starts) else starts
+        return Components(order, starts, ends, bbl_sums)
+
+    def get_component(self, components: "Components", index: int) -> "CsrGraph":
+        start = int(components.starts[index])
+        end = int(components.ends[index])
+        if end - start == 1:
+            return self.single_node_subgraph(int(components.order[start]))
+        return self.subgraph(components.order[start:end])
+
+    def iter_components(self) -> Iterator["CsrGraph"]:
+        """
+        Yield the graphs of the connected components, in order of their
+        first node.
+        """
+
+        components = self.get_components()
+        for index in range(len(components.starts)):
+            yield self.get_component(components, index)
+
+    def single_node_subgraph(self, node: int) -> "CsrGraph":
+        """
+        Return the graph of just the given node, which most components are,
+        without the overhead of subgraph().
+        """
+
+        bbl_start, bbl_end = self.bbl_indptr[node : node + 2].tolist()
+        return CsrGraph(
+            self.node_ids[node : node + 1],
+            self.names[node : node + 1],
+            self.bizaddrs[node : node + 1],
+            np.array([0, bbl_end - bbl_start]),
+            self.bbls[bbl_start:bbl_end],
+            NO_EDGES_INDPTR,
+            self.indices[:0],
+            self.weights[:0],
+            self.types[:0],
+        )
+
+    def get_structure(self) -> "GraphStructure":
+        return GraphStructure(
+            self.indptr, self.indices, self.weights, self.types, self.bbl_indptr
+        )
+
+    @classmethod
+    def from_structure(cls, structure: "GraphStructure") -> "CsrGraph":
+        """
+        Make a graph with the given structure, whose node ids are their
+        positions, and whose names, business addresses and BBLs are empty.
+        """
+
+        node_count = len(structure.indptr) - 1
+        return cls(
+            np.arange(node_count),
+            np.full(node_count, "", dtype=object),
+            np.full(node_count, "", dtype=object),
+            structure.bbl_indptr,
+            np.full(structure.bbl_indptr[-1], "", dtype=object),
+            structure.indptr,
+            structure.indices,
+            structure.weights,
+            structure.types,
+        )
+
+    def to_networkx(self) -> nx.Graph:
+        """
+        Return the graph as a networkx graph, whose nodes are our node
+        positions, for the algorithms we don't have our own version of.
+        """
+
+        g = nx.Graph()
+        g.add_nodes_from(range(len(self)))
+        sources, targets, weights, _ = self.get_edge_arrays()
+        g.add_weighted_edges_from(
+            zip(sources.tolist(), targets.tolist(), weights.tolist())
+        )
+        return g
+
+
+class Components(NamedTuple):
+    """
+    The connected components of a graph: component i is made up of the
+    nodes order[starts[i]:ends[i]], and has bbl_sums[i] BBLs.
+    """
+
+    order: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+    bbl_sums: np.ndarray
+
+
+class GraphStructure(NamedTuple):
+    """
+    The edges of a graph and how many BBLs each node has, without the
+    names and addresses, which is all that's needed to split it up. It's
+    just a few numeric arrays, so it's cheap to send to another process.
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+    types: np.ndarray
+    bbl_indptr: np.ndarray
@@ -1,98 +1,212 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Callable, Iterator, List, NamedTuple
+from typing import Any, Dict, Callable, Iterator, List, NamedTuple, Tuple
 from collections import Counter
+from itertools import chain
 import networkx as nx
+import numpy as np
+from psycopg2.extras import NamedTupleCursor
+
+from .csrgraph import EDGE_TYPES, CsrGraph, GraphStructure, get_indptr, get_positions
 
 
 SQL_DIR = Path(__file__).parent.resolve() / "sql"
 
+MAX_PORTFOLIO_SIZE = 300
+
+LOUVAIN_SEED = 0
+
+# How many rows of landlords_with_connections to fetch at a time.
+GRAPH_FETCH_SIZE = 10000
+
+NAME_EDGE = EDGE_TYPES.index("name")
+BIZADDR_EDGE = EDGE_TYPES.index("bizaddr")
 
-class ConnectedLandlordRow(NamedTuple):
-    nodeid: int
-    name: str
-    bizaddr: str
-    bbls: List[str]
-    name_match_info: List[Dict[str, float]]
-    bizaddr_match_info: List[Dict[str, float]]
 
+class GraphRows(NamedTuple):
+    """
+    A batch of rows from landlord_graph_rows.sql, decoded into arrays. The
+    edges go from the landlord with the id in `sources` to the one in
+    `targets`, with each landlord's name matches before its bizaddr ones.
+    """
+
+    node_ids: np.ndarray
+    names: np.ndarray
+    bizaddrs: np.ndarray
+    bbl_counts: np.ndarray
+    bbls: np.ndarray
+    sources: np.ndarray
+    targets: np.ndarray
+    weights: np.ndarray
+    types: np.ndarray
 
-def build_graph(dict_cursor) -> nx.Graph:
-    g = nx.Graph()
 
+def decode_graph_rows(rows: List[Any]) -> GraphRows:
+    node_ids = np.fromiter((row.nodeid for row in rows), np.int64, len(rows))
+    bbl_counts = np.fromiter((len(row.bbls) for row in rows), np.int64, len(rows))
+    edges = []
+    for type, nodeids_column, weights_column in [
+        (NAME_EDGE, "name_match_nodeids", "name_match_weights"),
+        (BIZADDR_EDGE, "bizaddr_match_nodeids", "bizaddr_match_weights"),
+    ]:
+        counts = np.fromiter(
+            (len(getattr(row, nodeids_column)) for row in rows), np.int64, len(rows)
+        )
+        edge_count = int(counts.sum())
+        edges.append(
+            (
+                np.repeat(node_ids, counts),
+                np.fromiter(
+                    chain.from_iterable(getattr(row, nodeids_column) for row in rows),
+                    np.int64,
+                    edge_count,
+                ),
+                np.fromiter(
+                    chain.from_iterable(getattr(row, weights_column) for row in rows),
+                    np.float64,
+                    edge_count,
+                ),
+                np.full(edge_count, type, dtype=np.int8),
+            )
+        )
+    sources, targets, weights, types = (
+        np.concatenate(arrays) for arrays in zip(*edges)
+    )
+    # The rows are in order of their node ids, so this puts the edges in
+    # order of their rows.
+    order = np.argsort(sources, kind="stable")
+    return GraphRows(
+        node_ids,
+        np.array([row.name for row in rows], dtype=object),
+        np.array([row.bizaddr for row in rows], dtype=object),
+        bbl_counts,
+        np.fromiter(chain.from_iterable(row.bbls for row in rows), object),
+        sources[order],
+        targets[order],
+        weights[order],
+        types[order],
+    )
+
+
+def build_graph(conn, fetch_size: int = GRAPH_FETCH_SIZE) -> CsrGraph:
     print("Making landlord connections")
     landlords_with_connections = (
         SQL_DIR / "landlords_with_connections.sql"
     ).read_text()
-    dict_cursor.execute(landlords_with_connections)
-    contacts = [ConnectedLandlordRow(**row) for row in dict_cursor.fetchall()]
+    with conn.cursor() as cursor:
+        cursor.execute((SQL_DIR / "landlords_grouped.sql").read_text())
+        cursor.execute(landlords_with_connections)
 
     print("Building graph")
-    for contact in contacts:
-        g.add_node(
-            contact.nodeid,
-            name=contact.name,
-            bizAddr=contact.bizaddr,
-            bbls=contact.bbls,
-        )
-
-    for contact in contacts:
-        nodeid = contact.nodeid
+    # This is a named (server-side) cursor, so we only ever have `fetch_size`
+    # rows in memory at once, and only keep them as arrays.
+    batches = [decode_graph_rows([])]
+    with conn.cursor("landlord_graph_rows", cursor_factory=NamedTupleCursor) as cursor:
+        cursor.execute((SQL_DIR / "landlord_graph_rows.sql").read_text())
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            batches.append(decode_graph_rows(rows))
+    graph_rows = GraphRows(*(np.concatenate(arrays) for arrays in zip(*batches)))
+    del batches
 
-        if contact.name_match_info:
-            for match in contact.name_match_info:
-                if not g.has_edge(nodeid, match["nodeid"]):
-                    g.add_edge(
-                        nodeid, match["nodeid"], type="name", weight=match["weight"]
-                    )
+    return CsrGraph.from_edge_arrays(
+        graph_rows.node_ids,
+        graph_rows.names,
+        graph_rows.bizaddrs,
+        get_indptr(graph_rows.bbl_counts),
+        graph_rows.bbls,
+        get_positions(graph_rows.node_ids, graph_rows.sources),
+        get_positions(graph_rows.node_ids, graph_rows.targets),
+        graph_rows.weights,
+        graph_rows.types,
+    )
 
-        if contact.bizaddr_match_info:
-            for match in contact.bizaddr_match_info:
-                if not g.has_edge(nodeid, match["nodeid"]):
-                    g.add_edge(
-                        nodeid, match["nodeid"], type="bizaddr", weight=match["weight"]
-                    )
 
-    return g
+def portfolio_size(portfolio_subgraph: CsrGraph) -> int:
+    return portfolio_subgraph.bbl_count
 
 
-def portfolio_size(portfolio_subgraph):
-    n_bbls = sum([len(node[1]["bbls"]) for node in portfolio_subgraph.nodes(data=True)])
-    return n_bbls
-
-
-def portfolio_is_too_big(portfolio_subgraph: Any) -> bool:
-    MAX_SIZE = 300
+def portfolio_is_too_big(portfolio_subgraph: CsrGraph) -> bool:
     n_bbls = portfolio_size(portfolio_subgraph)
-    return n_bbls > MAX_SIZE
+    return n_bbls > MAX_PORTFOLIO_SIZE
 
 
 def split_subgraph_if(
-    graph: nx.Graph, subgraph: Any, predicate: Callable[[Any], bool], id: int
-):
+    subgraph: CsrGraph, predicate: Callable[[CsrGraph], bool], id: int
+) -> Iterator[Tuple[int, CsrGraph]]:
     RESOLUTION = 0.1
     if predicate(subgraph):
+        # We don't have our own Louvain, so we fall back to networkx's. It's
+        # seeded so that portfolios are split the same way every time.
         for comm in nx.community.louvain_communities(
-            subgraph, resolution=RESOLUTION, weight="weight"
+            subgraph.to_networkx(),
+            resolution=RESOLUTION,
+            weight="weight",
+            seed=LOUVAIN_SEED,
         ):
-            comm_subgraph = graph.subgraph(comm)
+            comm_subgraph = subgraph.subgraph(np.array(sorted(comm), dtype=np.int64))
             if portfolio_size(comm_subgraph) == portfolio_size(subgraph):
                 yield (id, comm_subgraph)
             else:
-                yield from split_subgraph_if(graph, comm_subgraph, predicate, id)
+                yield from split_subgraph_if(comm_subgraph, predicate, id)
     else:
         yield (id, subgraph)
 
 
-def iter_split_graph(graph: nx.Graph) -> Iterator[Any]:
+def split_structure(structure: GraphStructure) -> List[np.ndarray]:
+    """
+    Split a graph with the given structure into portfolios that aren't too
+    big, returning the positions of the nodes in each of them. This runs in
+    worker processes.
+    """
+
+    graph = CsrGraph.from_structure(structure)
+    return [
+        part.node_ids for _, part in split_subgraph_if(graph, portfolio_is_too_big, 0)
+    ]
+
+
+def iter_split_graph(graph: CsrGraph, jobs: int = 1) -> Iterator[Tuple[int, CsrGraph]]:
+    """
+    Yield the portfolios of the graph's connected components, splitting the
+    ones that are too big, along with the id of their component. Components
+    are numbered in order of their first node, and their portfolios are
+    yielded in that order.
+
+    If `jobs` is more than 1, the components that are too big are split in
+    that many processes at once, biggest first, while the rest are yielded.
+    """
+
     print("Finding and splitting portfolios")
-    for id, cc in enumerate(nx.connected_components(graph), 1):
-        portfolio_subgraph = graph.subgraph(cc)
-        yield from split_subgraph_if(
-            graph, portfolio_subgraph, portfolio_is_too_big, id
-        )
+    components = graph.get_components()
+    too_big = np.flatnonzero(components.bbl_sums > MAX_PORTFOLIO_SIZE)
+    if jobs <= 1 or len(too_big) < 2:
+        for index in range(len(components.starts)):
+            component = graph.get_component(components, index)
+            yield from split_subgraph_if(component, portfolio_is_too_big, index + 1)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        # The biggest components take the longest to split, so they go first.
+        splits: Dict[int, Future] = {}
+        for index in too_big[np.argsort(-components.bbl_sums[too_big], kind="stable")]:
+            component = graph.get_component(components, int(index))
+            splits[int(index)] = pool.submit(split_structure, component.get_structure())
+        for index in range(len(components.starts)):
+            component = graph.get_component(components, index)
+            if index not in splits:
+                yield (index + 1, component)
+                continue
+            for part in splits.pop(index).result():
+                yield (index + 1, component.subgraph(part))
 
 
-def to_json_graph(graph: nx.Graph) -> Dict[str, Any]:
+def to_json_graph(graph: CsrGraph) -> Dict[str, Any]:
     """
     Output a portfolio's graph as JSON based on this schema:
 
@@ -102,42 +216,42 @@ def to_json_graph(graph: nx.Graph) -> Dict[str, Any]:
     ret_nodes: List[Dict[str, Any]] = []
     ret_edges: List[Dict[str, Any]] = []
 
-    raw_nodes = [n for n in graph.nodes(data=True)]
+    node_ids = graph.node_ids.tolist()
+    names = graph.names.tolist()
+    bizaddrs = graph.bizaddrs.tolist()
 
     # Identify common names/addresses for "compound"/group nodes in viz
-    all_names = [n[1]["name"] for n in raw_nodes]
-    all_bizaddrs = [n[1]["bizAddr"] for n in raw_nodes]
-    parent_names = [x for x, n in Counter(all_names).most_common() if n > 4]
-    parent_bizaddrs = [x for x, n in Counter(all_bizaddrs).most_common() if n > 4]
+    parent_names = [x for x, n in Counter(names).most_common() if n > 4]
+    parent_bizaddrs = [x for x, n in Counter(bizaddrs).most_common() if n > 4]
     name_nodes = [{"id": name, "type": "name"} for name in parent_names]
     bizaddr_nodes = [{"id": bizaddr, "type": "bizAddr"} for bizaddr in parent_bizaddrs]
 
     ret_nodes.extend(name_nodes + bizaddr_nodes)
 
-    for id, attrs in raw_nodes:
+    for i, (id, name, bizaddr) in enumerate(zip(node_ids, names, bizaddrs)):
         node_values = {
             "id": id,
             "type": "owner",
-            "name": attrs["name"],
-            "bizAddr": attrs["bizAddr"],
-            "bbls": attrs["bbls"],
+            "name": name,
+            "bizAddr": bizaddr,
+            "bbls": graph.get_bbls(i),
         }
 
         # Can only have one parent, so prioritize bizaddr
-        if attrs["bizAddr"] in parent_bizaddrs:
-            node_values.update({"parent": attrs["bizAddr"]})
-        elif attrs["name"] in parent_names:
-            node_values.update({"parent": attrs["name"]})
+        if bizaddr in parent_bizaddrs:
+            node_values.update({"parent": bizaddr})
+        elif name in parent_names:
+            node_values.update({"parent": name})
 
         ret_nodes.append(node_values)
 
-    for (_from, to, attrs) in graph.edges(data=True):
+    for (_from, to, weight, type) in graph.iter_edges():
         ret_edges.append(
             {
-                "source": _from,
-                "target": to,
-                "type": attrs["type"],
-                "weight": attrs["weight"],
+                "source": node_ids[_from],
+                "target": node_ids[to],
+                "type": type,
+                "weight": weight,
             }
         )
     return {
@@ -0,0 +1,666 @@
+import re
+import time
+from itertools import chain
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+from psycopg2.extras import NamedTupleCursor
+
+from .csrgraph import gather_ranges, get_component_labels, get_indptr
+from .graph import BIZADDR_EDGE, NAME_EDGE, decode_graph_rows
+
+
+SQL_DIR = Path(__file__).parent.resolve() / "sql"
+
+# Landlords are only compared with the others in the same block: for name
+# matches, the ones with the same name and zip code, and for bizaddr matches,
+# the ones with the same house number, street and zip code, like the joins in
+# landlords_with_connections.sql. In blocks bigger than this, like very
+# common names or registered agents' addresses, landlords that are sure to
+# match are only paired with the first of them, and the rest are compared
+# with MinHash LSH, no more than this many at a time, so that the number of
+# pairs stays roughly linear. That connects the same landlords as the SQL
+# (save for the similar addresses LSH misses), but with fewer edges, so the
+# portfolios Louvain splits big components into can differ.
+MAX_BLOCK_SIZE = 100
+
+# The MinHash signature of a string is MINHASH_BANDS * MINHASH_ROWS hashes
+# of its trigrams, and strings with the same hashes in any band are compared.
+# With these, strings whose trigrams have a Jaccard similarity of 0.8 are
+# compared about 98% of the time, and ones with 0.3 about 6% of the time.
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+
+# How many pairs of landlords to score at a time.
+SCORE_BATCH_SIZE = 100_000
+
+# How many landlords to fetch from the database at a time.
+NODE_FETCH_SIZE = 10_000
+
+# Name matches need a business address at least this similar, or at least
+# NAME_MATCH_APT_SIMILARITY with the same apartment number (see
+# matched_names in landlords_with_connections.sql).
+NAME_MATCH_SIMILARITY = 0.9
+NAME_MATCH_APT_SIMILARITY = 0.8
+
+# Postgres casts real and double precision values to numeric with this many
+# significant digits.
+REAL_DIGITS = 6
+DOUBLE_DIGITS = 15
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def mix_hashes(values: np.ndarray) -> np.ndarray:
+    """
+    Scramble 64-bit integers with SplitMix64's finalizer, so that e.g. the
+    smallest of them is a random one.
+    """
+
+    values = values.astype(np.uint64)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+MINHASH_SEEDS = mix_hashes(np.arange(1, MINHASH_BANDS * MINHASH_ROWS + 1))
+
+
+class LandlordNodes(NamedTuple):
+    """
+    The landlords of `landlords_grouped` (see landlords_grouped.sql), as
+    arrays with an item for each, in order of their node ids. Node i's BBLs
+    are the bbl_counts[i] of `bbls` after those of the nodes before it.
+    """
+
+    node_ids: np.ndarray
+    names: np.ndarray
+    bizaddrs: np.ndarray
+    bizhousestreets: np.ndarray
+    bizaptnums: np.ndarray
+    bizzips: np.ndarray
+    bbl_counts: np.ndarray
+    bbls: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+
+class Matches(NamedTuple):
+    """
+    Matches between landlords, as the positions of the two landlords of
+    each (the first one lower), and its weight, along with how many pairs
+    of landlords were scored to find them.
+    """
+
+    sources: np.ndarray
+    targets: np.ndarray
+    weights: np.ndarray
+    candidates: int
+
+
+class TrigramSets(NamedTuple):
+    """
+    The trigrams of some strings, as ids. The strings are numbered by their
+    distinct values in `codes`, and the trigrams of value i are
+    ids[indptr[i]:indptr[i + 1]], out of `trigram_count` distinct trigrams.
+    """
+
+    codes: np.ndarray
+    indptr: np.ndarray
+    ids: np.ndarray
+    trigram_count: int
+
+
+class MatchingResult(NamedTuple):
+    method: str
+    landlords: int
+    candidates: int
+    name_matches: int
+    bizaddr_matches: int
+    missed_matches: int
+    seconds: float
+
+
+def decode_landlord_nodes(rows: List[Any]) -> LandlordNodes:
+    def column(name: str) -> np.ndarray:
+        return np.array([getattr(row, name) for row in rows], dtype=object)
+
+    return LandlordNodes(
+        np.fromiter((row.nodeid for row in rows), np.int64, len(rows)),
+        column("name"),
+        column("bizaddr"),
+        column("bizhousestreet"),
+        column("bizaptnum"),
+        column("bizzip"),
+        np.fromiter((len(row.bbls) for row in rows), np.int64, len(rows)),
+        np.fromiter(chain.from_iterable(row.bbls for row in rows), object),
+    )
+
+
+def get_landlord_nodes(conn, fetch_size: int = NODE_FETCH_SIZE) -> LandlordNodes:
+    """
+    Fetch the landlords of `landlords_grouped`, `fetch_size` at a time
+    through a named (server-side) cursor.
+    """
+
+    batches = [decode_landlord_nodes([])]
+    with conn.cursor("landlord_nodes", cursor_factory=NamedTupleCursor) as cursor:
+        cursor.execute((SQL_DIR / "landlord_nodes.sql").read_text())
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            batches.append(decode_landlord_nodes(rows))
+    return LandlordNodes(*(np.concatenate(arrays) for arrays in zip(*batches)))
+
+
+def factorize(*columns: Collection[Optional[Hashable]]) -> np.ndarray:
+    """
+    Return a code for each row of the given columns, which is the same for
+    rows with the same values, or -1 if any of them is None, e.g.:
+
+        >>> factorize(['A', 'B', 'A', None], ['1', '1', '1', '1'])
+        array([ 0,  1,  0, -1])
+    """
+
+    codes: Dict[Tuple, int] = {}
+    return np.fromiter(
+        (
+            -1 if None in row else codes.setdefault(row, len(codes))
+            for row in zip(*columns)
+        ),
+        np.int64,
+        len(columns[0]),
+    )
+
+
+def get_trigrams(text: Optional[str]) -> List[str]:
+    """
+    Return the trigrams of the given text the way pg_trgm does: each word
+    of letters and digits is lower-cased and padded with two spaces before
+    it and one after, e.g.:
+
+        >>> get_trigrams("1 A St.")
+        ['  1', '  a', '  s', ' 1 ', ' a ', ' st', 'st ']
+    """
+
+    trigrams: Set[str] = set()
+    for word in WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return sorted(trigrams)
+
+
+def get_trigram_sets(strings: Collection[Optional[str]]) -> TrigramSets:
+    """
+    Return the trigrams of the given strings. Like pg_trgm, we treat None
+    as a string without any.
+    """
+
+    values: Dict[str, int] = {}
+    codes = np.fromiter(
+        (values.setdefault(s or "", len(values)) for s in strings),
+        np.int64,
+        len(strings),
+    )
+    trigram_ids: Dict[str, int] = {}
+    value_trigrams = [get_trigrams(value) for value in values]
+    ids = np.fromiter(
+        (
+            trigram_ids.setdefault(trigram, len(trigram_ids))
+            for trigram in chain.from_iterable(value_trigrams)
+        ),
+        np.int64,
+    )
+    counts = np.fromiter((len(t) for t in value_trigrams), np.int64, len(values))
+    return TrigramSets(codes, get_indptr(counts), ids, len(trigram_ids))
+
+
+def get_similarities(
+    sets: TrigramSets, sources: np.ndarray, targets: np.ndarray
+) -> np.ndarray:
+    """
+    Return pg_trgm's similarity() of each pair of the strings at the given
+    positions: how many trigrams they share, out of all their trigrams. Like
+    pg_trgm, this is a 32-bit float, e.g.:
+
+        >>> sets = get_trigram_sets(["1 A ST", "1 A STREET", None])
+        >>> get_similarities(sets, np.array([0, 0, 2]), np.array([1, 0, 2]))
+        array([0.5, 1. , 0. ], dtype=float32)
+    """
+
+    source_codes = sets.codes[sources]
+    target_codes = sets.codes[targets]
+    source_trigrams, source_counts = gather_ranges(
+        sets.indptr[source_codes], sets.indptr[source_codes + 1]
+    )
+    target_trigrams, target_counts = gather_ranges(
+        sets.indptr[target_codes], sets.indptr[target_codes + 1]
+    )
+    # A pair's trigrams are unique on each side, so the ones it shares are
+    # the ones that are there twice.
+    pairs = np.arange(len(sources))
+    trigram_count = max(sets.trigram_count, 1)
+    keys = np.concatenate(
+        [
+            np.repeat(pairs, source_counts) * trigram_count + sets.ids[source_trigrams],
+            np.repeat(pairs, target_counts) * trigram_count + sets.ids[target_trigrams],
+        ]
+    )
+    keys.sort()
+    shared = keys[1:][keys[1:] == keys[:-1]] // trigram_count
+    common = np.bincount(shared, minlength=len(sources))
+    union = source_counts + target_counts - common
+    return np.divide(
+        common.astype(np.float32),
+        union.astype(np.float32),
+        out=np.zeros(len(sources), dtype=np.float32),
+        where=union > 0,
+    )
+
+
+def round_significant(values: np.ndarray, digits: int) -> np.ndarray:
+    """
+    Round to the given number of significant digits, like Postgres does
+    when it casts a float to numeric, e.g.:
+
+        >>> round_significant(np.array([12 / 13, 1 + 12 / 13, 0.0]), 6)
+        array([0.923077, 1.92308 , 0.      ])
+    """
+
+    magnitudes = np.zeros(len(values))
+    np.floor(
+        np.log10(np.abs(values), where=values != 0, out=magnitudes), out=magnitudes
+    )
+    scales = 10.0 ** (digits - 1 - magnitudes)
+    return np.round(values * scales) / scales
+
+
+def get_minhashes(sets: TrigramSets, positions: np.ndarray) -> np.ndarray:
+    """
+    Return the MinHash signatures of the trigrams of the strings at the
+    given positions, with a row for each. Strings without any trigrams all
+    have the same signature.
+    """
+
+    codes = sets.codes[positions]
+    trigrams, counts = gather_ranges(sets.indptr[codes], sets.indptr[codes + 1])
+    hashes = mix_hashes(
+        sets.ids[trigrams].astype(np.uint64)[:, np.newaxis] ^ MINHASH_SEEDS
+    )
+    signatures = np.zeros((len(positions), len(MINHASH_SEEDS)), dtype=np.uint64)
+    has_trigrams = counts > 0
+    if has_trigrams.any():
+        starts = (np.cumsum(counts) - counts)[has_trigrams]
+        signatures[has_trigrams] = np.minimum.reduceat(hashes, starts, axis=0)
+    return signatures
+
+
+def get_block_pairs(blocks: np.ndarray, max_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return every pair of positions in the same block (as arrays of their
+    lower and higher positions), ignoring the positions in block -1. Blocks
+    bigger than `max_size` are cut into pieces of that size, each of which
+    starts with the last position of the one before, so that the pieces
+    stay connected, and only pairs in the same piece are returned, e.g.:
+
+        >>> get_block_pairs(np.array([3, -1, 3, 5, 3, 5]), 2)
+        (array([0, 2, 3]), array([2, 4, 5]))
+    """
+
+    step = max(max_size - 1, 1)
+    order = np.argsort(blocks, kind="stable")
+    order = order[blocks[order] >= 0]
+    sorted_blocks = blocks[order]
+    is_start = np.ones(len(order), dtype=bool)
+    is_start[1:] = sorted_blocks[1:] != sorted_blocks[:-1]
+    starts = np.flatnonzero(is_start)
+    lengths = np.diff(np.append(starts, len(order)))
+    item_starts = np.repeat(starts, lengths)
+    indexes = np.arange(len(order))
+    piece_ends = np.minimum(
+        item_starts + (indexes - item_starts) // step * step + max_size,
+        item_starts + np.repeat(lengths, lengths),
+    )
+    partners, counts = gather_ranges(indexes + 1, piece_ends)
+    return order[np.repeat(indexes, counts)], order[partners]
+
+
+def get_first_positions(groups: np.ndarray) -> np.ndarray:
+    """
+    Return the first position in each group, ignoring group -1, e.g.:
+
+        >>> get_first_positions(np.array([3, -1, 3, 5, 3, 5]))
+        array([0, 3])
+    """
+
+    positions = np.flatnonzero(groups >= 0)
+    _, first = np.unique(groups[positions], return_index=True)
+    return np.sort(positions[first])
+
+
+def get_hub_pairs(groups: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return pairs that connect each position to the first one in the same
+    group (as arrays of the first positions and the others), ignoring group
+    -1, e.g.:
+
+        >>> get_hub_pairs(np.array([3, -1, 3, 5, 3, 5]))
+        (array([0, 0, 3]), array([2, 4, 5]))
+
+    Like get_group_edges() in owner_graph.py, this keeps the number of pairs
+    linear even for the groups that thousands of landlords are in.
+    """
+
+    positions = np.flatnonzero(groups >= 0)
+    _, first, inverse = np.unique(
+        groups[positions], return_index=True, return_inverse=True
+    )
+    hubs = positions[first][inverse.reshape(-1)]
+    is_pair = hubs != positions
+    return hubs[is_pair], positions[is_pair]
+
+
+def get_big_blocks(blocks: np.ndarray) -> np.ndarray:
+    """
+    Return the blocks of the positions in blocks of more than MAX_BLOCK_SIZE
+    positions, and -1 for the rest.
+    """
+
+    in_block = blocks >= 0
+    is_big = np.zeros(len(blocks), dtype=bool)
+    is_big[in_block] = np.bincount(blocks[in_block])[blocks[in_block]] > MAX_BLOCK_SIZE
+    return np.where(is_big, blocks, -1)
+
+
+def get_subgroups(groups: np.ndarray, *columns: Collection) -> np.ndarray:
+    """
+    Like factorize(), but with the positions in group -1 left out, e.g.:
+
+        >>> get_subgroups(np.array([0, 0, -1, 1]), ['A', 'B', 'A', 'A'])
+        array([ 0,  1, -1,  3])
+    """
+
+    subgroups = factorize(groups, *columns)
+    subgroups[groups < 0] = -1
+    return subgroups
+
+
+def get_lsh_pairs(
+    blocks: np.ndarray, sets: TrigramSets, positions: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the pairs of the given positions (as arrays of their lower and
+    higher positions) that are in the same block, and whose strings in
+    `sets` share a MinHash LSH band, MAX_BLOCK_SIZE at a time.
+    """
+
+    signatures = get_minhashes(sets, positions)
+    pairs = [(positions[:0], positions[:0])]
+    for band in range(MINHASH_BANDS):
+        band_hashes = mix_hashes(blocks[positions])
+        for row in range(band * MINHASH_ROWS, (band + 1) * MINHASH_ROWS):
+            band_hashes = mix_hashes(band_hashes ^ signatures[:, row])
+        _, sub_blocks = np.unique(band_hashes, return_inverse=True)
+        sources, targets = get_block_pairs(sub_blocks.reshape(-1), MAX_BLOCK_SIZE)
+        pairs.append((positions[sources], positions[targets]))
+    sources = np.concatenate([sources for sources, _ in pairs])
+    targets = np.concatenate([targets for _, targets in pairs])
+    # Hashes of different blocks can (very rarely) collide.
+    same_block = blocks[sources] == blocks[targets]
+    return sources[same_block], targets[same_block]
+
+
+def get_matches(
+    count: int,
+    pairs: List[Tuple[np.ndarray, np.ndarray]],
+    score: Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]],
+) -> Matches:
+    """
+    Score the given candidate pairs of `count` positions, once each,
+    SCORE_BATCH_SIZE at a time, with a function that returns which of the
+    pairs it's given match, and their weights.
+    """
+
+    sources = np.concatenate([sources for sources, _ in pairs])
+    targets = np.concatenate([targets for _, targets in pairs])
+    keys = get_pair_keys(sources, targets, count)
+    sources, targets = keys // max(count, 1), keys % max(count, 1)
+    batches = [(sources[:0], targets[:0], np.zeros(0))]
+    for start in range(0, len(sources), SCORE_BATCH_SIZE):
+        batch_sources = sources[start : start + SCORE_BATCH_SIZE]
+        batch_targets = targets[start : start + SCORE_BATCH_SIZE]
+        is_match, weights = score(batch_sources, batch_targets)
+        batches.append(
+            (batch_sources[is_match], batch_targets[is_match], weights[is_match])
+        )
+    match_sources, match_targets, weights = (
+        np.concatenate(arrays) for arrays in zip(*batches)
+    )
+    return Matches(match_sources, match_targets, weights, len(sources))
+
+
+def get_name_matches(nodes: LandlordNodes) -> Matches:
+    """
+    Match landlords with the same name and zip code, and similar business
+    addresses, like matched_names in landlords_with_connections.sql.
+
+    In blocks of more than MAX_BLOCK_SIZE landlords, every landlord at the
+    same address matches, so each is only paired with the first of them.
+    Then the first landlord with each address and apartment number is
+    compared with the others whose addresses share a MinHash LSH band.
+    """
+
+    streets = get_trigram_sets(nodes.bizhousestreets)
+    aptnums = factorize(nodes.bizaptnums)
+    blocks = factorize(nodes.names, nodes.bizzips)
+    big_blocks = get_big_blocks(blocks)
+    pairs = [
+        get_block_pairs(np.where(big_blocks < 0, blocks, -1), MAX_BLOCK_SIZE),
+        get_hub_pairs(get_subgroups(big_blocks, nodes.bizhousestreets)),
+        get_lsh_pairs(
+            blocks,
+            streets,
+            get_first_positions(
+                get_subgroups(big_blocks, nodes.bizhousestreets, aptnums)
+            ),
+        ),
+    ]
+
+    def score(sources: np.ndarray, targets: np.ndarray):
+        similarities = get_similarities(streets, sources, targets).astype(np.float64)
+        same_aptnum = (aptnums[sources] == aptnums[targets]) & (aptnums[sources] >= 0)
+        is_match = (similarities > NAME_MATCH_SIMILARITY) | (
+            (similarities > NAME_MATCH_APT_SIMILARITY) & same_aptnum
+        )
+        weights = round_significant(similarities + same_aptnum * 0.5 + 1, DOUBLE_DIGITS)
+        return is_match, weights
+
+    return get_matches(len(nodes), pairs, score)
+
+
+def get_bizaddr_matches(nodes: LandlordNodes) -> Matches:
+    """
+    Match landlords with the same business address and zip code, whose
+    apartment numbers are the same or missing, like matched_bizaddrs in
+    landlords_with_connections.sql.
+
+    In blocks of more than MAX_BLOCK_SIZE landlords, like a registered
+    agent's address, each landlord is only paired with the first one with
+    the same apartment number, and the first landlord with each apartment
+    number with the first one without. That's enough to connect all the
+    landlords that the SQL does.
+    """
+
+    names = get_trigram_sets(nodes.names)
+    aptnums = factorize(nodes.bizaptnums)
+    is_blank = np.array([aptnum == "" for aptnum in nodes.bizaptnums], dtype=bool)
+    blocks = factorize(nodes.bizhousestreets, nodes.bizzips)
+    big_blocks = get_big_blocks(blocks)
+    # Landlords without an apartment number (as opposed to a blank one)
+    # don't match each other.
+    hubs = np.union1d(
+        get_first_positions(get_subgroups(big_blocks, nodes.bizaptnums)),
+        np.flatnonzero((big_blocks >= 0) & (aptnums < 0)),
+    )
+    blank_hubs = get_first_positions(np.where(is_blank, big_blocks, -1))
+    block_blank_hubs = np.full(blocks.max(initial=-1) + 1, -1)
+    block_blank_hubs[blocks[blank_hubs]] = blank_hubs
+    hub_blank_hubs = block_blank_hubs[blocks[hubs]]
+    has_blank_hub = (hub_blank_hubs >= 0) & (hub_blank_hubs != hubs)
+    pairs = [
+        get_block_pairs(np.where(big_blocks < 0, blocks, -1), MAX_BLOCK_SIZE),
+        get_hub_pairs(get_subgroups(big_blocks, nodes.bizaptnums)),
+        (hub_blank_hubs[has_blank_hub], hubs[has_blank_hub]),
+    ]
+
+    def score(sources: np.ndarray, targets: np.ndarray):
+        is_match = (
+            ((aptnums[sources] == aptnums[targets]) & (aptnums[sources] >= 0))
+            | is_blank[sources]
+            | is_blank[targets]
+        )
+        similarities = get_similarities(names, sources, targets).astype(np.float64)
+        weights = round_significant(
+            round_significant(similarities, REAL_DIGITS) + 2, DOUBLE_DIGITS
+        )
+        return is_match, weights
+
+    return get_matches(len(nodes), pairs, score)
+
+
+def get_match_info(
+    nodes: LandlordNodes, matches: Matches
+) -> List[Optional[List[Dict[str, float]]]]:
+    """
+    Return each landlord's matches like the name_match_info and
+    bizaddr_match_info of landlords_with_connections.sql: a list of the node
+    ids and weights of the landlords it matches, or None if there aren't any.
+    """
+
+    sources = np.concatenate([matches.sources, matches.targets])
+    targets = np.concatenate([matches.targets, matches.sources])
+    weights = np.concatenate([matches.weights, matches.weights])
+    order = np.lexsort((targets, sources))
+    info: List[Optional[List[Dict[str, float]]]] = [None] * len(nodes)
+    for source, target, weight in zip(
+        sources[order].tolist(),
+        nodes.node_ids[targets[order]].tolist(),
+        weights[order].tolist(),
+    ):
+        node_info = info[source]
+        if node_info is None:
+            node_info = info[source] = []
+        node_info.append({"nodeid": target, "weight": weight})
+    return info
+
+
+def get_pair_keys(sources: np.ndarray, targets: np.ndarray, count: int) -> np.ndarray:
+    return np.unique(
+        np.minimum(sources, targets) * count + np.maximum(sources, targets)
+    )
+
+
+def benchmark_matching(conn) -> List[MatchingResult]:
+    """
+    Match up the landlords in `wow_landlords` with both
+    landlords_with_connections.sql and get_name_matches() and
+    get_bizaddr_matches(), and return how many pairs of landlords each
+    compared, how many matches it found and how long it took. Pairs count
+    once, rather than in both directions. The Python matches leave out pairs
+    that are connected anyway, so they only miss the SQL's matches between
+    landlords they don't connect at all.
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute((SQL_DIR / "landlords_grouped.sql").read_text())
+        start = time.perf_counter()
+        cursor.execute((SQL_DIR / "landlords_with_connections.sql").read_text())
+        sql_seconds = time.perf_counter() - start
+        cursor.execute((SQL_DIR / "landlord_candidate_pairs.sql").read_text())
+        sql_candidates = sum(cursor.fetchone()) // 2
+    with conn.cursor(cursor_factory=NamedTupleCursor) as cursor:
+        cursor.execute((SQL_DIR / "landlord_graph_rows.sql").read_text())
+        sql_rows = decode_graph_rows(cursor.fetchall())
+
+    start = time.perf_counter()
+    nodes = get_landlord_nodes(conn)
+    name_matches = get_name_matches(nodes)
+    bizaddr_matches = get_bizaddr_matches(nodes)
+    seconds = time.perf_counter() - start
+
+    sql_sources = np.searchsorted(nodes.node_ids, sql_rows.sources)
+    sql_targets = np.searchsorted(nodes.node_ids, sql_rows.targets)
+    sql_match_counts = [
+        len(get_pair_keys(sql_sources[is_type], sql_targets[is_type], len(nodes)))
+        for is_type in [sql_rows.types == NAME_EDGE, sql_rows.types == BIZADDR_EDGE]
+    ]
+    labels = get_component_labels(
+        len(nodes),
+        np.concatenate([name_matches.sources, bizaddr_matches.sources]),
+        np.concatenate([name_matches.targets, bizaddr_matches.targets]),
+    )
+    is_missed = labels[sql_sources] != labels[sql_targets]
+    missed_matches = len(
+        get_pair_keys(sql_sources[is_missed], sql_targets[is_missed], len(nodes))
+    )
+    return [
+        MatchingResult(
+            "sql",
+            len(nodes),
+            sql_candidates,
+            sql_match_counts[0],
+            sql_match_counts[1],
+            0,
+            sql_seconds,
+        ),
+        MatchingResult(
+            "python",
+            len(nodes),
+            name_matches.candidates + bizaddr_matches.candidates,
+            len(name_matches.sources),
+            len(bizaddr_matches.sources),
+            missed_matches,
+            seconds,
+        ),
+    ]
+
+
+def format_matching_results(results: Sequence[MatchingResult]) -> str:
+    """
+    Format the results of benchmark_matching() as a table, e.g.:
+
+        >>> print(format_matching_results([
+        ...     MatchingResult("sql", 1000, 24500, 30, 80, 0, 2.5),
+        ...     MatchingResult("python", 1000, 700, 30, 78, 2, 0.25),
+        ... ]))
+        method  landlords  candidates  name matches  bizaddr matches  missed  seconds
+        sql          1000       24500            30               80       0     2.50
+        python       1000         700            30               78       2     0.25
+    """
+
+    lines = [
+        f"{'method':<6}  {'landlords':>9}  {'candidates':>10}  {'name matches':>12}"
+        f"  {'bizaddr matches':>15}  {'missed':>6}  {'seconds':>7}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.method:<6}  {result.landlords:>9}  {result.candidates:>10}"
+            f"  {result.name_matches:>12}  {result.bizaddr_matches:>15}"
+            f"  {result.missed_matches:>6}  {result.seconds:>7.2f}"
+        )
+    return "\n".join(lines)
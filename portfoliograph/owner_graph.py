@@ -0,0 +1,125 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from .csrgraph import EDGE_TYPES, CsrGraph
+from .graph import iter_split_graph, to_json_graph
+
+
+SQL_DIR = Path(__file__).parent.resolve() / "sql"
+
+# We're more confident that owners with the same mailing address are
+# related than owners with the same name (in the same zip code), like
+# the weights in landlords_with_connections.sql.
+NAME_EDGE_WEIGHT = 1.0
+BIZADDR_EDGE_WEIGHT = 2.0
+
+
+class OwnerNodes(NamedTuple):
+    """
+    The nodes of the owner graph (see chi_owner_nodes.sql), as parallel
+    lists with an item for each node.
+    """
+
+    names: List[str]
+    bizaddrs: List[str]
+    name_keys: List[str]
+    bizaddr_keys: List[str]
+    zips: List[str]
+    pins: List[List[str]]
+
+    def __len__(self) -> int:
+        return len(self.pins)
+
+
+class Portfolio(NamedTuple):
+    orig_id: int
+    pins: List[str]
+    owner_names: List[str]
+    graph: Dict[str, Any]
+
+
+def get_owner_nodes(cursor) -> OwnerNodes:
+    cursor.execute((SQL_DIR / "chi_owner_nodes.sql").read_text())
+    columns = [list(column) for column in zip(*cursor.fetchall())]
+    return OwnerNodes(*columns) if columns else OwnerNodes([], [], [], [], [], [])
+
+
+def get_group_edges(keys: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return edges (as arrays of sources and targets) that connect each node
+    to the first node with the same key, ignoring empty keys, e.g.:
+
+        >>> get_group_edges(['a', '', 'b', 'a', 'a'])
+        (array([3, 4]), array([0, 0]))
+
+    Connecting a group of nodes in a star like this, rather than to each
+    other, keeps the number of edges linear even for the names and
+    addresses that thousands of owners share.
+    """
+
+    key_array = np.array(keys, dtype=object)
+    nodes = np.flatnonzero(key_array != "")
+    _, first, inverse = np.unique(
+        key_array[nodes], return_index=True, return_inverse=True
+    )
+    hubs = nodes[first][inverse]
+    is_edge = hubs != nodes
+    return nodes[is_edge], hubs[is_edge]
+
+
+def get_owner_graph(nodes: OwnerNodes) -> CsrGraph:
+    """
+    Return the graph of the given owners, with edges between owners with the
+    same name in the same zip code, and between owners with the same mailing
+    address. Nodes are numbered from 1.
+    """
+
+    def keys_in_zip(keys: List[str]) -> List[str]:
+        return [f"{key}|{zip}" if key else "" for key, zip in zip(keys, nodes.zips)]
+
+    name_sources, name_targets = get_group_edges(keys_in_zip(nodes.name_keys))
+    bizaddr_sources, bizaddr_targets = get_group_edges(keys_in_zip(nodes.bizaddr_keys))
+    return CsrGraph.from_edges(
+        np.arange(1, len(nodes) + 1),
+        nodes.names,
+        nodes.bizaddrs,
+        nodes.pins,
+        np.concatenate([name_sources, bizaddr_sources]),
+        np.concatenate([name_targets, bizaddr_targets]),
+        np.concatenate(
+            [
+                np.full(len(name_sources), NAME_EDGE_WEIGHT),
+                np.full(len(bizaddr_sources), BIZADDR_EDGE_WEIGHT),
+            ]
+        ),
+        np.concatenate(
+            [
+                np.full(len(name_sources), EDGE_TYPES.index("name")),
+                np.full(len(bizaddr_sources), EDGE_TYPES.index("bizaddr")),
+            ]
+        ),
+    )
+
+
+def to_portfolio(orig_id: int, graph: CsrGraph) -> Portfolio:
+    return Portfolio(
+        orig_id,
+        sorted(graph.bbls.tolist()),
+        sorted(set(graph.names.tolist())),
+        to_json_graph(graph),
+    )
+
+
+def iter_owner_portfolios(nodes: OwnerNodes, jobs: int = 1) -> Iterator[Portfolio]:
+    """
+    Yield the portfolios of the connected components of the owner graph,
+    numbered in order of their smallest PIN. Components with too many PINs
+    are split up with Louvain, in up to `jobs` processes at once, and their
+    parts share the component's id.
+    """
+
+    # The nodes are in order of their smallest PIN, so the components are too.
+    for orig_id, subgraph in iter_split_graph(get_owner_graph(nodes), jobs):
+        yield to_portfolio(orig_id, subgraph)
@@ -0,0 +1,52 @@
+-- The nodes of the Chicago owner graph built in "portfoliograph/owner_graph.py".
+-- Each node is the owners of the latest parcels that share a mailing name,
+-- mailing address and mailing zip code. The name and address are compared
+-- once they've been upper-cased and stripped of punctuation, so that e.g.
+-- "Funky Holdings, LLC" and "FUNKY HOLDINGS LLC" are the same node. Owners
+-- without a mailing name or address can't be matched with anyone, so
+-- they're grouped by their row_id (or PIN) as before.
+
+WITH latest_parcels AS (
+    SELECT DISTINCT ON (pin)
+        pin
+    FROM chi_parcels
+    ORDER BY
+        pin,
+        year DESC NULLS LAST
+),
+latest_owners AS (
+    SELECT DISTINCT ON (pin)
+        *
+    FROM chi_owners
+    ORDER BY
+        pin,
+        year DESC NULLS LAST
+),
+owners AS (
+    SELECT
+        p.pin,
+        o.mail_address_name,
+        o.mail_address_full,
+        o.row_id,
+        upper(btrim(regexp_replace(coalesce(o.mail_address_name, ''), '[^A-Za-z0-9&]+', ' ', 'g'))) AS name_key,
+        upper(btrim(regexp_replace(coalesce(o.mail_address_full, ''), '[^A-Za-z0-9]+', ' ', 'g'))) AS bizaddr_key,
+        left(coalesce(o.mail_address_zipcode_1, ''), 5) AS zip
+    FROM latest_parcels AS p
+    LEFT JOIN latest_owners AS o ON o.pin = p.pin
+)
+SELECT
+    coalesce(min(nullif(mail_address_name, '')), min(nullif(row_id, '')), min(pin)) AS name,
+    coalesce(min(nullif(mail_address_full, '')), '') AS bizaddr,
+    name_key,
+    bizaddr_key,
+    zip,
+    array_agg(pin ORDER BY pin) AS pins
+FROM owners
+GROUP BY
+    name_key,
+    bizaddr_key,
+    zip,
+    CASE
+        WHEN name_key = '' AND bizaddr_key = '' THEN coalesce(nullif(row_id, ''), pin)
+    END
+ORDER BY min(pin);
@@ -0,0 +1,21 @@
+-- How many pairs of landlords the joins in "landlords_with_connections.sql"
+-- produce, before they're filtered by similarity, for comparing it with
+-- "portfoliograph/matching.py". Each pair is counted in both directions, like
+-- the joins do.
+
+SELECT
+	(
+		SELECT count(*)
+		FROM landlords_grouped AS orig
+		JOIN landlords_grouped AS matched USING(name)
+		WHERE orig.nodeid != matched.nodeid
+	) AS name_pairs,
+	(
+		SELECT count(*)
+		FROM landlords_grouped AS orig
+		JOIN landlords_grouped AS matched
+			ON orig.bizhousestreet = matched.bizhousestreet
+			  AND (orig.bizaptnum = matched.bizaptnum OR orig.bizaptnum = '' OR matched.bizaptnum = '')
+			  AND orig.bizzip = matched.bizzip
+		WHERE orig.nodeid != matched.nodeid
+	) AS bizaddr_pairs;
@@ -0,0 +1,32 @@
+-- The rows of `landlords_with_connections` (see
+-- "landlords_with_connections.sql"), with the node ids and weights of their
+-- matches unpacked from JSON into arrays, so that "portfoliograph/graph.py"
+-- can stream them straight into the arrays of its graph.
+
+SELECT
+	nodeid,
+	name,
+	bizaddr,
+	bbls,
+	ARRAY(
+		SELECT (m.match->>'nodeid')::bigint
+		FROM json_array_elements(name_match_info) WITH ORDINALITY AS m(match, i)
+		ORDER BY m.i
+	) AS name_match_nodeids,
+	ARRAY(
+		SELECT (m.match->>'weight')::float8
+		FROM json_array_elements(name_match_info) WITH ORDINALITY AS m(match, i)
+		ORDER BY m.i
+	) AS name_match_weights,
+	ARRAY(
+		SELECT (m.match->>'nodeid')::bigint
+		FROM json_array_elements(bizaddr_match_info) WITH ORDINALITY AS m(match, i)
+		ORDER BY m.i
+	) AS bizaddr_match_nodeids,
+	ARRAY(
+		SELECT (m.match->>'weight')::float8
+		FROM json_array_elements(bizaddr_match_info) WITH ORDINALITY AS m(match, i)
+		ORDER BY m.i
+	) AS bizaddr_match_weights
+FROM landlords_with_connections
+ORDER BY nodeid;
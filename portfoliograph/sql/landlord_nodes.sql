@@ -0,0 +1,13 @@
+-- The nodes of `landlords_grouped` (see "landlords_grouped.sql"), for
+-- "portfoliograph/matching.py" to match up in Python.
+
+SELECT
+	nodeid,
+	name,
+	bizaddr,
+	bizhousestreet,
+	bizaptnum,
+	bizzip,
+	bbls
+FROM landlords_grouped
+ORDER BY nodeid;
@@ -0,0 +1,30 @@
+-- The nodes of the landlord graph: the contacts in `wow_landlords` that share
+-- a name and business address, with all their BBLs. They're matched up with
+-- each other either in SQL (see "landlords_with_connections.sql") or in
+-- Python (see "portfoliograph/matching.py").
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+
+DROP TABLE IF EXISTS landlords_grouped;
+CREATE TEMPORARY TABLE IF NOT EXISTS landlords_grouped AS (
+	SELECT 
+		row_number() OVER () AS nodeid,
+		name,
+		bizaddr,
+		bizhousestreet,
+		bizapt,
+		regexp_replace(bizapt, '\D','','g') AS bizaptnum,
+		bizzip,
+		array_agg(bbl) AS bbls
+	FROM wow_landlords
+	WHERE bbl IS NOT NULL
+	GROUP BY name, bizaddr, bizhousestreet, bizapt, bizaptnum, bizzip
+);
+
+CREATE INDEX ON landlords_grouped (nodeid);
+CREATE INDEX ON landlords_grouped (name);
+CREATE INDEX ON landlords_grouped (bizaddr);
+CREATE INDEX ON landlords_grouped (bizzip);
+CREATE INDEX ON landlords_grouped (bizhousestreet, bizaptnum);
+CREATE INDEX ON landlords_grouped USING gin(bizhousestreet gin_trgm_ops);
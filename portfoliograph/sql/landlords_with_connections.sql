@@ -1,44 +1,21 @@
 -- The table `wow_landlords` is created starting from
 -- `landlords_to_standardize.sql` to get a contact from hpd
 -- registration/contacts for each bbl/registration, then standardizing their
--- business addresses in `standardize.py`. Now we can use that table to join
--- with itself to create all the connections (edges) between contacts (nodes)
+-- business addresses in `standardize.py`. Those contacts are grouped into
+-- `landlords_grouped` by `landlords_grouped.sql`, which must be run first. Now
+-- we can join that table with itself to create all the connections (edges)
+-- between contacts (nodes)
 -- based on matching names and business addresses (details inline below). Then
 -- we also use those matching critera to set a weight representing our
 -- confidence in the connections that will be used later by the algorithm
 -- splitting the intial connected components. This query is called in
--- "portfoliograph/graph.py" where the data gets translated into graph network.
+-- "portfoliograph/graph.py", which then streams the table's rows (see
+-- "landlord_graph_rows.sql") into a graph network.
 
 
 -- http://blog.scoutapp.com/articles/2016/07/12/how-to-make-text-searches-in-postgresql-faster-with-trigram-similarity
 -- http://www.postgresonline.com/journal/archives/169-Fuzzy-string-matching-with-Trigram-and-Trigraphs.html
 
-CREATE EXTENSION IF NOT EXISTS pg_trgm;
-
-
-DROP TABLE IF EXISTS landlords_grouped;
-CREATE TEMPORARY TABLE IF NOT EXISTS landlords_grouped AS (
-	SELECT 
-		row_number() OVER () AS nodeid,
-		name,
-		bizaddr,
-		bizhousestreet,
-		bizapt,
-		regexp_replace(bizapt, '\D','','g') AS bizaptnum,
-		bizzip,
-		array_agg(bbl) AS bbls
-	FROM wow_landlords
-	WHERE bbl IS NOT NULL
-	GROUP BY name, bizaddr, bizhousestreet, bizapt, bizaptnum, bizzip
-);
-
-CREATE INDEX ON landlords_grouped (nodeid);
-CREATE INDEX ON landlords_grouped (name);
-CREATE INDEX ON landlords_grouped (bizaddr);
-CREATE INDEX ON landlords_grouped (bizzip);
-CREATE INDEX ON landlords_grouped (bizhousestreet, bizaptnum);
-CREATE INDEX ON landlords_grouped USING gin(bizhousestreet gin_trgm_ops);
-
 DROP TABLE IF EXISTS landlords_with_connections;
 CREATE TABLE IF NOT EXISTS landlords_with_connections AS
 WITH matched_names AS (
@@ -119,5 +96,3 @@ FROM landlords_grouped AS l
 LEFT JOIN matched_names_agg AS n USING(nodeid)
 LEFT JOIN matched_bizaddrs_agg AS b USING(nodeid)
 ORDER BY nodeid;
-
-SELECT * FROM landlords_with_connections;
\ No newline at end of file
@@ -1,6 +1,32 @@
-from typing import TextIO
+from typing import Iterable, Iterator, List, TextIO, TypeVar
+import itertools
 import json
 
+from psycopg2.extras import execute_values
+
+from .owner_graph import get_owner_nodes, iter_owner_portfolios
+
+# How many portfolios we insert with each statement.
+INSERT_BATCH_SIZE = 1000
+
+T = TypeVar("T")
+
+
+def iter_batches(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Yield lists of up to the given number of items, e.g.:
+
+        >>> list(iter_batches(range(5), 2))
+        [[0, 1], [2, 3], [4]]
+    """
+
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
 
 def export_portfolios_table_json(conn, outfile: TextIO):
     with conn.cursor() as cursor:
@@ -30,38 +56,28 @@ def export_portfolios_table_json(conn, outfile: TextIO):
     outfile.write("\n]\n")
 
 
-def populate_portfolios_table(conn, table="wow_portfolios"):
+def populate_portfolios_table(conn, table="wow_portfolios", jobs: int = 1) -> int:
+    """
+    Populate the portfolios table from the owner graph (see owner_graph.py),
+    returning the number of portfolios. Oversized portfolios are split in up
+    to `jobs` processes at once.
+    """
+
     with conn.cursor() as cursor:
+        nodes = get_owner_nodes(cursor)
         cursor.execute(f"TRUNCATE {table}")
-        cursor.execute(
-            f"""
-            INSERT INTO {table} (orig_id, pins, owner_names, graph)
-            WITH latest_parcels AS (
-                SELECT DISTINCT ON (pin)
-                    *
-                FROM chi_parcels
-                ORDER BY
-                    pin,
-                    NULLIF(year, '')::int DESC NULLS LAST
-            ),
-            latest_owners AS (
-                SELECT DISTINCT ON (pin)
-                    *
-                FROM chi_owners
-                ORDER BY
-                    pin,
-                    NULLIF(year, '')::int DESC NULLS LAST
+        count = 0
+        for batch in iter_batches(
+            iter_owner_portfolios(nodes, jobs), INSERT_BATCH_SIZE
+        ):
+            execute_values(
+                cursor,
+                f"INSERT INTO {table} (orig_id, pins, owner_names, graph) VALUES %s",
+                [
+                    (p.orig_id, p.pins, p.owner_names, json.dumps(p.graph))
+                    for p in batch
+                ],
+                page_size=INSERT_BATCH_SIZE,
             )
-            SELECT
-                row_number() OVER (
-                    ORDER BY coalesce(nullif(o.mail_address_name, ''), nullif(o.row_id, ''), p.pin)
-                ) AS orig_id,
-                array_agg(p.pin ORDER BY p.pin) AS pins,
-                ARRAY[coalesce(nullif(o.mail_address_name, ''), nullif(o.row_id, ''), p.pin)] AS owner_names,
-                '{{}}'::jsonb AS graph
-            FROM latest_parcels AS p
-            LEFT JOIN latest_owners AS o ON o.pin = p.pin
-            GROUP BY coalesce(nullif(o.mail_address_name, ''), nullif(o.row_id, ''), p.pin)
-            HAVING count(p.pin) > 0
-            """
-        )
+            count += len(batch)
+        return count
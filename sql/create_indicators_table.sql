@@ -1,76 +1,56 @@
-DROP TABLE IF EXISTS wow_indicators;
+-- Addresses are matched on the address_key computed when the datasets are
+-- loaded (see dbbuild/addresses.py), which is indexed on all three tables.
+--
+-- get_indicators() computes the indicators of the given parcels (or all of
+-- them, if none are given), so that `python dbtool.py refreshindicators` can
+-- update just the ones whose violations, 311 requests or permits changed.
+-- It's dropped first, since CREATE OR REPLACE can't change what it returns
+-- when a build is resumed in a schema that already has it.
+DROP FUNCTION IF EXISTS get_indicators(text[]);
 
-CREATE TABLE wow_indicators AS
+CREATE OR REPLACE FUNCTION get_indicators(pins text[] DEFAULT NULL)
+RETURNS TABLE (
+    pin text,
+    permits_total bigint,
+    violations_open bigint,
+    violations_total bigint,
+    requests_311_total bigint
+) AS $$
 WITH parcels AS (
     SELECT
-        pin,
-        pin10,
-        upper(
-            regexp_replace(
-                regexp_replace(trim(coalesce(address, '')), '\\s+(APT|UNIT|#|SUITE|STE|FL|FLOOR|RM|ROOM|P-?\\S+).*$','', 'i'),
-                '\\s+',
-                ' ',
-                'g'
-            )
-        ) AS addr_norm
-    FROM wow_parcels
+        wp.pin,
+        wp.pin10,
+        wp.address_key
+    FROM wow_parcels AS wp
+    WHERE $1 IS NULL OR wp.pin = ANY($1)
 ),
+-- chi_permit_pins has a row for each PIN in each permit's pin_list, and is
+-- built as chi_permits is loaded.
 permits_by_pin AS (
     SELECT
         p.pin,
-        count(perm.pin10) AS permits_total
+        count(pp.pin10) AS permits_total
     FROM parcels AS p
-    LEFT JOIN chi_permits AS cp ON TRUE
-    LEFT JOIN LATERAL (
-        SELECT
-            trim(pin_value) AS pin10
-        FROM unnest(regexp_split_to_array(coalesce(cp.pin_list, ''), '\\s*\\|\\s*')) AS pin_value
-        WHERE pin_value <> ''
-    ) AS perm ON perm.pin10 = p.pin10
+    LEFT JOIN chi_permit_pins AS pp ON pp.pin10 = p.pin10
     GROUP BY p.pin
 ),
-violations_norm AS (
-    SELECT
-        upper(
-            regexp_replace(
-                trim(concat_ws(' ', street_number, street_direction, street_name, street_type)),
-                '\\s+',
-                ' ',
-                'g'
-            )
-        ) AS addr_norm,
-        violation_status AS status
-    FROM chi_violations
-),
 violations_by_pin AS (
     SELECT
         p.pin,
-        count(v.addr_norm) AS violations_total,
-        count(v.addr_norm) FILTER (
-            WHERE coalesce(v.status, '') ILIKE 'open%'
+        count(v.address_key) AS violations_total,
+        count(v.address_key) FILTER (
+            WHERE coalesce(v.violation_status, '') ILIKE 'open%'
         ) AS violations_open
     FROM parcels AS p
-    LEFT JOIN violations_norm AS v ON v.addr_norm <> '' AND v.addr_norm = p.addr_norm
+    LEFT JOIN chi_violations AS v ON v.address_key = p.address_key
     GROUP BY p.pin
 ),
-requests_norm AS (
-    SELECT
-        upper(
-            regexp_replace(
-                trim(concat_ws(' ', street_number, street_direction, street_name, street_type)),
-                '\\s+',
-                ' ',
-                'g'
-            )
-        ) AS addr_norm
-    FROM chi_311
-),
 requests_by_pin AS (
     SELECT
         p.pin,
-        count(r.addr_norm) AS requests_311_total
+        count(r.address_key) AS requests_311_total
     FROM parcels AS p
-    LEFT JOIN requests_norm AS r ON r.addr_norm <> '' AND r.addr_norm = p.addr_norm
+    LEFT JOIN chi_311 AS r ON r.address_key = p.address_key
     GROUP BY p.pin
 )
 SELECT
@@ -83,5 +63,9 @@ FROM parcels AS p
 LEFT JOIN permits_by_pin AS permits ON permits.pin = p.pin
 LEFT JOIN violations_by_pin AS viol ON viol.pin = p.pin
 LEFT JOIN requests_by_pin AS req ON req.pin = p.pin;
+$$ LANGUAGE sql STABLE;
+
+CREATE TABLE wow_indicators AS
+SELECT * FROM get_indicators();
 
-CREATE INDEX ON wow_indicators (pin);
+CREATE UNIQUE INDEX ON wow_indicators (pin);
@@ -1,5 +1,3 @@
-DROP TABLE IF EXISTS wow_parcels CASCADE;
-
 CREATE TABLE wow_parcels AS
 WITH latest_parcels AS (
     SELECT DISTINCT ON (pin)
@@ -7,7 +5,7 @@ WITH latest_parcels AS (
     FROM chi_parcels
     ORDER BY
         pin,
-        NULLIF(year, '')::int DESC NULLS LAST
+        year DESC NULLS LAST
 ),
 latest_owners AS (
     SELECT DISTINCT ON (pin)
@@ -15,7 +13,7 @@ latest_owners AS (
     FROM chi_owners
     ORDER BY
         pin,
-        NULLIF(year, '')::int DESC NULLS LAST
+        year DESC NULLS LAST
 ),
 parcels_with_owner AS (
     SELECT
@@ -37,14 +35,15 @@ parcels_with_owner AS (
         o.mail_address_city_name,
         o.mail_address_state,
         o.mail_address_zipcode_1,
-        o.row_id
+        o.row_id,
+        o.address_key
     FROM latest_parcels AS p
     LEFT JOIN latest_owners AS o ON o.pin = p.pin
 )
 SELECT
     p.pin,
-    substring(p.prop_address_full from '^(\\d+[A-Za-z]?)') AS housenumber,
-    nullif(regexp_replace(p.prop_address_full, '^\\s*\\d+[A-Za-z]?\\s+', ''), '') AS streetname,
+    substring(p.prop_address_full from '^(\d+[A-Za-z]?)') AS housenumber,
+    nullif(regexp_replace(p.prop_address_full, '^\s*\d+[A-Za-z]?\s+', ''), '') AS streetname,
     p.prop_address_full AS address,
     p.prop_address_city_name AS city,
     p.prop_address_state AS state,
@@ -58,16 +57,18 @@ SELECT
     p.mail_address_city_name AS mailing_city,
     p.mail_address_state AS mailing_state,
     p.mail_address_zipcode_1 AS mailing_zip,
-    NULLIF(p.lat, '')::numeric AS lat,
-    NULLIF(p.lon, '')::numeric AS lng,
+    p.lat,
+    p.lon AS lng,
     p.ward_num AS ward,
     p.chicago_community_area_name AS community_area,
     p.census_tract_geoid AS census_tract,
-    p.pin10
+    p.pin10,
+    p.address_key
 FROM parcels_with_owner AS p;
 
 CREATE INDEX ON wow_parcels (pin);
 CREATE INDEX ON wow_parcels (owner_id);
+CREATE INDEX ON wow_parcels (address_key);
 CREATE INDEX ON wow_parcels (zip);
 CREATE INDEX ON wow_parcels (ward);
 CREATE INDEX ON wow_parcels (community_area);
@@ -1,4 +1,3 @@
-DROP TABLE if exists wow_portfolios cascade;
 CREATE TABLE wow_portfolios (
     orig_id int,
     pins text[],
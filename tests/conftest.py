@@ -63,6 +63,8 @@ def db():
                 raise e
 
     if not created:
+        # Pooled connections would keep us from dropping the database.
+        TEST_DB.close_pools()
         drop_db(db)
         create_db(db)
 
@@ -82,11 +84,13 @@ class DbContext:
     @contextmanager
     def connect(self):
         """
-        Connect to the database.
+        Get a connection to the database from the pool, committing (or
+        rolling back) its transaction when we're done with it.
         """
 
-        with psycopg2.connect(**TEST_DB.psycopg2_connect_kwargs()) as conn:
-            yield conn
+        with TEST_DB.get_pool().connection() as conn:
+            with conn:
+                yield conn
 
     @contextmanager
     def cursor(self):
@@ -33,6 +33,15 @@ class ChiDbContext:
 
         self.builder.ensure_dataset(name, force_refresh=True)
 
+    def load_datasets(self, *names: str, jobs: int = 2):
+        """Load the given Chicago datasets in parallel."""
+
+        self.builder.jobs = jobs
+        try:
+            self.builder.load_datasets(list(names), force_refresh=True)
+        finally:
+            self.builder.jobs = 1
+
     def _write_csv_to_file(self, csvfile, namedtuples):
         header_row = [unmunge_colname(colname) for colname in namedtuples[0]._fields]
         writer = csv.writer(csvfile)
@@ -65,4 +74,6 @@ def nycdb_ctx(get_cursor):
     """
 
     with tempfile.TemporaryDirectory() as dirname:
-        yield ChiDbContext(dirname, get_cursor)
+        ctx = ChiDbContext(dirname, get_cursor)
+        yield ctx
+        ctx.builder.close()
@@ -0,0 +1,34 @@
+import csv
+from pathlib import Path
+
+import pytest
+
+from dbbuild.addresses import get_address_key, get_full_address_key
+
+NORMALIZED_DIR = Path(__file__).parent.parent / "data" / "normalized"
+
+
+@pytest.mark.parametrize(
+    "filename", ["chi_311_normalized.csv", "chi_violations_normalized.csv"]
+)
+def test_keys_match_the_normalized_datasets(filename):
+    with (NORMALIZED_DIR / filename).open(newline="") as f:
+        for row in csv.DictReader(f):
+            key = get_address_key(
+                row["house"], row["direction"], row["street_name"], row["street_type"]
+            )
+            assert key == row["address_key"], row["raw_address"]
+
+
+@pytest.mark.parametrize(
+    "address,key",
+    [
+        ("1100 S OHARE ST", "1100 S OHARE ST"),
+        ("12-14 W ELM ST", "12-14 W ELM ST"),
+        ("N OCTAVIA ST", ""),
+        ("CICERO", ""),
+        ("", ""),
+    ],
+)
+def test_full_addresses_need_a_house_number(address, key):
+    assert get_full_address_key(address) == key
@@ -0,0 +1,18 @@
+import dbtool
+from dbbuild import benchmark
+
+from .nycdb_context import TEST_DB
+
+
+def test_run_benchmark_builds_each_scale(db):
+    results = dbtool.run_benchmark(TEST_DB, [0.01, 0.005], seed=0, jobs=1)
+    assert [(r.scale, r.parcels) for r in results] == [(0.005, 90), (0.01, 180)]
+    for result in results:
+        assert result.seconds > 0
+        assert result.peak_memory_bytes > 0
+        assert "load chi_311" in result.steps
+        assert "create_indicators_table.sql" in result.steps
+
+    curve = benchmark.get_scaling_curve(results)
+    assert set(curve) == set(benchmark.get_steps(results))
+    assert benchmark.find_regressions(results, results, benchmark.Tolerances()) == []
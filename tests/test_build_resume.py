@@ -0,0 +1,37 @@
+import pytest
+
+from dbbuild.executor import BuildFailedError
+
+
+def test_failed_builds_can_be_resumed(db, nycdb_ctx, monkeypatch):
+    builder = nycdb_ctx.builder
+    get_build_steps = builder.get_build_steps
+
+    def get_broken_build_steps():
+        def fail(conn, profile):
+            raise ValueError("oops")
+
+        return [
+            step._replace(run=fail) if step.name == "agg_function.sql" else step
+            for step in get_build_steps()
+        ]
+
+    monkeypatch.setattr(builder, "get_build_steps", get_broken_build_steps)
+    with pytest.raises(BuildFailedError):
+        builder.build(force_refresh=True)
+    with db.cursor() as cur:
+        cur.execute("SELECT step, completed_at FROM build_checkpoints")
+        completed = dict(cur.fetchall())
+    assert "create_parcels_table.sql" in completed
+    assert "agg_function.sql" not in completed
+
+    monkeypatch.setattr(builder, "get_build_steps", get_build_steps)
+    builder.build(force_refresh=False, resume=True)
+    with db.cursor() as cur:
+        cur.execute("SELECT step, completed_at FROM build_checkpoints")
+        resumed = dict(cur.fetchall())
+        cur.execute("SELECT count(*) FROM wow_build_schemas")
+        assert cur.fetchone()[0] == 1
+        cur.execute("SELECT * FROM get_agg_info_from_pin('12345678901234')")
+    assert resumed["create_parcels_table.sql"] == completed["create_parcels_table.sql"]
+    assert "agg_function.sql" in resumed
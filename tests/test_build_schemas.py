@@ -0,0 +1,63 @@
+from contextlib import closing
+
+from dbbuild import schemas
+
+from .nycdb_context import TEST_DB
+
+
+def create_build(db, value: str) -> str:
+    with closing(TEST_DB.connection()) as conn:
+        schema = schemas.create_build_schema(conn)
+        with conn, conn.cursor() as cur:
+            cur.execute(f"CREATE TABLE {schema}.wow_thing AS SELECT '{value}' AS value")
+    return schema
+
+
+def activate(schema: str) -> None:
+    with closing(TEST_DB.connection()) as conn:
+        schemas.activate_build_schema(conn, TEST_DB.database, schema)
+    # Pooled sessions keep using the search path they started with.
+    TEST_DB.close_pools()
+
+
+def get_live_value(db) -> str:
+    with db.cursor() as cur:
+        cur.execute("SELECT value FROM wow_thing")
+        return cur.fetchone()[0]
+
+
+def test_builds_can_be_activated_and_rolled_back(db):
+    first = create_build(db, "first")
+    second = create_build(db, "second")
+    activate(first)
+    assert get_live_value(db) == "first"
+
+    activate(second)
+    assert get_live_value(db) == "second"
+
+    with closing(TEST_DB.connection()) as conn:
+        assert schemas.get_previous_build_schema(conn) == first
+    activate(first)
+    with closing(TEST_DB.connection()) as conn:
+        assert schemas.get_active_build_schema(conn) == first
+    assert get_live_value(db) == "first"
+
+
+def test_old_builds_are_dropped(db):
+    with closing(TEST_DB.connection()) as conn:
+        active = schemas.get_active_build_schema(conn)
+    unfinished = create_build(db, "unfinished")
+    newest = create_build(db, "newest")
+    activate(newest)
+    with closing(TEST_DB.connection()) as conn:
+        dropped = schemas.drop_old_build_schemas(conn, keep=1)
+    assert unfinished in dropped
+    assert active in dropped
+    assert newest not in dropped
+
+    with db.cursor() as cur:
+        cur.execute(
+            "SELECT nspname FROM pg_namespace WHERE nspname LIKE 'wow_build_%%'"
+        )
+        assert [row[0] for row in cur.fetchall()] == [newest]
+    assert get_live_value(db) == "newest"
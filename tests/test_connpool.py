@@ -0,0 +1,74 @@
+import pytest
+
+from dbbuild.connpool import ConnectionPool, PoolError, get_free_connections
+
+from .nycdb_context import TEST_DB
+
+
+def make_pool(max_size=2):
+    return ConnectionPool(lambda: TEST_DB.connection({"work_mem": "77MB"}), max_size)
+
+
+def get_setting(conn, name):
+    with conn.cursor() as cur:
+        cur.execute(f"SHOW {name}")
+        return cur.fetchone()[0]
+
+
+def test_connections_are_reused_and_reset(db):
+    pool = make_pool()
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SET search_path = nowhere")
+            cur.execute("SET work_mem = '1MB'")
+    with pool.connection() as reused:
+        assert reused is conn
+        assert get_setting(reused, "search_path") != "nowhere"
+        assert get_setting(reused, "work_mem") == "77MB"
+    pool.closeall()
+
+
+def test_pool_size_is_bounded(db):
+    pool = make_pool(max_size=1)
+    conn = pool.getconn()
+    with pytest.raises(PoolError):
+        pool.getconn(timeout=0)
+    pool.putconn(conn)
+    pool.putconn(pool.getconn(timeout=0))
+    pool.closeall()
+
+
+def test_connections_in_use_are_closed_after_closeall(db):
+    pool = make_pool()
+    conn = pool.getconn()
+    pool.closeall()
+    pool.putconn(conn)
+    assert conn.closed
+    with pool.connection() as new_conn:
+        assert new_conn is not conn
+    pool.closeall()
+
+
+def test_reserved_connections_count_against_the_pool_size(db):
+    pool = make_pool(max_size=3)
+    conn = pool.getconn()
+    with pool.reserve(5) as reserved:
+        assert reserved == 2
+        with pytest.raises(PoolError):
+            pool.getconn(timeout=0)
+        with pytest.raises(PoolError):
+            with pool.reserve(1, timeout=0):
+                pass
+    pool.putconn(conn)
+    pool.putconn(pool.getconn(timeout=0))
+    pool.closeall()
+
+
+def test_free_connections_leave_out_open_ones(db):
+    pool = make_pool()
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            free = get_free_connections(cur)
+            with pool.connection():
+                assert get_free_connections(cur) == free - 1
+    pool.closeall()
@@ -0,0 +1,90 @@
+import random
+
+import networkx as nx
+import numpy as np
+from psycopg2.extras import execute_values
+import pytest
+
+from dbtool import SQL_DIR
+from portfoliograph.csrgraph import CsrGraph
+from portfoliograph.graph import build_graph, iter_split_graph, to_json_graph
+
+
+LANDLORDS = [
+    ("0000000001", "BOOP", "1 A ST", "1 A ST", "", "60601"),
+    ("0000000002", "BOOP", "1 A ST APT 2", "1 A ST", "APT 2", "60601"),
+    ("0000000003", "BOOP", "1 A ST APT 2", "1 A ST", "APT 2", "60601"),
+    ("0000000004", "BLAP", "9 B ST", "9 B ST", "", "60601"),
+]
+
+
+def build_landlords_graph(db, **kwargs):
+    with db.connect() as conn:
+        with conn.cursor() as cur:
+            cur.execute((SQL_DIR / "create_landlords_table.sql").read_text())
+            execute_values(
+                cur,
+                "INSERT INTO wow_landlords "
+                "(bbl, name, bizaddr, bizhousestreet, bizapt, bizzip) VALUES %s",
+                LANDLORDS,
+            )
+        return build_graph(conn, **kwargs)
+
+
+@pytest.mark.parametrize("fetch_size", [1, 1000])
+def test_build_graph_streams_landlords_with_connections(db, fetch_size):
+    graph = build_landlords_graph(db, fetch_size=fetch_size)
+    # The two BOOPs match by name and by bizaddr, but only the first edge
+    # between them is kept.
+    assert (len(graph), graph.edge_count, graph.bbl_count) == (3, 1, 4)
+
+    portfolios = list(iter_split_graph(graph))
+    assert [id for id, _ in portfolios] == [1, 2]
+    boop = next(graph for _, graph in portfolios if len(graph) == 2)
+    json_graph = to_json_graph(boop)
+    assert [(node["bizAddr"], node["bbls"]) for node in json_graph["nodes"]] == [
+        ("1 A ST", ["0000000001"]),
+        ("1 A ST APT 2", ["0000000002", "0000000003"]),
+    ]
+    assert json_graph["edges"] == [
+        {
+            "source": json_graph["nodes"][0]["id"],
+            "target": json_graph["nodes"][1]["id"],
+            "type": "name",
+            "weight": 2.0,
+        }
+    ]
+
+
+def test_components_match_networkx():
+    rng = random.Random(1)
+    node_count = 500
+    sources = [rng.randrange(node_count) for _ in range(400)]
+    targets = [rng.randrange(node_count) for _ in range(400)]
+    graph = CsrGraph.from_edges(
+        np.arange(node_count),
+        [f"NAME {i}" for i in range(node_count)],
+        [""] * node_count,
+        [[str(i)] for i in range(node_count)],
+        sources,
+        targets,
+        [1.0] * len(sources),
+        [0] * len(sources),
+    )
+    expected = nx.Graph()
+    expected.add_nodes_from(range(node_count))
+    expected.add_edges_from(zip(sources, targets))
+    expected.remove_edges_from(nx.selfloop_edges(expected))
+
+    assert graph.edge_count == expected.number_of_edges()
+    components = [set(c.node_ids.tolist()) for c in graph.iter_components()]
+    assert sorted(components, key=min) == sorted(
+        nx.connected_components(expected), key=min
+    )
+    assert [min(c) for c in components] == sorted(min(c) for c in components)
+    for component in graph.iter_components():
+        edges = {(s, t) for s, t, _, _ in component.iter_edges()}
+        ids = component.node_ids
+        assert {(ids[s], ids[t]) for s, t in edges} == {
+            tuple(sorted(e)) for e in expected.subgraph(ids.tolist()).edges()
+        }
@@ -0,0 +1,40 @@
+import csv
+import io
+
+import pytest
+
+from dbbuild import csvsplit
+from dbbuild.csvsplit import ByteRangeReader, find_record_ranges
+
+
+CSV = b"id,name\r\n" + b"".join(
+    b'%d,"Funky ""%d"", Inc.\nSuite %d"\r\n' % (i, i, i)
+    if i % 3
+    else b"%d,plain\r\n" % i
+    for i in range(50)
+)
+
+
+def read_range(start, end):
+    f = io.TextIOWrapper(
+        io.BufferedReader(ByteRangeReader(io.BytesIO(CSV), start, end)), newline=""
+    )
+    return list(csv.reader(f))
+
+
+@pytest.mark.parametrize("parts", [1, 2, 7, 100])
+def test_ranges_split_on_record_boundaries(parts, monkeypatch):
+    # Make sure targets and boundaries span blocks, too.
+    monkeypatch.setattr(csvsplit, "SCAN_BLOCK_SIZE", 16)
+    ranges = find_record_ranges(io.BytesIO(CSV), len(CSV), parts)
+    assert 1 <= len(ranges) <= parts
+    assert ranges[0][0] == len(b"id,name\r\n")
+    assert ranges[-1][1] == len(CSV)
+
+    rows = [row for start, end in ranges for row in read_range(start, end)]
+    assert rows == list(csv.reader(io.StringIO(CSV.decode(), newline="")))[1:]
+
+
+def test_files_without_records_have_no_ranges():
+    assert find_record_ranges(io.BytesIO(b"id,name\n"), 8, 2) == []
+    assert find_record_ranges(io.BytesIO(b"id,name"), 7, 2) == []
@@ -0,0 +1,47 @@
+import io
+from typing import List
+
+import pytest
+
+from dbbuild.csvstream import CsvProjection
+
+
+HEADER = ["id", "junk", "name"]
+
+ROWS = '1,x,"Funky, Inc."\r\n2,y,"multi\nline"\r\n3\r\n'
+
+
+def read_in_chunks(f, size):
+    chunks: List[str] = []
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return "".join(chunks)
+        chunks.append(chunk)
+
+
+def test_it_projects_columns_in_the_given_order():
+    f = CsvProjection(io.StringIO(ROWS), HEADER, ["name", "id"])
+    assert f.read() == '"Funky, Inc.",1\n"multi\nline",2\n,3\n'
+
+
+@pytest.mark.parametrize("size", [1, 7, 8192])
+def test_it_streams_in_small_chunks(size):
+    expected = CsvProjection(io.StringIO(ROWS), HEADER, ["id", "name"]).read()
+    f = CsvProjection(io.StringIO(ROWS), HEADER, ["id", "name"], chunk_size=5)
+    assert read_in_chunks(f, size) == expected
+
+
+def test_it_raises_on_missing_columns():
+    with pytest.raises(ValueError, match="missing columns: boop"):
+        CsvProjection(io.StringIO(ROWS), HEADER, ["id", "boop"])
+
+
+def test_derived_columns_see_padded_rows_and_can_be_projected():
+    f = CsvProjection(
+        io.StringIO(ROWS),
+        HEADER,
+        ["id", "shout"],
+        derived_columns=[("shout", lambda row: row[2].upper())],
+    )
+    assert f.read() == '1,"FUNKY, INC."\n2,"MULTI\nLINE"\n3,\n'
@@ -0,0 +1,98 @@
+import threading
+from typing import Dict, List, Sequence
+
+import pytest
+
+from dbbuild.checkpoints import Checkpoints
+from dbbuild.executor import BuildFailedError, BuildStep, run_steps
+
+
+class FakeConnection:
+    def close(self):
+        pass
+
+
+def make_step(name: str, ran: List[str], depends_on=(), fail=False) -> BuildStep:
+    def run(conn, profile):
+        assert isinstance(conn, FakeConnection)
+        if fail:
+            raise ValueError(f"{name} is broken")
+        ran.append(name)
+
+    return BuildStep(name, run, depends_on)
+
+
+def test_steps_run_after_their_dependencies():
+    ran: List[str] = []
+    steps = [
+        make_step("c", ran, depends_on=["a", "b"]),
+        make_step("a", ran),
+        make_step("b", ran, depends_on=["a"]),
+    ]
+    run_steps(steps, FakeConnection, jobs=1)
+    assert ran == ["a", "b", "c"]
+
+
+def test_independent_steps_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def run(conn, profile):
+        barrier.wait()
+
+    steps = [BuildStep("a", run, []), BuildStep("b", run, [])]
+    run_steps(steps, FakeConnection, jobs=2)
+
+
+def test_failures_only_stop_downstream_steps():
+    ran: List[str] = []
+    steps = [
+        make_step("a", ran, fail=True),
+        make_step("b", ran),
+        make_step("c", ran, depends_on=["a"]),
+        make_step("d", ran, depends_on=["c"]),
+        make_step("e", ran, depends_on=["b"]),
+    ]
+    with pytest.raises(BuildFailedError) as excinfo:
+        run_steps(steps, FakeConnection, jobs=2)
+    assert sorted(ran) == ["b", "e"]
+    error: BaseException = excinfo.value
+    assert isinstance(error, BuildFailedError)
+    assert list(error.failed) == ["a"]
+    assert error.skipped == ["c", "d"]
+
+
+class FakeCheckpoints(Checkpoints):
+    """Checkpoints that are kept in memory, rather than in the database."""
+
+    def __init__(self) -> None:
+        self.inputs = "datasets"
+        self.completed: Dict[str, str] = {}
+
+    def prepare(self, conn, step: str, tables: Sequence[str]) -> None:
+        self.completed.pop(step, None)
+
+    def save(self, conn, step: str, fingerprint: str) -> None:
+        self.completed[step] = fingerprint
+
+
+def test_checkpointed_steps_are_skipped_unless_they_are_stale():
+    checkpoints = FakeCheckpoints()
+    ran: List[str] = []
+    steps = [
+        make_step("a", ran),
+        make_step("b", ran, depends_on=["a"], fail=True),
+        make_step("c", ran, depends_on=["b"]),
+    ]
+    with pytest.raises(BuildFailedError):
+        run_steps(steps, FakeConnection, checkpoints=checkpoints)
+    assert ran == ["a"]
+
+    ran.clear()
+    steps[1] = make_step("b", ran, depends_on=["a"])
+    run_steps(steps, FakeConnection, checkpoints=checkpoints)
+    assert ran == ["b", "c"]
+
+    ran.clear()
+    steps[0] = steps[0]._replace(source="changed")
+    run_steps(steps, FakeConnection, checkpoints=checkpoints)
+    assert ran == ["a", "b", "c"]
@@ -0,0 +1,87 @@
+from .factories.chi_parcels import ChiParcels
+from .factories.chi_owners import ChiOwners
+from .factories.chi_permits import ChiPermits
+from .factories.chi_violations import ChiViolations
+from .factories.chi_311 import Chi311
+
+FUNKY_PIN = "12345678901234"
+MONKEY_PIN = "12345678901235"
+
+
+def violation(id, street_number, modified, status="OPEN"):
+    return ChiViolations(
+        id=id,
+        violation_status=status,
+        violation_date="2024-01-01",
+        violation_last_modified_date=modified,
+        street_number=street_number,
+        street_name="FUNKY",
+        street_type="ST",
+    )
+
+
+def get_indicators(db):
+    with db.cursor() as cur:
+        cur.execute(
+            "SELECT pin, permits_total, violations_open, violations_total "
+            "FROM wow_indicators ORDER BY pin"
+        )
+        return [tuple(row) for row in cur.fetchall()]
+
+
+def test_indicators_are_refreshed_incrementally(db, nycdb_ctx):
+    builder = nycdb_ctx.builder
+    nycdb_ctx.write_csv(
+        "chi_parcels.csv",
+        [
+            ChiParcels(pin=FUNKY_PIN, pin10="1234567890", year="2024"),
+            ChiParcels(pin=MONKEY_PIN, pin10="1234567891", year="2024"),
+        ],
+    )
+    nycdb_ctx.write_csv(
+        "chi_owners.csv",
+        [
+            ChiOwners(pin=FUNKY_PIN, year="2024", prop_address_full="100 FUNKY ST"),
+            ChiOwners(pin=MONKEY_PIN, year="2024", prop_address_full="200 FUNKY ST"),
+        ],
+    )
+    nycdb_ctx.write_csv("chi_permits.csv", [ChiPermits(id="P1", pin_list="1234567890")])
+    nycdb_ctx.write_csv("chi_violations.csv", [violation("V1", "100", "2024-01-01")])
+    nycdb_ctx.write_csv("chi_311.csv", [Chi311(sr_number="SR1")])
+    nycdb_ctx.build_everything()
+    assert get_indicators(db) == [(FUNKY_PIN, 1, 1, 1), (MONKEY_PIN, 0, 0, 0)]
+
+    # V1 was closed and a violation at the other address was added.
+    nycdb_ctx.write_csv(
+        "chi_violations.csv",
+        [
+            violation("V1", "100", "2024-02-01", status="CLOSED"),
+            violation("V2", "200", "2024-02-01"),
+        ],
+    )
+    assert builder.refresh_indicators() == 2
+    assert get_indicators(db) == [(FUNKY_PIN, 1, 0, 1), (MONKEY_PIN, 0, 1, 1)]
+
+    # Nothing changed since.
+    assert builder.refresh_indicators() == 0
+
+    # V2 moved to FUNKY's address.
+    nycdb_ctx.write_csv("chi_violations.csv", [violation("V2", "100", "2024-03-01")])
+    assert builder.refresh_indicators() == 2
+    assert get_indicators(db) == [(FUNKY_PIN, 1, 1, 2), (MONKEY_PIN, 0, 0, 0)]
+
+    # Permits are reloaded from scratch, but only the parcels whose PINs
+    # gained or lost permits are recomputed.
+    nycdb_ctx.write_csv("chi_permits.csv", [ChiPermits(id="P2", pin_list="1234567891")])
+    assert builder.refresh_indicators() == 2
+    assert get_indicators(db) == [(FUNKY_PIN, 0, 1, 2), (MONKEY_PIN, 1, 0, 0)]
+    nycdb_ctx.write_csv(
+        "chi_permits.csv",
+        [
+            ChiPermits(id="P2", pin_list="1234567891"),
+            ChiPermits(id="P3", pin_list="1234567891"),
+        ],
+    )
+    assert builder.refresh_indicators() == 1
+    assert get_indicators(db) == [(FUNKY_PIN, 0, 1, 2), (MONKEY_PIN, 2, 0, 0)]
+    assert builder.find_stale_indicators() == []
@@ -0,0 +1,132 @@
+import random
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from dbbuild.syntheticdata import iter_landlord_contacts
+from dbtool import SQL_DIR
+from portfoliograph import matching
+from portfoliograph.csrgraph import get_component_labels
+from portfoliograph.graph import build_graph
+from portfoliograph.matching import (
+    LandlordNodes,
+    get_bizaddr_matches,
+    get_landlord_nodes,
+    get_match_info,
+    get_name_matches,
+)
+
+
+def load_landlords(conn, contacts):
+    with conn.cursor() as cur:
+        cur.execute((SQL_DIR / "create_landlords_table.sql").read_text())
+        execute_values(cur, "INSERT INTO wow_landlords VALUES %s", list(contacts))
+        cur.execute((matching.SQL_DIR / "landlords_grouped.sql").read_text())
+
+
+def sorted_match_info(info):
+    return info and sorted(info, key=lambda match: match["nodeid"])
+
+
+def test_matches_are_the_same_as_sql(db, monkeypatch):
+    # When every block is small enough to compare all of its pairs, we
+    # should find exactly the matches that the SQL does.
+    monkeypatch.setattr(matching, "MAX_BLOCK_SIZE", 10_000)
+    with db.connect() as conn:
+        load_landlords(conn, iter_landlord_contacts(1500))
+        nodes = get_landlord_nodes(conn, fetch_size=100)
+        with conn.cursor() as cur:
+            cur.execute(
+                (matching.SQL_DIR / "landlords_with_connections.sql").read_text()
+            )
+            cur.execute(
+                "SELECT name_match_info, bizaddr_match_info "
+                "FROM landlords_with_connections ORDER BY nodeid"
+            )
+            rows = cur.fetchall()
+
+    name_info = [sorted_match_info(row[0]) for row in rows]
+    bizaddr_info = [sorted_match_info(row[1]) for row in rows]
+    assert sum(1 for info in name_info if info) > 10
+    assert sum(1 for info in bizaddr_info if info) > 10
+    assert get_match_info(nodes, get_name_matches(nodes)) == name_info
+    assert get_match_info(nodes, get_bizaddr_matches(nodes)) == bizaddr_info
+
+
+def landlord_nodes(names, streets, aptnums, zip_code="60602"):
+    count = len(names)
+    return LandlordNodes(
+        np.arange(1, count + 1),
+        np.array(names, dtype=object),
+        np.array(streets, dtype=object),
+        np.array(streets, dtype=object),
+        np.array(aptnums, dtype=object),
+        np.array([zip_code] * count, dtype=object),
+        np.ones(count, dtype=np.int64),
+        np.array([f"{i:010d}" for i in range(count)], dtype=object),
+    )
+
+
+def get_labels(nodes, *all_matches):
+    return get_component_labels(
+        len(nodes),
+        np.concatenate([matches.sources for matches in all_matches]),
+        np.concatenate([matches.targets for matches in all_matches]),
+    ).tolist()
+
+
+def test_big_name_blocks_stay_connected(monkeypatch):
+    monkeypatch.setattr(matching, "MAX_BLOCK_SIZE", 10)
+    # One landlord with lots of suites at the same address.
+    nodes = landlord_nodes(
+        ["LANDLORD LLC"] * 250,
+        ["60 E VAN BUREN ST"] * 250,
+        [f"{i + 100}" for i in range(250)],
+        zip_code="60605",
+    )
+
+    matches = get_name_matches(nodes)
+    assert matches.candidates < 250 * 249 // 2
+    assert get_labels(nodes, matches) == [0] * 250
+
+
+def test_big_bizaddr_blocks_connect_like_sql(monkeypatch):
+    # Lots of unrelated landlords with the same registered agent, in the
+    # agent's suite, in their own, or without one.
+    rng = random.Random(1)
+    aptnums = [rng.choice(["", "", None, None, "1", "2", "3"]) for _ in range(300)]
+    names = [f"LANDLORD NUMBER {i} LLC" for i in range(300)]
+    nodes = landlord_nodes(names, ["208 S LASALLE ST"] * 300, aptnums)
+
+    monkeypatch.setattr(matching, "MAX_BLOCK_SIZE", 10_000)
+    all_matches = get_bizaddr_matches(nodes)
+    monkeypatch.setattr(matching, "MAX_BLOCK_SIZE", 10)
+    matches = get_bizaddr_matches(nodes)
+
+    assert matches.candidates < 300
+    assert get_labels(nodes, matches) == get_labels(nodes, all_matches)
+    assert set(matches.weights.tolist()) <= set(all_matches.weights.tolist())
+    # Without a blank suite, only landlords in the same suite match.
+    nodes = landlord_nodes(
+        names, ["208 S LASALLE ST"] * 300, [aptnum or None for aptnum in aptnums]
+    )
+    labels = get_labels(nodes, get_bizaddr_matches(nodes))
+    assert len(set(labels)) == aptnums.count("") + aptnums.count(None) + 3
+
+
+def test_big_blocks_connect_the_same_landlords_as_sql(db, monkeypatch):
+    # Big blocks leave out matches between landlords that are connected
+    # anyway, so only the connected components (not the edges, or how
+    # Louvain splits them) are the same as the SQL's.
+    monkeypatch.setattr(matching, "MAX_BLOCK_SIZE", 10)
+    with db.connect() as conn:
+        load_landlords(conn, iter_landlord_contacts(1500, seed=2))
+        graph = build_graph(conn)
+        nodes = get_landlord_nodes(conn)
+
+    assert nodes.node_ids.tolist() == graph.node_ids.tolist()
+    labels = graph.get_component_labels().tolist()
+    assert len(set(labels)) < len(labels)
+    assert (
+        get_labels(nodes, get_name_matches(nodes), get_bizaddr_matches(nodes)) == labels
+    )
@@ -1,6 +1,18 @@
+import gzip
+import shutil
+
+import pytest
+
+import dbtool
+from dbbuild.connpool import get_free_connections
+from dbbuild.datastats import DataQualityError
+
 from .factories.chi_parcels import ChiParcels
 from .factories.chi_owners import ChiOwners
+from .factories.chi_permits import ChiPermits
 from .factories.chi_violations import ChiViolations
+from .factories.chi_311 import Chi311
+from .nycdb_context import TEST_DB
 
 
 def test_loading_violations_works(db, nycdb_ctx):
@@ -23,6 +35,35 @@ def test_loading_violations_works(db, nycdb_ctx):
         assert row["violation_status"] == "Open"
 
 
+def test_address_keys_are_computed_as_datasets_are_loaded(db, nycdb_ctx):
+    nycdb_ctx.write_csv(
+        "chi_violations.csv",
+        [
+            ChiViolations(
+                id="V1",
+                street_number="100`",
+                street_direction="n",
+                street_name="Funky  St.",
+                street_type="Ave",
+            ),
+            ChiViolations(id="V2", street_name="FUNKY", street_type="AVE"),
+        ],
+    )
+    nycdb_ctx.write_csv(
+        "chi_owners.csv",
+        [ChiOwners(pin="12345678901234", prop_address_full="100 N FUNKY ST AVE APT 2")],
+    )
+    nycdb_ctx.load_datasets("chi_violations", "chi_owners")
+    with db.cursor() as cur:
+        cur.execute("select id, address_key from chi_violations order by id")
+        assert [tuple(row) for row in cur.fetchall()] == [
+            ("V1", "100 N FUNKY ST AVE"),
+            ("V2", None),
+        ]
+        cur.execute("select address_key from chi_owners")
+        assert cur.fetchone()[0] == "100 N FUNKY ST AVE"
+
+
 def test_loading_parcels_with_owners_works(db, nycdb_ctx):
     nycdb_ctx.write_csv(
         "chi_parcels.csv",
@@ -68,3 +109,331 @@ def test_loading_parcels_with_owners_works(db, nycdb_ctx):
         assert cur.fetchone()["zip_code"] == "60601"
         cur.execute("select * from chi_owners where row_id='OWN1'")
         assert cur.fetchone()["mail_address_name"] == "FUNKY HOLDINGS LLC"
+
+
+def test_permit_pins_are_exploded_into_a_bridge_table(db, nycdb_ctx):
+    nycdb_ctx.write_csv(
+        "chi_permits.csv",
+        [
+            ChiPermits(id="P1", pin_list="1234567890 | 1234567891"),
+            ChiPermits(id="P2", pin_list="1234567891"),
+            ChiPermits(id="P3", pin_list=""),
+        ],
+    )
+    nycdb_ctx.load_dataset("chi_permits")
+    with db.cursor() as cur:
+        cur.execute("select permit_id, pin10 from chi_permit_pins order by 1, 2")
+        assert [tuple(row) for row in cur.fetchall()] == [
+            ("P1", "1234567890"),
+            ("P1", "1234567891"),
+            ("P2", "1234567891"),
+        ]
+
+
+def test_loading_datasets_in_parallel_works(db, nycdb_ctx):
+    nycdb_ctx.write_csv("chi_violations.csv", [ChiViolations(id="V456")])
+    nycdb_ctx.write_csv(
+        "chi_owners.csv", [ChiOwners(pin="12345678901234", row_id="OWN2")]
+    )
+    nycdb_ctx.load_datasets("chi_violations", "chi_owners")
+    with db.cursor() as cur:
+        cur.execute("select count(*) from chi_violations where id='V456'")
+        assert cur.fetchone()[0] == 1
+        cur.execute("select count(*) from chi_owners where row_id='OWN2'")
+        assert cur.fetchone()[0] == 1
+
+
+def test_loading_csv_with_unknown_columns_works(db, nycdb_ctx):
+    (nycdb_ctx.root_dir / "chi_violations.csv").write_text(
+        "id,legacy_column,violation_status\nV789,boop,Closed\n"
+    )
+    nycdb_ctx.load_dataset("chi_violations")
+    with db.cursor() as cur:
+        cur.execute("select * from chi_violations where id='V789'")
+        assert cur.fetchone()["violation_status"] == "Closed"
+
+
+def test_unchanged_datasets_are_not_reloaded(db, nycdb_ctx):
+    builder = nycdb_ctx.builder
+    nycdb_ctx.write_csv("chi_311.csv", [Chi311(sr_number="SR1")])
+    builder.ensure_dataset("chi_311", force_refresh=True)
+
+    with db.cursor() as cur:
+        cur.execute("insert into chi_311 (sr_number) values ('SR-MANUAL')")
+    builder.ensure_dataset("chi_311")
+    with db.cursor() as cur:
+        cur.execute("select count(*) from chi_311")
+        assert cur.fetchone()[0] == 2
+
+    nycdb_ctx.write_csv("chi_311.csv", [Chi311(sr_number="SR2")])
+    builder.ensure_dataset("chi_311")
+    with db.cursor() as cur:
+        cur.execute("select sr_number from chi_311")
+        assert [row[0] for row in cur.fetchall()] == ["SR2"]
+
+
+def test_reloading_swaps_in_an_indexed_table(db, nycdb_ctx):
+    builder = nycdb_ctx.builder
+    nycdb_ctx.write_csv("chi_311.csv", [Chi311(sr_number="SR1")])
+    builder.ensure_dataset("chi_311", force_refresh=True)
+    nycdb_ctx.write_csv("chi_311.csv", [Chi311(sr_number="SR2")])
+    builder.ensure_dataset("chi_311", force_refresh=True)
+
+    with db.cursor() as cur:
+        cur.execute("select sr_number from chi_311")
+        assert [row[0] for row in cur.fetchall()] == ["SR2"]
+        cur.execute("select to_regclass('chi_311__staging') is null as gone")
+        assert cur.fetchone()["gone"] is True
+        cur.execute(
+            "select indexname from pg_indexes where tablename = 'chi_311' order by 1"
+        )
+        assert [row[0] for row in cur.fetchall()] == [
+            "chi_311_idx0",
+            "chi_311_idx1",
+            "chi_311_key",
+        ]
+        cur.execute("select relpersistence from pg_class where relname = 'chi_311'")
+        assert cur.fetchone()[0] == "p"
+
+
+def created(date, last_modified_date=None):
+    return {
+        "created_date": date,
+        "last_modified_date": last_modified_date or date,
+    }
+
+
+def test_datasets_with_watermarks_are_loaded_incrementally(db, nycdb_ctx):
+    builder = nycdb_ctx.builder
+    nycdb_ctx.write_csv(
+        "chi_311.csv",
+        [
+            Chi311(sr_number="SR1", status="Open", **created("2024-01-01")),
+            Chi311(sr_number="SR2", status="Open", **created("2024-02-01")),
+        ],
+    )
+    builder.ensure_dataset("chi_311", force_refresh=True)
+
+    with db.cursor() as cur:
+        # This row isn't in the CSV, so it'd be gone if the table were reloaded.
+        cur.execute("insert into chi_311 (sr_number) values ('SR-MANUAL')")
+    nycdb_ctx.write_csv(
+        "chi_311.csv",
+        [
+            # Modified before the last load, so it isn't looked at again.
+            Chi311(sr_number="SR1", status="Stale", **created("2024-01-01")),
+            Chi311(
+                sr_number="SR2", status="Closed", **created("2024-02-01", "2024-03-01")
+            ),
+            Chi311(sr_number="SR3", status="Open", **created("2024-03-02")),
+        ],
+    )
+    builder.ensure_dataset("chi_311")
+
+    with db.cursor() as cur:
+        cur.execute("select sr_number, status from chi_311 order by sr_number")
+        assert [tuple(row) for row in cur.fetchall()] == [
+            ("SR-MANUAL", None),
+            ("SR1", "Open"),
+            ("SR2", "Closed"),
+            ("SR3", "Open"),
+        ]
+        cur.execute(
+            "select high_water_mark from chi_load_watermarks where dataset='chi_311'"
+        )
+        assert str(cur.fetchone()[0]) == "2024-03-02 00:00:00"
+
+
+def test_event_datasets_are_partitioned_by_date(db, nycdb_ctx):
+    builder = nycdb_ctx.builder
+    nycdb_ctx.write_csv(
+        "chi_311.csv",
+        [
+            Chi311(sr_number="SR1", **created("2024-01-15")),
+            Chi311(sr_number="SR2", **created("2024-02-01")),
+            Chi311(sr_number="SR3"),
+        ],
+    )
+    builder.ensure_dataset("chi_311", force_refresh=True)
+    nycdb_ctx.write_csv(
+        "chi_311.csv",
+        [
+            Chi311(sr_number="SR2", **created("2024-02-01")),
+            Chi311(sr_number="SR4", **created("2024-03-31 23:59:59")),
+        ],
+    )
+    builder.ensure_dataset("chi_311")
+
+    with db.cursor() as cur:
+        cur.execute(
+            """
+            select tableoid::regclass::text as part, sr_number from chi_311
+            order by sr_number
+            """
+        )
+        assert [tuple(row) for row in cur.fetchall()] == [
+            ("chi_311_p2024_01", "SR1"),
+            ("chi_311_p2024_02", "SR2"),
+            ("chi_311_default", "SR3"),
+            ("chi_311_p2024_03", "SR4"),
+        ]
+        cur.execute("select count(*) from pg_class where relname like 'chi_311\\_\\_%'")
+        assert cur.fetchone()[0] == 0
+        # The table and its partitions were loaded as logged tables.
+        cur.execute(
+            """
+            select distinct relpersistence from pg_class
+            where relname like 'chi\\_311%' and relkind in ('r', 'p')
+            """
+        )
+        assert [row[0] for row in cur.fetchall()] == ["p"]
+
+
+def test_upserts_match_rows_by_primary_key_alone(db, nycdb_ctx):
+    builder = nycdb_ctx.builder
+    nycdb_ctx.write_csv(
+        "chi_311.csv",
+        [
+            Chi311(sr_number="SR1", status="Open", **created("2024-01-15")),
+            Chi311(sr_number="SR2", status="Open", **created("2024-02-01")),
+        ],
+    )
+    builder.ensure_dataset("chi_311", force_refresh=True)
+    nycdb_ctx.write_csv(
+        "chi_311.csv",
+        [
+            # Its created date was corrected, which moves it to another partition.
+            Chi311(
+                sr_number="SR1", status="Fixed", **created("2024-02-15", "2024-03-01")
+            ),
+            # It's missing a created date, so it goes in the default partition.
+            Chi311(sr_number="SR2", status="Undated", last_modified_date="2024-03-01"),
+            Chi311(sr_number="SR3", status="Undated", last_modified_date="2024-03-01"),
+        ],
+    )
+    builder.ensure_dataset("chi_311")
+
+    with db.cursor() as cur:
+        cur.execute(
+            """
+            select tableoid::regclass::text as part, sr_number, status from chi_311
+            order by sr_number
+            """
+        )
+        assert [tuple(row) for row in cur.fetchall()] == [
+            ("chi_311_p2024_02", "SR1", "Fixed"),
+            ("chi_311_default", "SR2", "Undated"),
+            ("chi_311_default", "SR3", "Undated"),
+        ]
+
+
+def test_loading_gzipped_csv_works(db, nycdb_ctx):
+    nycdb_ctx.write_csv(
+        "chi_311.csv", [Chi311(sr_number="SR1"), Chi311(sr_number="SR2")]
+    )
+    csv_path = nycdb_ctx.root_dir / "chi_311.csv"
+    with csv_path.open("rb") as f, gzip.open(f"{csv_path}.gz", "wb") as gz:
+        shutil.copyfileobj(f, gz)
+    csv_path.unlink()
+
+    nycdb_ctx.load_dataset("chi_311")
+    with db.cursor() as cur:
+        cur.execute("select sr_number from chi_311 order by sr_number")
+        assert [row[0] for row in cur.fetchall()] == ["SR1", "SR2"]
+
+
+def test_values_that_cannot_be_cast_are_loaded_as_null(db, nycdb_ctx):
+    nycdb_ctx.write_csv(
+        "chi_owners.csv",
+        [
+            ChiOwners(pin="12345678901234", year="2024", row_id="GOOD"),
+            ChiOwners(pin="12345678901234", year="", row_id="EMPTY"),
+            ChiOwners(pin="12345678901234", year="last year", row_id="BAD"),
+        ],
+    )
+    nycdb_ctx.load_dataset("chi_owners")
+    with db.cursor() as cur:
+        cur.execute("select row_id, year from chi_owners order by row_id")
+        assert [tuple(row) for row in cur.fetchall()] == [
+            ("BAD", None),
+            ("EMPTY", None),
+            ("GOOD", 2024),
+        ]
+        cur.execute("select * from chi_load_rejects where dataset='chi_owners'")
+        reject = cur.fetchone()
+        assert reject["row_number"] == 3
+        assert reject["column_name"] == "year"
+        assert reject["value"] == "last year"
+
+
+def test_big_csvs_are_loaded_in_parts(db, nycdb_ctx, monkeypatch, capsys):
+    monkeypatch.setattr(dbtool, "COPY_SPLIT_SIZE", 100)
+    monkeypatch.setattr(nycdb_ctx.builder, "jobs", 4)
+    nycdb_ctx.write_csv(
+        "chi_owners.csv",
+        [
+            ChiOwners(pin="12345678901234", year=str(2000 + i), row_id=f"ROW{i}")
+            for i in range(20)
+        ]
+        + [ChiOwners(pin="12345678901234", year="last year", row_id="BAD")],
+    )
+    nycdb_ctx.load_dataset("chi_owners")
+
+    assert "Loading chi_owners.csv in 4 parts." in capsys.readouterr().out
+    with db.cursor() as cur:
+        cur.execute("select count(*) from chi_owners")
+        assert cur.fetchone()[0] == 21
+        cur.execute(
+            "select row_number from chi_load_rejects where dataset='chi_owners'"
+        )
+        assert cur.fetchone()[0] == 21
+
+
+def test_column_stats_are_saved_and_bad_data_is_not_loaded(db, nycdb_ctx):
+    nycdb_ctx.write_csv(
+        "chi_owners.csv",
+        [
+            ChiOwners(pin="12345678901234", year="2023", row_id="A"),
+            ChiOwners(pin="12345678901234", year="2024", row_id="B"),
+        ],
+    )
+    nycdb_ctx.load_dataset("chi_owners")
+    with db.cursor() as cur:
+        cur.execute(
+            "select * from chi_load_stats "
+            "where dataset='chi_owners' and column_name='year'"
+        )
+        stats = cur.fetchone()
+        assert stats["rows"] == 2
+        assert stats["distinct_estimate"] == 2
+        assert (stats["min_value"], stats["max_value"]) == ("2023", "2024")
+
+    nycdb_ctx.write_csv(
+        "chi_owners.csv",
+        [
+            ChiOwners(pin="12345678901234", row_id="A"),
+            ChiOwners(pin="", row_id="B"),
+            ChiOwners(pin="1234-567", row_id="C"),
+        ],
+    )
+    with pytest.raises(DataQualityError, match="pin is empty in 1 of 3 rows"):
+        nycdb_ctx.load_dataset("chi_owners")
+    with db.cursor() as cur:
+        cur.execute("select row_id from chi_owners order by row_id")
+        assert [row[0] for row in cur.fetchall()] == ["A", "B"]
+        cur.execute(
+            "select empty, invalid from chi_load_stats "
+            "where dataset='chi_owners' and column_name='pin'"
+        )
+        assert tuple(cur.fetchone()) == (1, 1)
+
+
+def test_jobs_are_limited_by_free_connections(db, nycdb_ctx):
+    builder = dbtool.ChiDbBuilder(TEST_DB, is_testing=True, jobs=100_000)
+    try:
+        assert 1 <= builder.jobs < 100_000
+        with builder.conn.cursor() as cur:
+            free = get_free_connections(cur)
+        assert 2 * builder.jobs + 1 <= free + builder.get_pool().size
+    finally:
+        builder.close()
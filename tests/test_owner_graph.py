@@ -0,0 +1,81 @@
+from portfoliograph.owner_graph import OwnerNodes, iter_owner_portfolios
+
+from .factories.chi_parcels import ChiParcels
+from .factories.chi_owners import ChiOwners
+
+
+def owner(pin, name, address, zip_code="60601", row_id=""):
+    return ChiOwners(
+        pin=pin,
+        year="2024",
+        mail_address_name=name,
+        mail_address_full=address,
+        mail_address_zipcode_1=zip_code,
+        row_id=row_id,
+    )
+
+
+def test_portfolios_are_connected_by_name_and_mailing_address(db, nycdb_ctx):
+    owners = [
+        owner("10000000000001", "Funky Holdings, LLC", "1 MAIN ST"),
+        owner("10000000000002", "FUNKY HOLDINGS LLC", "5 OTHER AVE"),
+        owner("10000000000003", "MONKEY MGMT", "5 Other Ave."),
+        # The same name in another zip code could be someone else.
+        owner("10000000000004", "FUNKY HOLDINGS LLC", "9 ELSEWHERE", "60699"),
+        owner("10000000000005", "", "", row_id="OWN5"),
+    ]
+    nycdb_ctx.write_csv(
+        "chi_parcels.csv", [ChiParcels(pin=o.pin, year="2024") for o in owners]
+    )
+    nycdb_ctx.write_csv("chi_owners.csv", owners)
+    nycdb_ctx.build_everything()
+
+    with db.cursor() as cur:
+        cur.execute("SELECT * FROM wow_portfolios ORDER BY orig_id")
+        portfolios = cur.fetchall()
+    assert [(p["orig_id"], p["pins"], p["owner_names"]) for p in portfolios] == [
+        (
+            1,
+            ["10000000000001", "10000000000002", "10000000000003"],
+            ["FUNKY HOLDINGS LLC", "Funky Holdings, LLC", "MONKEY MGMT"],
+        ),
+        (2, ["10000000000004"], ["FUNKY HOLDINGS LLC"]),
+        (3, ["10000000000005"], ["OWN5"]),
+    ]
+    graph = portfolios[0]["graph"]
+    assert len(graph["nodes"]) == 3
+    assert sorted(edge["type"] for edge in graph["edges"]) == ["bizaddr", "name"]
+    assert portfolios[1]["graph"]["edges"] == []
+
+
+def test_oversized_portfolios_are_split():
+    # Two landlords, each with 20 companies of 10 buildings at one mailing
+    # address, who are connected by a name that one company of each shares.
+    names = [f"{landlord} {i} LLC" for landlord in "AB" for i in range(20)]
+    names[-1] = names[0]
+    bizaddrs = [f"1 {landlord} ST" for landlord in "AB" for i in range(20)]
+    pins = [[f"{node:04d}{i:010d}" for i in range(10)] for node in range(40)]
+    nodes = OwnerNodes(names, bizaddrs, names, bizaddrs, ["60601"] * 40, pins)
+
+    portfolios = list(iter_owner_portfolios(nodes))
+    assert len(portfolios) > 1
+    assert {p.orig_id for p in portfolios} == {1}
+    assert sorted(pin for p in portfolios for pin in p.pins) == sorted(
+        pin for node_pins in pins for pin in node_pins
+    )
+    assert all(len(p.pins) <= 300 for p in portfolios)
+
+
+def test_oversized_portfolios_are_split_the_same_way_in_parallel():
+    # Three pairs of landlords like the ones above, so that there's more
+    # than one oversized component to split.
+    names = [f"{landlord} {i} LLC" for landlord in "ABCDEF" for i in range(20)]
+    for pair in range(3):
+        names[pair * 40 + 39] = names[pair * 40]
+    bizaddrs = [f"1 {landlord} ST" for landlord in "ABCDEF" for i in range(20)]
+    pins = [[f"{node:04d}{i:010d}" for i in range(10)] for node in range(120)]
+    nodes = OwnerNodes(names, bizaddrs, names, bizaddrs, ["60601"] * 120, pins)
+
+    portfolios = list(iter_owner_portfolios(nodes))
+    assert {p.orig_id for p in portfolios} == {1, 2, 3}
+    assert list(iter_owner_portfolios(nodes, jobs=2)) == portfolios
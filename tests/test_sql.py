@@ -2,6 +2,7 @@ from io import StringIO
 import json
 import pytest
 
+from dbtool import PORTFOLIOS_STEP
 from portfoliograph.table import export_portfolios_table_json
 
 from .factories.chi_parcels import ChiParcels
@@ -184,6 +185,7 @@ class TestSQL:
         r = self.query_one(f"SELECT * FROM wow_parcels WHERE pin='{FUNKY_PIN}'")
         assert r["housenumber"] == "100"
         assert r["streetname"] == "FUNKY ST"
+        assert r["address_key"] == "100 FUNKY ST"
         assert r["owner_name"] == "FUNKY HOLDINGS LLC"
         assert r["ward"] == "42"
 
@@ -216,6 +218,21 @@ class TestSQL:
         )
         assert set(r["pins"]) == {FUNKY_PIN, MONKEY_PIN}
 
+    def test_build_steps_are_profiled(self):
+        steps = {
+            row["step"]: row
+            for row in self.query_all(
+                "SELECT * FROM build_steps WHERE run_id = (SELECT max(id) FROM build_runs)"
+            )
+        }
+        assert steps["load chi_parcels"]["rows_affected"] == 3
+        assert steps["create_parcels_table.sql"]["table_bytes"] > 0
+        assert steps["create_parcels_table.sql"]["index_bytes"] > 0
+        assert len(steps["create_parcels_table.sql"]["statements"]) == 8
+        assert steps[PORTFOLIOS_STEP]["rows_affected"] > 0
+        r = self.query_one("SELECT status FROM build_runs ORDER BY id DESC LIMIT 1")
+        assert r["status"] == "succeeded"
+
     def test_export_portfolios_table_json_works(self):
         with self.db.connect() as conn:
             f = StringIO()
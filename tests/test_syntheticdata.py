@@ -0,0 +1,46 @@
+import csv
+
+from dbbuild import syntheticdata
+
+
+def read_column(path, column):
+    with path.open(newline="") as f:
+        return [row[column] for row in csv.DictReader(f)]
+
+
+def test_generate_is_deterministic(tmp_path):
+    first = syntheticdata.generate(tmp_path / "first", 0.01, seed=5)
+    second = syntheticdata.generate(tmp_path / "second", 0.01, seed=5)
+    assert first == second
+    for name in first:
+        filename = f"{name}.csv"
+        assert (tmp_path / "first" / filename).read_text() == (
+            tmp_path / "second" / filename
+        ).read_text()
+
+
+def test_generated_datasets_refer_to_each_other(tmp_path):
+    counts = syntheticdata.generate(tmp_path, 0.01)
+    assert counts["chi_parcels"] == 180
+    assert counts["chi_311"] == 12 * 180
+
+    pins = read_column(tmp_path / "chi_parcels.csv", "pin")
+    assert read_column(tmp_path / "chi_owners.csv", "pin") == pins
+    pin10s = {pin[:10] for pin in pins}
+    for pin_list in read_column(tmp_path / "chi_permits.csv", "pin_list"):
+        assert {pin.strip() for pin in pin_list.split("|")} <= pin10s
+
+
+def test_generated_data_builds(db, nycdb_ctx):
+    syntheticdata.generate(nycdb_ctx.root_dir, 0.01)
+    nycdb_ctx.build_everything()
+    with db.cursor() as cur:
+        cur.execute(
+            "SELECT count(*), sum(permits_total), sum(violations_total), "
+            "sum(requests_311_total) FROM wow_indicators"
+        )
+        parcels, permits, violations, requests = cur.fetchone()
+    assert parcels == 180
+    assert permits > 0
+    assert violations > 0
+    assert requests > 0